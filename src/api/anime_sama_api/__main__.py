@@ -5,9 +5,14 @@ from rich import get_console
 from rich.logging import RichHandler
 
 from . import downloader, internal_player
-from .config import config
+from .config import config, search_cache_path
 from .utils import safe_input, select_one, select_range
 
+from ..client import make_client
+from ..host_health import HostProber
+from ..mirrors import MirrorSelector
+from ..proxies import ProxyPool
+from ..search_cache import SearchCache
 from ..top_level import AnimeSama
 
 console = get_console()
@@ -23,7 +28,16 @@ async def async_main():
     query = safe_input("Anime name: \033[0;34m", str)
 
     with spinner(f"Searching for [blue]{query}"):
-        catalogues = await AnimeSama(config.url).search(query)
+        mirrors = MirrorSelector([config.url] + config.mirrors)
+        if len(mirrors.mirrors) > 1:
+            await mirrors.probe()
+
+        proxies = ProxyPool(config.proxies) if config.proxies else None
+        client = make_client(mirrors=mirrors, proxies=proxies)
+        search_cache = SearchCache(ttl=config.search_cache_ttl, path=search_cache_path)
+        catalogues = await AnimeSama(
+            config.url, client=client, search_cache=search_cache
+        ).search(query)
     catalogue = select_one(catalogues)
 
     with spinner(f"Getting season list for [blue]{catalogue.name}"):
@@ -39,6 +53,13 @@ async def async_main():
     )
 
     if config.download:
+        with spinner("Checking the video hosts"):
+            await HostProber(downloader.host_health).probe(
+                player
+                for episode in selected_episodes
+                for players in episode.languages.values()
+                for player in players
+            )
         downloader.multi_download(
             selected_episodes,
             config.download_path,
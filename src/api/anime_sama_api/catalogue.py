@@ -5,9 +5,13 @@ from httpx import AsyncClient
 
 from anime_sama_api.langs import Lang
 
-from .utils import remove_some_js_comments
 from .season import Season
+from .single_flight import flights_for
+from .client import make_client
+from .parsing import parse_seasons, run_parser, scan_response, seasons_scanner
 from .langs import flags
+from .serialization import SCHEMA_VERSION, check_version
+from . import deadline
 
 
 Category = Literal["Anime", "Scans", "Film", "Autres"]
@@ -34,11 +38,14 @@ class Catalogue:
 
         self.url = url + "/" if url[-1] != "/" else url
         self.site_url = "/".join(url.split("/")[:3]) + "/"
-        self.client = client or AsyncClient()
+        self.client = client or make_client()
 
         self.name = name or url.split("/")[-2]
 
         self._page = None
+        self._seasons: list[tuple[str, str]] | None = None
+        # Seasons restored by from_dict, returned without scraping
+        self._restored_seasons: list[Season] | None = None
         self.alternative_names = alternative_names
         self.genres = genres
         self.categories = categories
@@ -49,21 +56,40 @@ class Catalogue:
         if self._page is not None:
             return self._page
 
+        self._page = await flights_for(self.client).do(
+            ("page", self.url), self._fetch_page
+        )
+        return self._page
+
+    async def _fetch_page(self) -> str:
         response = await self.client.get(self.url)
 
         if not response.is_success:
-            self._page = ""
-        else:
-            self._page = response.text
+            return ""
 
-        return self._page
+        return response.text
+
+    async def _fetch_seasons(self) -> list[tuple[str, str]]:
+        # Stream the page rather than keep it when only the seasons are needed
+        scanner = seasons_scanner()
+        async with self.client.stream("GET", self.url) as response:
+            if not response.is_success:
+                return []
+            await scan_response(response, (scanner,))
+        return scanner.matches
 
     async def seasons(self) -> list[Season]:
-        page_without_comments = remove_some_js_comments(string=await self.page())
+        if self._restored_seasons is not None:
+            return list(self._restored_seasons)
 
-        seasons = re.findall(
-            r'panneauAnime\("(.+?)", *"(.+?)(?:vostfr|vf)"\);', page_without_comments
-        )
+        if self._page is not None:
+            seasons = await run_parser(parse_seasons, self._page)
+        else:
+            if self._seasons is None:
+                self._seasons = await flights_for(self.client).do(
+                    ("seasons", self.url), self._fetch_seasons
+                )
+            seasons = self._seasons
 
         seasons = [
             Season(
@@ -122,6 +148,56 @@ class Catalogue:
         names = [""] + self.alternative_names if self.alternative_names else []
         return f"{self.name}[bright_black]{' - '.join(names)} {' '.join(flags[lang] for lang in self.languages if lang != 'VOSTFR')}"
 
+    def to_dict(self, seasons: list[Season] | None = None) -> dict:
+        """`seasons` (by default the restored ones, if any) are included with their restored episodes."""
+        if seasons is None:
+            seasons = self._restored_seasons
+        data = {
+            "type": "catalogue",
+            "version": SCHEMA_VERSION,
+            "url": self.url,
+            "name": self.name,
+            "alternative_names": self.alternative_names,
+            "genres": self.genres,
+            "categories": self.categories,
+            "languages": self.languages,
+            "image_url": self.image_url,
+        }
+        if seasons is not None:
+            data["seasons"] = [season.to_dict() for season in seasons]
+        return data
+
+    async def snapshot(self) -> dict:
+        """`to_dict` with every season and their episodes, scraped if needed."""
+        seasons = await self.seasons()
+        episodes = await deadline.gather(*(season.episodes() for season in seasons))
+        data = self.to_dict()
+        data["seasons"] = [
+            season.to_dict(season_episodes)
+            for season, season_episodes in zip(seasons, episodes)
+        ]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, client: AsyncClient | None = None) -> "Catalogue":
+        check_version(data, "catalogue")
+        catalogue = cls(
+            data["url"],
+            data["name"],
+            data["alternative_names"],
+            data["genres"],
+            data["categories"],
+            data["languages"],
+            data["image_url"],
+            client=client,
+        )
+        if "seasons" in data:
+            catalogue._restored_seasons = [
+                Season.from_dict(season, client=catalogue.client)
+                for season in data["seasons"]
+            ]
+        return catalogue
+
     def __repr__(self):
         return f"Catalogue({self.url!r}, {self.name!r})"
 
@@ -0,0 +1,162 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Literal
+
+import httpx
+
+State = Literal["closed", "open", "half-open"]
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+@dataclass
+class _Circuit:
+    state: State = "closed"
+    failures: int = 0
+    opened_at: float = 0
+    probing: bool = False
+
+
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+    After `failure_threshold` consecutive failures the circuit of a host opens and requests fail fast.
+    Once `cooldown` seconds have passed, a single probe request is let through (half-open):
+    its success closes the circuit, its failure opens it again for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._circuits: dict[str, _Circuit] = {}
+        self._lock = threading.Lock()
+
+    def _circuit(self, host: str) -> _Circuit:
+        circuit = self._circuits.get(host)
+        if circuit is None:
+            circuit = self._circuits[host] = _Circuit()
+        return circuit
+
+    def _cooled_down(self, circuit: _Circuit) -> bool:
+        return time.monotonic() - circuit.opened_at >= self.cooldown
+
+    def is_available(self, host: str) -> bool:
+        """Whether a request to `host` would be let through, without reserving the probe."""
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "open":
+                return self._cooled_down(circuit)
+            if circuit.state == "half-open":
+                return not circuit.probing
+            return True
+
+    def acquire(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuit(host)
+            if circuit.state == "open" and self._cooled_down(circuit):
+                circuit.state = "half-open"
+                circuit.probing = False
+
+            if circuit.state == "open" or (
+                circuit.state == "half-open" and circuit.probing
+            ):
+                raise CircuitOpenError(f"Circuit open for {host}")
+            if circuit.state == "half-open":
+                circuit.probing = True
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.state = "closed"
+            circuit.failures = 0
+            circuit.probing = False
+
+    def release(self, host: str) -> None:
+        """Give back a probe whose outcome is unknown."""
+        with self._lock:
+            self._circuit(host).probing = False
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            circuit = self._circuit(host)
+            circuit.failures += 1
+            circuit.probing = False
+            if (
+                circuit.state == "half-open"
+                or circuit.failures >= self.failure_threshold
+            ):
+                circuit.state = "open"
+                circuit.opened_at = time.monotonic()
+
+    def _state(self, circuit: _Circuit) -> State:
+        if circuit.state == "open" and self._cooled_down(circuit):
+            return "half-open"
+        return circuit.state
+
+    def state(self, host: str) -> State:
+        with self._lock:
+            return self._state(self._circuit(host))
+
+    def snapshot(self) -> dict[str, dict]:
+        """State of every known host, e.g. for a health endpoint."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                host: {
+                    "state": self._state(circuit),
+                    "failures": circuit.failures,
+                    "retry_in": max(0.0, circuit.opened_at + self.cooldown - now)
+                    if circuit.state == "open"
+                    else 0.0,
+                }
+                for host, circuit in self._circuits.items()
+            }
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper failing fast with CircuitOpenError while the circuit of the host is open.
+    Transport errors and 5xx responses count as failures.
+    """
+
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.breaker = breaker
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        self.breaker.acquire(host)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            # A timeout shortened by the caller's deadline doesn't mean the host is slow
+            if request.extensions.get("deadline_limited"):
+                self.breaker.release(host)
+            else:
+                self.breaker.record_failure(host)
+            raise
+        except httpx.TransportError:
+            self.breaker.record_failure(host)
+            raise
+        except BaseException:
+            # Cancelled or unexpected errors say nothing about the host health
+            self.breaker.release(host)
+            raise
+
+        if response.status_code >= 500:
+            self.breaker.record_failure(host)
+        else:
+            self.breaker.record_success(host)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,43 @@
+from typing import Any
+
+from httpx import AsyncBaseTransport, AsyncClient, AsyncHTTPTransport
+
+from .circuit_breaker import CircuitBreaker, CircuitBreakerTransport
+from .deadline import DeadlineTransport
+from .mirrors import MirrorSelector, MirrorTransport
+from .proxies import ProxyPool, ProxyPoolTransport
+from .retry import RetryBudget, RetryPolicy, RetryTransport
+from .scheduler import PriorityScheduler, SchedulerTransport
+
+
+def make_client(
+    breaker: CircuitBreaker | None = None,
+    retry_policy: RetryPolicy | None = None,
+    retry_budget: RetryBudget | None = None,
+    scheduler: PriorityScheduler | None = None,
+    mirrors: MirrorSelector | None = None,
+    proxies: ProxyPool | None = None,
+    transport: AsyncBaseTransport | None = None,
+    **kwargs: Any,
+) -> AsyncClient:
+    """
+    AsyncClient honouring the deadline of the calling context and retrying
+    transient errors according to `retry_policy` within `retry_budget`,
+    optionally failing fast on hosts whose circuit is open in `breaker`,
+    queuing requests by priority in `scheduler`,
+    sending the requests for the site to the best of its `mirrors`
+    and spreading them over a pool of egress `proxies`.
+    Extra keyword arguments are passed to AsyncClient.
+    """
+    if transport is None:
+        transport = (
+            ProxyPoolTransport(proxies) if proxies is not None else AsyncHTTPTransport()
+        )
+    if breaker is not None:
+        transport = CircuitBreakerTransport(breaker, transport)
+    if scheduler is not None:
+        transport = SchedulerTransport(scheduler, transport)
+    if mirrors is not None:
+        transport = MirrorTransport(mirrors, transport)
+    transport = RetryTransport(transport, retry_policy, retry_budget)
+    return AsyncClient(transport=DeadlineTransport(transport), **kwargs)
@@ -34,8 +34,11 @@ class Config:
     format_sort: str
     internal_player_command: list[str]
     url: str
+    mirrors: list[str]
+    proxies: list[str]
     players: PlayersConfig  # Deprecated
     concurrent_downloads: dict[str, int]
+    search_cache_ttl: int
 
 
 # Load default config
@@ -72,6 +75,9 @@ else:
 # Update the default values by values set by the user
 config = default_config | user_config
 
+# Search results are cached next to the user config
+search_cache_path = possible_path[1] / "search_cache.json"
+
 # Check if value respect the type
 for index, lang in enumerate(config["prefer_languages"]):
     # Backward compatibility
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException, TimeoutError):
+    """Raised when the time budget of the current context has run out."""
+
+    def __init__(self, message: str = "Deadline exceeded", *, request=None) -> None:
+        super().__init__(message, request=request)
+
+
+@contextmanager
+def deadline(seconds: float | None) -> Generator[None]:
+    """
+    Give the current context a time budget of `seconds`.
+    Nested budgets can only shrink the deadline, never extend it.
+    """
+    if seconds is None:
+        yield
+        return
+
+    current = _deadline.get()
+    new = time.monotonic() + seconds
+    token = _deadline.set(new if current is None else min(current, new))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def detached() -> Generator[None]:
+    """Lift the deadline, e.g. to spawn work that should outlive the current budget."""
+    token = _deadline.set(None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Seconds left before the deadline of the current context, None if there is none."""
+    current = _deadline.get()
+    if current is None:
+        return None
+    return current - time.monotonic()
+
+
+def check() -> None:
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded()
+
+
+async def run_within(aw: Awaitable[T]) -> T:
+    """Await `aw`, cancelling it if the deadline of the current context runs out."""
+    left = remaining()
+    if left is None:
+        return await aw
+    if left <= 0:
+        # Never started: don't leave it (or the children of a gather) running unawaited
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        elif asyncio.isfuture(aw):
+            aw.cancel()
+        raise DeadlineExceeded()
+
+    try:
+        return await asyncio.wait_for(aw, left)
+    except asyncio.TimeoutError as error:
+        if isinstance(error, DeadlineExceeded):
+            raise
+        raise DeadlineExceeded() from None
+
+
+async def gather(*aws: Awaitable[Any], return_exceptions: bool = False) -> list[Any]:
+    """asyncio.gather cancelling the outstanding awaitables when the deadline runs out."""
+    return await run_within(asyncio.gather(*aws, return_exceptions=return_exceptions))
+
+
+class DeadlineTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper shrinking the timeouts of every request to the remaining budget
+    of the context that sends it, and failing fast once the budget is spent.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        left = remaining()
+        if left is None:
+            return await self.transport.handle_async_request(request)
+        if left <= 0:
+            raise DeadlineExceeded(request=request)
+
+        timeouts = request.extensions.get("timeout", {})
+        request.extensions["timeout"] = {
+            name: left if value is None else min(value, left)
+            for name, value in {
+                "connect": None,
+                "read": None,
+                "write": None,
+                "pool": None,
+                **timeouts,
+            }.items()
+        }
+        request.extensions["deadline_limited"] = True
+
+        try:
+            return await asyncio.wait_for(
+                self.transport.handle_async_request(request), left
+            )
+        except (asyncio.TimeoutError, httpx.TimeoutException) as error:
+            if isinstance(error, DeadlineExceeded):
+                raise
+            if remaining() > 0 and isinstance(error, httpx.TimeoutException):
+                raise
+            raise DeadlineExceeded(request=request) from error
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -21,7 +21,9 @@ from rich.progress import (
     ProgressColumn,
 )
 
-from .error_handeling import YDL_log_filter, reaction_to
+from .error_handeling import YDL_log_filter
+from .retry import RetryBudget, RetryPolicy, classify_message
+from .host_health import HostHealth
 from .episode import Episode
 from .langs import Lang
 from .config import config
@@ -59,6 +61,11 @@ total_progress = Progress(
 )
 progress = Group(total_progress, download_progress)
 
+# Shared by every download so concurrent downloads don't pile up retries on a failing host
+retry_budget = RetryBudget()
+# Shared too so every download ranks the players with what the others experienced
+host_health = HostHealth()
+
 def download(
     episode: Episode,
     path: Path,
@@ -135,18 +142,27 @@ def download(
         if "vidmoly" not in player and "oneupload" not in player and "sendvid" not in player:
             reordered_players.append(player)
 
+    # Hosts currently slow or failing go after the others, the order above breaks ties
+    reordered_players = host_health.rank(reordered_players)
+
+    # max_retry_time bounds the backoff, 10 attempts reach it with the default values
+    retry_policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=max_retry_time)
+
     downloaded = False
     for player in reordered_players:
         if downloaded:
             break
 
-        retry_time = 1
-        download_progress.update(me, site=urlparse(player).hostname)
+        host = urlparse(player).hostname
+        attempt = 0
+        download_progress.update(me, site=host)
+        retry_budget.deposit(host)
 
         while True:
             try:
                 with YoutubeDL(option) as ydl:
                     error_code = ydl.download([player])
+                    host_health.record(host, not error_code)
                     if not error_code:
                         downloaded = True
                         break
@@ -157,35 +173,30 @@ def download(
                         )
                         break
             except DownloadError as execption:
-                error_msg = execption.msg.lower()
-
-                if "socket" in error_msg or "timeout" in error_msg:
-                    logger.warning(f"Timeout sur {urlparse(player).hostname}, nouvelle tentative...")
-                    time.sleep(retry_time)
-                    retry_time *= 2
-                    if retry_time < max_retry_time:
-                        continue
-
-                match reaction_to(execption.msg):
-                    case "continue":
-                        break
-                    case "retry":
-                        if retry_time >= max_retry_time:
-                            logger.warning(f"Nombre maximum de tentatives atteint pour {urlparse(player).hostname}")
-                            break
-                        logger.info(
-                            f"Nouvelle tentative pour {episode.name} dans %ss...", retry_time
-                        )
-                        time.sleep(retry_time)
-                        retry_time *= 2
-                    case "crash":
+                host_health.record(host, False)
+                match classify_message(execption.msg):
+                    case "fatal":
                         raise execption
-                    case _:
+                    case "skip":
                         logger.warning(
-                            f"Erreur non gérée pour {urlparse(player).hostname}, passage au suivant..."
+                            f"Erreur non gérée pour {host}, passage au suivant..."
                         )
                         break
 
+                attempt += 1
+                if attempt >= retry_policy.max_attempts:
+                    logger.warning(f"Nombre maximum de tentatives atteint pour {host}")
+                    break
+                if not retry_budget.withdraw(host):
+                    logger.warning(f"Trop d'échecs sur {host}, passage au suivant...")
+                    break
+
+                retry_time = retry_policy.delay(attempt)
+                logger.info(
+                    f"Nouvelle tentative pour {episode.name} dans %.1fs...", retry_time
+                )
+                time.sleep(retry_time)
+
         if downloaded:
             break
 
@@ -4,6 +4,7 @@ import logging
 from dataclasses import dataclass
 
 from .langs import flags, Lang, LangId, id2lang, lang2ids
+from .serialization import SCHEMA_VERSION, check_version
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,13 @@ class Players(list[str]):
             return
         self[0], self[1] = self[1], self[0]
 
+    @classmethod
+    def from_ordered(cls, players: list[str]) -> "Players":
+        """Players already in their final order, as stored by `Episode.to_dict`."""
+        ordered = cls()
+        ordered.extend(players)
+        return ordered
+
 
 class Languages(dict[LangId, Players]):
     def __init__(self, *args, **kargs):
@@ -97,3 +105,32 @@ class Episode:
             return next(self.consume_player(prefer_languages))
         except StopIteration:
             return None
+
+    def to_dict(self) -> dict:
+        return {
+            "type": "episode",
+            "version": SCHEMA_VERSION,
+            "languages": {
+                lang_id: list(players) for lang_id, players in self.languages.items()
+            },
+            "serie_name": self.serie_name,
+            "season_name": self.season_name,
+            "name": self._name,
+            "index": self.index,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Episode":
+        check_version(data, "episode")
+        return cls(
+            Languages(
+                {
+                    lang_id: Players.from_ordered(players)
+                    for lang_id, players in data["languages"].items()
+                }
+            ),
+            data["serie_name"],
+            data["season_name"],
+            data["name"],
+            data["index"],
+        )
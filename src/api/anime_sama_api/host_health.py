@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import TypeVar
+from urllib.parse import urlparse
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _HostStats:
+    weight: float = 0
+    successes: float = 0
+    latency_sum: float = 0
+    latency_weight: float = 0
+    updated: float = 0
+    recorded: float = 0
+
+
+class HostHealth:
+    """
+    Rolling success rate and latency of the video hosts (vidmoly, sendvid...).
+    Observations lose half their weight every `half_life` seconds so the ranking follows the current state.
+    A host without observations is assumed up with `default_latency`.
+    Thread safe: the downloader records from its worker threads.
+    """
+
+    def __init__(self, half_life: float = 600, default_latency: float = 2) -> None:
+        self.half_life = half_life
+        self.default_latency = default_latency
+
+        self._stats: dict[str, _HostStats] = {}
+        self._samples: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).hostname or ""
+
+    def _decayed(self, host: str, now: float) -> _HostStats:
+        # Reading a host never seen must not grow the table
+        stats = self._stats.get(host) or _HostStats(updated=now)
+        factor = 0.5 ** ((now - stats.updated) / self.half_life)
+        stats.weight *= factor
+        stats.successes *= factor
+        stats.latency_sum *= factor
+        stats.latency_weight *= factor
+        stats.updated = now
+        return stats
+
+    def record(self, host: str, success: bool, latency: float | None = None) -> None:
+        """`latency` of a success, if it is meaningful (not the duration of a whole download).
+        A latency that isn't finite is ignored: it would never decay away."""
+        with self._lock:
+            now = time.monotonic()
+            stats = self._stats[host] = self._decayed(host, now)
+            stats.recorded = now
+            stats.weight += 1
+            if success:
+                stats.successes += 1
+                if latency is not None and math.isfinite(latency):
+                    stats.latency_sum += latency
+                    stats.latency_weight += 1
+
+    def success_rate(self, host: str) -> float:
+        with self._lock:
+            stats = self._decayed(host, time.monotonic())
+            # One success and one failure of prior: a single failure doesn't bury a host
+            return (stats.successes + 1) / (stats.weight + 2)
+
+    def latency(self, host: str) -> float:
+        with self._lock:
+            stats = self._decayed(host, time.monotonic())
+            if stats.latency_weight < 1e-3:
+                return self.default_latency
+            return stats.latency_sum / stats.latency_weight
+
+    def score(self, host: str) -> float:
+        """Expected time to get a working player from `host`, lower is better."""
+        return self.latency(host) / self.success_rate(host)
+
+    def rank(self, items: Iterable[T], url: Callable[[T], str] = str) -> list[T]:
+        """
+        Sort `items` (player URLs by default) from the best host to the worst.
+        The order is kept between hosts with the same score, e.g. with no observations.
+        """
+        items = list(items)
+        scores = {}
+        for item in items:
+            host = self.host_of(url(item))
+            if host not in scores:
+                scores[host] = self.score(host)
+                with self._lock:
+                    self._samples[host] = url(item)
+        return sorted(items, key=lambda item: scores[self.host_of(url(item))])
+
+    def forget_idle(self, max_idle: float) -> int:
+        """Forget the hosts without observation for `max_idle` seconds, return how many."""
+        with self._lock:
+            limit = time.monotonic() - max_idle
+            idle = [host for host, stats in self._stats.items() if stats.recorded < limit]
+            for host in idle:
+                del self._stats[host]
+                self._samples.pop(host, None)
+            return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def samples(self) -> dict[str, str]:
+        """A player URL of each host seen by `rank`, used to probe the hosts."""
+        with self._lock:
+            return dict(self._samples)
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            host: {
+                "success_rate": round(self.success_rate(host), 3),
+                "latency": round(self.latency(host), 3),
+            }
+            for host in list(self._stats)
+        }
+
+
+class HostProber:
+    """Measure the video hosts with a lightweight request to one of their players."""
+
+    def __init__(
+        self,
+        health: HostHealth,
+        client: httpx.AsyncClient | None = None,
+        timeout: float = 5,
+    ) -> None:
+        self.health = health
+        self.client = client
+        self.timeout = timeout
+
+    async def _probe_one(self, client: httpx.AsyncClient, host: str, url: str) -> None:
+        start = time.monotonic()
+        try:
+            # Only the headers are waited for, the player page itself is not downloaded
+            async with client.stream("GET", url, timeout=self.timeout) as response:
+                success = response.status_code < 500
+        except httpx.HTTPError as error:
+            logger.debug("Probe of %s failed: %s", host, error)
+            success = False
+        self.health.record(host, success, time.monotonic() - start)
+
+    async def probe(self, urls: Iterable[str] | None = None) -> None:
+        """Probe the hosts of `urls`, by default a sample player of each host already seen."""
+        if urls is None:
+            samples = self.health.samples()
+        else:
+            samples = {}
+            for url in urls:
+                samples.setdefault(self.health.host_of(url), url)
+        if not samples:
+            return
+
+        client = self.client or httpx.AsyncClient(follow_redirects=True)
+        try:
+            await asyncio.gather(
+                *(self._probe_one(client, host, url) for host, url in samples.items())
+            )
+        finally:
+            if self.client is None:
+                await client.aclose()
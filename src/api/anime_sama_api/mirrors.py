@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _MirrorStats:
+    healthy: bool = True
+    latency: float | None = None
+    last_probe: float | None = None
+
+
+class MirrorSelector:
+    """
+    Track the health and latency of several base URLs serving the same site.
+    `current` is the fastest healthy mirror, the first one while nothing is known.
+    """
+
+    def __init__(
+        self, mirrors: list[str], smoothing: float = 0.5, marker: str | None = None
+    ) -> None:
+        if not mirrors:
+            raise ValueError("At least one mirror is needed")
+
+        self.mirrors = [
+            mirror if mirror.endswith("/") else mirror + "/" for mirror in mirrors
+        ]
+        self.smoothing = smoothing
+        self.marker = marker
+
+        self._stats = {mirror: _MirrorStats() for mirror in self.mirrors}
+        self._hosts = {httpx.URL(mirror).host: mirror for mirror in self.mirrors}
+
+    @property
+    def current(self) -> str:
+        healthy = [mirror for mirror in self.mirrors if self._stats[mirror].healthy]
+        if not healthy:
+            return self.mirrors[0]
+        return min(
+            healthy,
+            key=lambda mirror: (
+                self._stats[mirror].latency is None,
+                self._stats[mirror].latency or 0,
+            ),
+        )
+
+    def mirror_of(self, url: httpx.URL | str) -> str | None:
+        return self._hosts.get(httpx.URL(url).host)
+
+    def rewrite(self, url: httpx.URL | str, mirror: str | None = None) -> httpx.URL:
+        """Point a URL of any known mirror to `mirror` (the current one by default)."""
+        url = httpx.URL(url)
+        if self.mirror_of(url) is None:
+            return url
+
+        target = httpx.URL(mirror or self.current)
+        return url.copy_with(scheme=target.scheme, host=target.host, port=target.port)
+
+    def record_success(self, mirror: str, latency: float) -> None:
+        stats = self._stats[mirror]
+        stats.healthy = True
+        stats.latency = (
+            latency
+            if stats.latency is None
+            else self.smoothing * latency + (1 - self.smoothing) * stats.latency
+        )
+
+    def record_failure(self, mirror: str) -> None:
+        if self._stats[mirror].healthy:
+            logger.warning("Mirror %s is unreachable", mirror)
+        self._stats[mirror].healthy = False
+
+    async def probe(
+        self, client: httpx.AsyncClient | None = None, timeout: float = 5
+    ) -> str:
+        """Measure every mirror and return the one to use."""
+        own_client = client is None
+        client = client or httpx.AsyncClient(timeout=timeout, follow_redirects=True)
+
+        async def probe_one(mirror: str) -> None:
+            start = time.monotonic()
+            try:
+                response = await client.get(mirror, timeout=timeout)
+            except httpx.HTTPError:
+                self.record_failure(mirror)
+                return
+            finally:
+                self._stats[mirror].last_probe = time.time()
+
+            if response.status_code >= 500 or (
+                self.marker is not None and self.marker not in response.text
+            ):
+                self.record_failure(mirror)
+            else:
+                self.record_success(mirror, time.monotonic() - start)
+
+        try:
+            await asyncio.gather(*(probe_one(mirror) for mirror in self.mirrors))
+        finally:
+            if own_client:
+                await client.aclose()
+        return self.current
+
+    def snapshot(self) -> dict[str, dict]:
+        current = self.current
+        return {
+            mirror: {
+                "current": mirror == current,
+                "healthy": stats.healthy,
+                "latency": stats.latency,
+                "last_probe": stats.last_probe,
+            }
+            for mirror, stats in self._stats.items()
+        }
+
+
+class MirrorTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper sending the requests for any known mirror to the current one.
+    A mirror failing a request is marked unhealthy until a probe or a request succeeds.
+    """
+
+    def __init__(
+        self,
+        selector: MirrorSelector,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.selector = selector
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.selector.mirror_of(request.url) is None:
+            return await self.transport.handle_async_request(request)
+
+        mirror = self.selector.current
+        request.url = self.selector.rewrite(request.url, mirror)
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+
+        start = time.monotonic()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except httpx.TimeoutException:
+            # A timeout shortened by the caller's deadline doesn't mean the mirror is down
+            if not request.extensions.get("deadline_limited"):
+                self.selector.record_failure(mirror)
+            raise
+        except httpx.TransportError:
+            self.selector.record_failure(mirror)
+            raise
+
+        if response.status_code >= 500:
+            self.selector.record_failure(mirror)
+        else:
+            self.selector.record_success(mirror, time.monotonic() - start)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
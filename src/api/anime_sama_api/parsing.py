@@ -0,0 +1,307 @@
+"""
+Parsers of the pages of anime-sama.
+They are pure functions on text returning plain data so they can run in another process,
+see `set_parse_executor`.
+The same patterns are also matched incrementally on streamed responses, see `scan_response`.
+"""
+
+import asyncio
+import re
+from ast import literal_eval
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor
+from typing import TypeVar
+
+import httpx
+
+from .utils import remove_some_js_comments, split_and_strip
+
+T = TypeVar("T")
+
+_executor: Executor | None = None
+
+
+def set_parse_executor(executor: Executor | None) -> None:
+    """
+    Run the parsers in `executor` (e.g. a ProcessPoolExecutor) instead of the event loop thread.
+    None, the default, parses inline.
+    With an executor, `scan_response` reads whole responses before scanning them in it:
+    the event loop is never blocked by parsing but pages are held in memory at once.
+    """
+    global _executor
+    _executor = executor
+
+
+async def run_parser(parser: Callable[..., T], *args) -> T:
+    if _executor is None:
+        return parser(*args)
+    return await asyncio.get_running_loop().run_in_executor(_executor, parser, *args)
+
+
+CatalogueEntry = tuple[str, str, str, str, str, str, str]
+
+
+def parse_catalogue_entries(html: str) -> list[CatalogueEntry]:
+    """(path, image_url, name, alternative_names, genres, categories, languages) of each result."""
+    text_without_script = re.sub(r"<script[\W\w]+?</script>", "", html)
+    return re.findall(
+        r"href=\"https?://[^/\"]+/(catalogue/.+)\"[\W\w]+?src=\"(.+)\"[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<",
+        text_without_script,
+    )
+
+
+SEASONS_PATTERN = r'panneauAnime\("(.+?)", *"(.+?)(?:vostfr|vf)"\);'
+PLAYERS_PATTERN = r"eps(\d+) ?= ?\[([\W\w]+?)\]"
+EPISODES_LIST_PATTERN = r"resetListe\(\); *[\n\r]+\t*(.*?)}"
+EPISODES_JS_PATTERN = r"episodes\.js\?filever=\d+"
+FLAG_VO_PATTERN = r"flag_([^\"/]+?)\.png\".*?[\n\t]*<p.*?>VO</p>"
+
+
+def parse_seasons(page: str) -> list[tuple[str, str]]:
+    """(name, link) of each season of a catalogue page."""
+    return re.findall(SEASONS_PATTERN, remove_some_js_comments(string=page))
+
+
+def players_from_arrays(players_list: list[tuple[str, str]]) -> list[list[str]]:
+    players_list = sorted(players_list, key=lambda tuple: tuple[0])
+    return [re.findall(r"'(.+?)'", player) for _, player in players_list]
+
+
+def parse_players(episodes_js: str) -> list[list[str]]:
+    """Links of each player (epsN array) of an episodes.js, in player order."""
+    return players_from_arrays(
+        re.findall(PLAYERS_PATTERN, remove_some_js_comments(episodes_js))
+    )
+
+
+def parse_episodes_names(
+    html: str, number_of_episodes: int, number_of_episodes_max: int
+) -> list[str]:
+    functions = re.findall(EPISODES_LIST_PATTERN, html, re.DOTALL)[-1]
+    return parse_episodes_list(functions, number_of_episodes, number_of_episodes_max)
+
+
+def parse_episodes_list(
+    functions: str, number_of_episodes: int, number_of_episodes_max: int
+) -> list[str]:
+    """Names of the episodes from the calls following resetListe() in a season page."""
+    functions_list = split_and_strip(functions, (";", "\n"))[:-1]
+
+    def padding(n: int):
+        return " " * (len(str(number_of_episodes_max)) - len(str(n)))
+
+    def episode_name_range(*args):
+        return [f"Episode {n}{padding(n)}" for n in range(*args)]
+
+    episodes_name: list[str] = []
+    for function in functions_list:
+        if function.startswith("//"):
+            continue
+
+        call_start = function.find("(")
+        function, args_sting = function[:call_start], function[call_start + 1 : -1]
+        if args_sting:
+            # Warning literal_eval: Can crash
+            args = literal_eval(node_or_string=args_sting + ",")
+        else:
+            args = ()
+
+        match function:
+            case "":
+                continue
+            case "creerListe":
+                if len(args) < 2:
+                    # Only seen on Dragon Ball GT (Film), Junji Ito Collection (Saison 1) and Orange (Film)
+                    # Surely a small oversight in anime-sama.fr
+                    # So it is undefined but do nothing is generaly the good reaction
+                    continue
+
+                episodes_name += episode_name_range(int(args[0]), int(args[1]) + 1)
+            case "finirListe" | "finirListeOP":
+                if not args:
+                    break
+
+                episodes_name += episode_name_range(
+                    int(args[0]),
+                    int(args[0]) + number_of_episodes - len(episodes_name),
+                )
+                break
+            case "newSP":
+                episodes_name.append(f"Episode {args[0]}")
+            case "newSPF":
+                episodes_name.append(args[0])
+            case name:
+                raise NotImplementedError(
+                    f"Error cannot parse '{name}'.\nPlease report this to the developer."
+                )
+
+    return episodes_name
+
+
+class CommentStripper:
+    """
+    `remove_some_js_comments` for a text fed chunk by chunk.
+    Unlike it, a comment never closed is dropped up to the end of the text.
+    """
+
+    COMMENTS = (("/*", "*/"), ("<!--", "-->"))
+
+    def __init__(self) -> None:
+        self._pending = ""
+        self._end: str | None = None
+
+    def feed(self, text: str) -> str:
+        text = self._pending + text
+        output = []
+        pos = 0
+        while True:
+            if self._end is not None:
+                end = text.find(self._end, pos)
+                if end == -1:
+                    self._pending = text[max(pos, len(text) - len(self._end) + 1) :]
+                    return "".join(output)
+                pos = end + len(self._end)
+                self._end = None
+                continue
+
+            starts = [
+                (index, start, end)
+                for start, end in self.COMMENTS
+                if (index := text.find(start, pos)) != -1
+            ]
+            if not starts:
+                # The end of the chunk may be the beginning of a comment
+                cut = len(text)
+                for start, _ in self.COMMENTS:
+                    for size in range(len(start) - 1, 0, -1):
+                        if text.endswith(start[:size]):
+                            cut = min(cut, max(pos, len(text) - size))
+                            break
+                output.append(text[pos:cut])
+                self._pending = text[cut:]
+                return "".join(output)
+
+            index, start, self._end = min(starts)
+            output.append(text[pos:index])
+            pos = index + len(start)
+
+    def close(self) -> str:
+        text, self._pending = self._pending, ""
+        return "" if self._end is not None else text
+
+
+class ChunkScanner:
+    """
+    `re.findall(pattern, text)` for a text fed chunk by chunk, the results are in `matches`.
+    A match must start with `marker` and end at or before the first `end` after it.
+    Only the text of the match being received is kept, up to `max_length` characters.
+    """
+
+    def __init__(
+        self,
+        marker: str,
+        pattern: str,
+        end: str,
+        flags: int = 0,
+        max_length: int = 1 << 20,
+    ) -> None:
+        self.marker = marker
+        self.pattern = re.compile(pattern, flags)
+        self.end = re.compile(end)
+        self.max_length = max_length
+        self.matches: list = []
+        self._buffer = ""
+
+    def _add(self, match: re.Match) -> None:
+        groups = match.groups()
+        self.matches.append(
+            match.group(0) if not groups else groups[0] if len(groups) == 1 else groups
+        )
+
+    def feed(self, text: str) -> None:
+        buffer = self._buffer + text
+        pos = 0
+        while (start := buffer.find(self.marker, pos)) != -1:
+            end = self.end.search(buffer, start + len(self.marker))
+            if end is None:
+                if len(buffer) - start <= self.max_length:
+                    self._buffer = buffer[start:]
+                    return
+                pos = start + 1
+                continue
+
+            match = self.pattern.match(buffer, start, end.end())
+            if match:
+                self._add(match)
+                pos = match.end()
+            else:
+                pos = start + 1
+
+        self._buffer = buffer[max(pos, len(buffer) - len(self.marker) + 1) :]
+
+    def close(self) -> None:
+        buffer, self._buffer = self._buffer, ""
+        pos = 0
+        while (start := buffer.find(self.marker, pos)) != -1:
+            match = self.pattern.match(buffer, start)
+            if match:
+                self._add(match)
+                pos = match.end()
+            else:
+                pos = start + 1
+
+
+def seasons_scanner() -> ChunkScanner:
+    return ChunkScanner('panneauAnime("', SEASONS_PATTERN, r"\);")
+
+
+def players_scanner() -> ChunkScanner:
+    return ChunkScanner("eps", PLAYERS_PATTERN, r"\]")
+
+
+def episodes_list_scanner() -> ChunkScanner:
+    return ChunkScanner("resetListe();", EPISODES_LIST_PATTERN, "}", re.DOTALL)
+
+
+def episodes_js_scanner() -> ChunkScanner:
+    return ChunkScanner("episodes.js?filever=", EPISODES_JS_PATTERN, r"\D")
+
+
+def flag_vo_scanner() -> ChunkScanner:
+    return ChunkScanner("flag_", FLAG_VO_PATTERN, "VO</p>", max_length=4096)
+
+
+def scan_text(text: str, scanners: Sequence[ChunkScanner]) -> list[list]:
+    """Matches of each of `scanners` in a whole text, without its comments."""
+    stripper = CommentStripper()
+    text = stripper.feed(text) + stripper.close()
+    for scanner in scanners:
+        scanner.feed(text)
+        scanner.close()
+    return [scanner.matches for scanner in scanners]
+
+
+async def scan_response(
+    response: httpx.Response, scanners: Sequence[ChunkScanner]
+) -> None:
+    """
+    Feed a streamed response, without its comments, to `scanners` as it is received.
+    If a parse executor is set, the whole response is scanned in it instead.
+    """
+    if _executor is not None:
+        await response.aread()
+        matches = await run_parser(scan_text, response.text, list(scanners))
+        for scanner, scanner_matches in zip(scanners, matches):
+            scanner.matches = scanner_matches
+        return
+
+    stripper = CommentStripper()
+    async for chunk in response.aiter_text():
+        text = stripper.feed(chunk)
+        for scanner in scanners:
+            scanner.feed(text)
+
+    text = stripper.close()
+    for scanner in scanners:
+        scanner.feed(text)
+        scanner.close()
@@ -0,0 +1,187 @@
+import asyncio
+import itertools
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Literal
+
+import httpx
+
+from .scheduler import ReleasingStream
+
+Strategy = Literal["round-robin", "least-loaded"]
+
+# Use "direct" in the list of proxies to also send requests without proxy
+DIRECT = "direct"
+
+
+@dataclass(eq=False)
+class _Proxy:
+    url: str
+    transport: httpx.AsyncBaseTransport
+    active: int = 0
+    failures: int = 0
+    down_until: float = 0
+    requests: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+
+def sticky_key(url: httpx.URL) -> str:
+    """Requests for the same catalogue keep using the same proxy."""
+    match = re.match(r"/catalogue/[^/]+", url.path)
+    return url.host + (match.group(0) if match else "")
+
+
+class ProxyPool:
+    """
+    Pool of HTTP/SOCKS egress proxies (SOCKS needs the `socks` extra).
+    Each proxy handles at most `max_per_proxy` requests at once; when every proxy is busy, requests wait.
+    A proxy failing `failure_threshold` times in a row is set aside for `cooldown` seconds.
+    """
+
+    def __init__(
+        self,
+        proxies: list[str],
+        strategy: Strategy = "round-robin",
+        max_per_proxy: int = 8,
+        failure_threshold: int = 3,
+        cooldown: float = 60,
+        sticky_size: int = 1024,
+    ) -> None:
+        if not proxies:
+            raise ValueError("At least one proxy is needed")
+
+        self.strategy = strategy
+        self.max_per_proxy = max_per_proxy
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.sticky_size = sticky_size
+
+        self._proxies = [
+            _Proxy(
+                url=url,
+                transport=httpx.AsyncHTTPTransport(
+                    proxy=None if url == DIRECT else url
+                ),
+            )
+            for url in proxies
+        ]
+        self._next = itertools.cycle(self._proxies)
+        self._sticky: OrderedDict[str, _Proxy] = OrderedDict()
+        self._waiters: list[asyncio.Future] = []
+
+    def _pick(self, key: str) -> _Proxy | None:
+        candidates = [
+            proxy
+            for proxy in self._proxies
+            if proxy.healthy and proxy.active < self.max_per_proxy
+        ]
+        if not candidates:
+            if any(proxy.healthy for proxy in self._proxies):
+                return None
+            # Every proxy is down: give them another chance rather than failing everything
+            for proxy in self._proxies:
+                proxy.down_until = 0
+            return self._pick(key)
+
+        proxy = self._sticky.get(key)
+        if proxy in candidates:
+            self._sticky.move_to_end(key)
+            return proxy
+
+        if self.strategy == "least-loaded":
+            proxy = min(candidates, key=lambda proxy: proxy.active)
+        else:
+            proxy = next(proxy for proxy in self._next if proxy in candidates)
+
+        self._sticky[key] = proxy
+        while len(self._sticky) > self.sticky_size:
+            self._sticky.popitem(last=False)
+        return proxy
+
+    async def acquire(self, key: str) -> _Proxy:
+        while (proxy := self._pick(key)) is None:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+
+        proxy.active += 1
+        proxy.requests += 1
+        return proxy
+
+    def release(self, proxy: _Proxy, success: bool | None) -> None:
+        """Give back a proxy, `success` is None when the outcome says nothing about it."""
+        proxy.active -= 1
+        if success:
+            proxy.failures = 0
+        elif success is not None:
+            proxy.failures += 1
+            if proxy.failures >= self.failure_threshold:
+                proxy.down_until = time.monotonic() + self.cooldown
+
+        waiters, self._waiters = self._waiters, []
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            proxy.url: {
+                "healthy": proxy.healthy,
+                "active": proxy.active,
+                "failures": proxy.failures,
+                "requests": proxy.requests,
+            }
+            for proxy in self._proxies
+        }
+
+    async def aclose(self) -> None:
+        for proxy in self._proxies:
+            await proxy.transport.aclose()
+
+
+class ProxyPoolTransport(httpx.AsyncBaseTransport):
+    """Transport sending each request through a proxy of the pool."""
+
+    def __init__(self, pool: ProxyPool) -> None:
+        self.pool = pool
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        proxy = await self.pool.acquire(sticky_key(request.url))
+        try:
+            response = await proxy.transport.handle_async_request(request)
+        except (httpx.ProxyError, httpx.ConnectError, httpx.ConnectTimeout):
+            self.pool.release(proxy, success=False)
+            raise
+        except BaseException:
+            self.pool.release(proxy, success=None)
+            raise
+
+        # A proxy refusing to forward answers itself with one of these
+        success = response.status_code not in (407, 502, 504)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.pool.release(proxy, success)
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
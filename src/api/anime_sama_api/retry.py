@@ -0,0 +1,185 @@
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Literal
+
+import httpx
+
+from .circuit_breaker import CircuitOpenError
+from .deadline import DeadlineExceeded, remaining
+from .error_handeling import reaction_to
+
+# transient: retry later, throttled: retry after waiting what the host asked,
+# skip: give up on this resource but try another one, fatal: give up entirely
+ErrorClass = Literal["transient", "throttled", "skip", "fatal"]
+
+RETRYABLE: tuple[ErrorClass, ...] = ("transient", "throttled")
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def classify_status(status_code: int) -> ErrorClass | None:
+    """Classification of an HTTP status, None if it is a success."""
+    if status_code < 400:
+        return None
+    if status_code == 429:
+        return "throttled"
+    if status_code in (408, 425) or status_code >= 500:
+        return "transient"
+    if status_code in (404, 410):
+        return "skip"
+    return "fatal"
+
+
+def classify_message(msg: str) -> ErrorClass:
+    """Classification of an error message, e.g. from yt-dlp."""
+    match reaction_to(msg):
+        case "retry":
+            return "transient"
+        case "continue":
+            return "skip"
+        case "crash":
+            return "fatal"
+
+    lowered = msg.lower()
+    if "429" in lowered or "too many requests" in lowered:
+        return "throttled"
+    if "socket" in lowered or "timeout" in lowered or "timed out" in lowered:
+        return "transient"
+    return "skip"
+
+
+def classify_exception(exception: BaseException) -> ErrorClass:
+    if isinstance(exception, DeadlineExceeded):
+        return "fatal"
+    if isinstance(exception, CircuitOpenError):
+        return "skip"
+    if isinstance(exception, httpx.HTTPStatusError):
+        return classify_status(exception.response.status_code) or "fatal"
+    if isinstance(exception, (httpx.TimeoutException, httpx.NetworkError)):
+        return "transient"
+    if isinstance(exception, httpx.TransportError):
+        return "skip"
+    return classify_message(str(exception))
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds to wait from a Retry-After header (delay in seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter.
+    A delay requested by the host (Retry-After) is honoured, up to `max_delay`.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 30
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class RetryBudget:
+    """
+    Per-host token bucket limiting retries to a fraction of the requests.
+    Every request deposits `ratio` token and every retry withdraws one,
+    so a failing host can't be hammered by retries stacking up on each other.
+    A host starts with a full bucket of `max_tokens`, the most it can ever hold.
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10) -> None:
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+
+        self._tokens: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def deposit(self, host: str) -> None:
+        with self._lock:
+            tokens = self._tokens.get(host, self.max_tokens)
+            self._tokens[host] = min(self.max_tokens, tokens + self.ratio)
+
+    def withdraw(self, host: str) -> bool:
+        with self._lock:
+            tokens = self._tokens.get(host, self.max_tokens)
+            if tokens < 1:
+                return False
+            self._tokens[host] = tokens - 1
+            return True
+
+    def tokens(self, host: str) -> float:
+        with self._lock:
+            return self._tokens.get(host, self.max_tokens)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper retrying idempotent requests on transient errors and throttling,
+    within the per-host retry budget and the deadline of the calling context.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        policy: RetryPolicy | None = None,
+        budget: RetryBudget | None = None,
+    ) -> None:
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.policy = policy or RetryPolicy()
+        self.budget = budget or RetryBudget()
+
+    def _can_retry(self, host: str, attempt: int, delay: float) -> bool:
+        if attempt + 1 >= self.policy.max_attempts:
+            return False
+        left = remaining()
+        if left is not None and left <= delay:
+            return False
+        return self.budget.withdraw(host)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return await self.transport.handle_async_request(request)
+
+        host = request.url.host
+        self.budget.deposit(host)
+        attempt = 0
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except httpx.TransportError as exception:
+                if classify_exception(exception) not in RETRYABLE:
+                    raise
+                delay = self.policy.delay(attempt)
+                if not self._can_retry(host, attempt, delay):
+                    raise
+            else:
+                if classify_status(response.status_code) not in RETRYABLE:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                delay = self.policy.delay(attempt, retry_after)
+                if not self._can_retry(host, attempt, delay):
+                    return response
+                await response.aclose()
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,221 @@
+import asyncio
+import itertools
+import time
+from collections.abc import AsyncIterator, Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Literal
+
+import httpx
+
+Priority = Literal["interactive", "prefetch", "crawl"]
+
+PRIORITY_RANKS: dict[Priority, int] = {"interactive": 0, "prefetch": 1, "crawl": 2}
+
+
+class SharedPriority:
+    """
+    Priority of work shared by several callers (see SingleFlight): the highest of theirs.
+    A caller can itself be shared work, its priority is then followed as it changes.
+    """
+
+    def __init__(self, fallback: "Priority | SharedPriority") -> None:
+        self._fallback = fallback
+        self._levels: list[Priority | SharedPriority] = []
+
+    def add(self, level: "Priority | SharedPriority") -> None:
+        self._levels.append(level)
+
+    def remove(self, level: "Priority | SharedPriority") -> None:
+        self._levels.remove(level)
+
+    @property
+    def level(self) -> Priority:
+        levels = [resolve_priority(level) for level in self._levels]
+        if not levels:
+            return resolve_priority(self._fallback)
+        return min(levels, key=PRIORITY_RANKS.__getitem__)
+
+
+_priority: ContextVar["Priority | SharedPriority"] = ContextVar(
+    "priority", default="interactive"
+)
+
+
+def resolve_priority(level: "Priority | SharedPriority") -> Priority:
+    return level.level if isinstance(level, SharedPriority) else level
+
+
+@contextmanager
+def priority(level: Priority) -> Generator[None]:
+    """Send the requests of the current context with the priority `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def shared_priority(shared: SharedPriority) -> Generator[None]:
+    """Send the requests of the current context with the priority of the callers of `shared`."""
+    token = _priority.set(shared)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> Priority:
+    return resolve_priority(_priority.get())
+
+
+def raw_priority() -> "Priority | SharedPriority":
+    """The priority of the current context, still following a SharedPriority if there is one."""
+    return _priority.get()
+
+
+@dataclass(eq=False)
+class _Waiter:
+    level: "Priority | SharedPriority"
+    enqueued_at: float
+    seq: int
+    future: asyncio.Future
+
+
+@dataclass
+class _Host:
+    active: int = 0
+    waiters: list[_Waiter] = field(default_factory=list)
+
+
+class PriorityScheduler:
+    """
+    Limit the requests in flight to `max_per_host` per host and dispatch the queued ones by priority.
+    A waiting request gains one priority level every `aging` seconds so crawls can't starve.
+    """
+
+    def __init__(self, max_per_host: int = 6, aging: float = 5) -> None:
+        self.max_per_host = max_per_host
+        self.aging = aging
+
+        self._hosts: dict[str, _Host] = {}
+        self._seq = itertools.count()
+
+    def _host(self, host: str) -> _Host:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _Host()
+        return state
+
+    async def acquire(
+        self, host: str, level: "Priority | SharedPriority | None" = None
+    ) -> None:
+        state = self._host(host)
+        if state.active < self.max_per_host and not state.waiters:
+            state.active += 1
+            return
+
+        waiter = _Waiter(
+            # Resolved when dispatching: shared work can be raised while it waits
+            level=level or raw_priority(),
+            enqueued_at=time.monotonic(),
+            seq=next(self._seq),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        state.waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # The slot was granted right before the cancellation
+                self.release(host)
+            else:
+                state.waiters.remove(waiter)
+            raise
+
+    def release(self, host: str) -> None:
+        state = self._host(host)
+        state.active -= 1
+        now = time.monotonic()
+        while state.waiters and state.active < self.max_per_host:
+            waiter = min(
+                state.waiters,
+                key=lambda w: (
+                    PRIORITY_RANKS[resolve_priority(w.level)]
+                    - (now - w.enqueued_at) / self.aging,
+                    w.seq,
+                ),
+            )
+            state.waiters.remove(waiter)
+            state.active += 1
+            waiter.future.set_result(None)
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        return {
+            host: {"active": state.active, "queued": len(state.waiters)}
+            for host, state in self._hosts.items()
+        }
+
+
+class ReleasingStream(httpx.AsyncByteStream):
+    """Response stream calling `release` once it is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release) -> None:
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class SchedulerTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper queuing requests in a PriorityScheduler.
+    The slot is held until the response body is closed.
+    """
+
+    def __init__(
+        self,
+        scheduler: PriorityScheduler,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.scheduler = scheduler
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        await self.scheduler.acquire(host)
+
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.scheduler.release(host)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=ReleasingStream(response.stream, release),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+
+from httpx import AsyncClient
+
+from .catalogue import Catalogue
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str, aliases: Mapping[str, str] | None = None) -> str:
+    """
+    Case, accents and whitespace insensitive form of a search query.
+    If the query is one of the `aliases` keys, the alias target is used instead.
+    Only exact matches are aliased: "naruto shippuden" must not share the results of "naruto".
+    """
+    decomposed = unicodedata.normalize("NFKD", query)
+    without_accents = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    )
+    normalized = " ".join(without_accents.casefold().split())
+
+    for alias, target in (aliases or {}).items():
+        if normalize_query(alias) == normalized:
+            return normalize_query(target)
+
+    return normalized
+
+
+class SearchCache:
+    """
+    Bounded LRU cache of search results keyed by normalized query.
+    Results are stored as catalogue dicts so they can be rebuilt with any client
+    and optionally persisted to `path` to be reused between runs.
+    Empty results are cached for `negative_ttl` only.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 256,
+        ttl: float = 3600,
+        negative_ttl: float = 300,
+        aliases: Mapping[str, str] | None = None,
+        path: Path | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.aliases = dict(aliases or {})
+        self.path = path
+
+        self._entries: OrderedDict[str, tuple[float, list[dict]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+        if path is not None:
+            self._load()
+
+    def key(self, site_url: str, query: str) -> str:
+        return f"{site_url}|{normalize_query(query, self.aliases)}"
+
+    def get(
+        self, site_url: str, query: str, client: AsyncClient | None = None
+    ) -> list[Catalogue] | None:
+        key = self.key(site_url, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, stubs = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+
+        return [Catalogue.from_dict(stub, client) for stub in stubs]
+
+    def put(self, site_url: str, query: str, catalogues: list[Catalogue]) -> None:
+        ttl = self.ttl if catalogues else min(self.ttl, self.negative_ttl)
+        if ttl <= 0:
+            return
+
+        stubs = [catalogue.to_dict() for catalogue in catalogues]
+        key = self.key(site_url, query)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, stubs)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+            if self.path is not None:
+                self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self.path is not None:
+                self._save()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        assert self.path is not None
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                entries = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            logger.warning("Cannot read the search cache %s: %s", self.path, error)
+            return
+
+        now = time.time()
+        for key, (expires_at, stubs) in entries[-self.maxsize :]:
+            # Entries written before the versioned catalogue dicts are dropped
+            if expires_at > now and all("version" in stub for stub in stubs):
+                self._entries[key] = (expires_at, stubs)
+
+    def _save(self) -> None:
+        assert self.path is not None
+        temporary_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(list(self._entries.items()), file)
+            os.replace(temporary_path, self.path)
+        except OSError as error:
+            logger.warning("Cannot write the search cache %s: %s", self.path, error)
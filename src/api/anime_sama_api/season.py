@@ -1,21 +1,37 @@
-from ast import literal_eval
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from functools import reduce
-import re
-import asyncio
 
 from httpx import AsyncClient
 
 from .langs import LangId, lang_ids, lang2ids, flagid2lang
 from .episode import Episode, Players, Languages
-from .utils import remove_some_js_comments, zip_varlen, split_and_strip
+from .utils import zip_varlen
+from .single_flight import flights_for
+from .client import make_client
+from . import deadline
+from .serialization import SCHEMA_VERSION, check_version
+from .parsing import (
+    episodes_js_scanner,
+    episodes_list_scanner,
+    flag_vo_scanner,
+    parse_episodes_list,
+    players_from_arrays,
+    players_scanner,
+    scan_response,
+)
+
+# How long (in seconds) the parsed episodes of a season are reused
+EPISODES_TTL = 60
 
 
 @dataclass
 class SeasonLangPage:
     lang_id: LangId
-    html: str = ""
-    episodes_js: str = ""
+    found: bool = False
+    flag_vo: str = ""
+    # Calls following resetListe() in the page, they give the names of the episodes
+    episodes_list: str = ""
+    players: list[list[str]] = field(default_factory=list)
 
 
 class Season:
@@ -32,118 +48,57 @@ class Season:
         self.name = name or url.split("/")[-2]
         self.serie_name = serie_name or url.split("/")[-3]
 
-        self.client = client or AsyncClient()
+        self.client = client or make_client()
+
+        # Episodes restored by from_dict, returned without scraping
+        self._episodes: list[Episode] | None = None
 
     async def get_all_pages(self) -> list[SeasonLangPage]:
+        # Pages are streamed: only the few parts needed are kept, not the whole pages
         async def process_page(lang_id: LangId):
             page_url = self.url + lang_id + "/"
-            response = await self.client.get(page_url)
-
-            if not response.is_success:
-                return SeasonLangPage(lang_id=lang_id)
-
-            html = response.text
-            match_url = re.search(r"episodes\.js\?filever=\d+", html)
-
-            if not match_url:
+            episodes_js_url = episodes_js_scanner()
+            flag_vo = flag_vo_scanner()
+            episodes_list = episodes_list_scanner()
+            async with self.client.stream("GET", page_url) as response:
+                if not response.is_success:
+                    return SeasonLangPage(lang_id=lang_id)
+                await scan_response(response, (episodes_js_url, flag_vo, episodes_list))
+
+            if not episodes_js_url.matches:
                 return SeasonLangPage(lang_id=lang_id)
 
-            episodes_js = await self.client.get(page_url + match_url.group(0))
-
-            if not episodes_js.is_success:
-                return SeasonLangPage(lang_id=lang_id)
+            players = players_scanner()
+            async with self.client.stream(
+                "GET", page_url + episodes_js_url.matches[0]
+            ) as response:
+                if not response.is_success:
+                    return SeasonLangPage(lang_id=lang_id)
+                await scan_response(response, (players,))
 
             return SeasonLangPage(
-                lang_id=lang_id, html=html, episodes_js=episodes_js.text
+                lang_id=lang_id,
+                found=True,
+                flag_vo=flag_vo.matches[0] if flag_vo.matches else "",
+                episodes_list=episodes_list.matches[-1] if episodes_list.matches else "",
+                players=players_from_arrays(players.matches),
             )
 
-        pages = await asyncio.gather(*(process_page(lang_id) for lang_id in lang_ids))
+        pages = await deadline.gather(*(process_page(lang_id) for lang_id in lang_ids))
         pages_dict = {page.lang_id: page for page in pages}
-        if pages_dict["vostfr"].html:
-            flag_id_vo = re.findall(
-                r"src=\".+flag_(.+?)\.png\".*?[\n\t]*<p.*?>VO</p>",
-                remove_some_js_comments(pages_dict["vostfr"].html),
-            )[0]
-
+        flag_id_vo = pages_dict["vostfr"].flag_vo
+        if flag_id_vo:
             for lang_id in lang2ids[flagid2lang[flag_id_vo]]:
-                if not pages_dict[lang_id].html:
+                if not pages_dict[lang_id].found:
                     pages_dict[lang_id] = replace(pages_dict["vostfr"])
                     pages_dict[lang_id].lang_id = lang_id
                     break
 
-        return [value for value in pages_dict.values() if value.html]
-
-    # TODO: Refactor
-    def _get_players_from(self, page: SeasonLangPage) -> list[Players]:
-        players_list = re.findall(
-            r"eps(\d+) ?= ?\[([\W\w]+?)\]", remove_some_js_comments(page.episodes_js)
-        )
-        players_list = sorted(players_list, key=lambda tuple: tuple[0])
-        players_list_links = (
-            re.findall(r"'(.+?)'", player) for _, player in players_list
-        )
-
-        return [Players(players) for players in zip_varlen(*players_list_links)]
-
-    def _get_episodes_names(
-        self, page: SeasonLangPage, number_of_episodes: int, number_of_episodes_max: int
-    ) -> list[str]:
-        functions = re.findall(
-            r"resetListe\(\); *[\n\r]+\t*(.*?)}",
-            page.html,
-            re.DOTALL,
-        )[-1]
-        functions_list = split_and_strip(functions, (";", "\n"))[:-1]
-
-        def padding(n: int):
-            return " " * (len(str(number_of_episodes_max)) - len(str(n)))
-
-        def episode_name_range(*args):
-            return [f"Episode {n}{padding(n)}" for n in range(*args)]
-
-        episodes_name: list[str] = []
-        for function in functions_list:
-            if function.startswith("//"):
-                continue
-
-            call_start = function.find("(")
-            function, args_sting = function[:call_start], function[call_start + 1 : -1]
-            if args_sting:
-                # Warning literal_eval: Can crash
-                args = literal_eval(node_or_string=args_sting + ",")
-            else:
-                args = ()
-
-            match function:
-                case "":
-                    continue
-                case "creerListe":
-                    if len(args) < 2:
-                        # Only seen on Dragon Ball GT (Film), Junji Ito Collection (Saison 1) and Orange (Film)
-                        # Surely a small oversight in anime-sama.fr
-                        # So it is undefined but do nothing is generaly the good reaction
-                        continue
-
-                    episodes_name += episode_name_range(int(args[0]), int(args[1]) + 1)
-                case "finirListe" | "finirListeOP":
-                    if not args:
-                        break
-
-                    episodes_name += episode_name_range(
-                        int(args[0]),
-                        int(args[0]) + number_of_episodes - len(episodes_name),
-                    )
-                    break
-                case "newSP":
-                    episodes_name.append(f"Episode {args[0]}")
-                case "newSPF":
-                    episodes_name.append(args[0])
-                case name:
-                    raise NotImplementedError(
-                        f"Error cannot parse '{name}'.\nPlease report this to the developer."
-                    )
+        return [value for value in pages_dict.values() if value.found]
 
-        return episodes_name
+    @staticmethod
+    def _players_from(players_list: list[list[str]]) -> list[Players]:
+        return [Players(players) for players in zip_varlen(*players_list)]
 
     @staticmethod
     def _extend_episodes(
@@ -172,16 +127,27 @@ class Season:
         return fusion
 
     async def episodes(self) -> list[Episode]:
+        if self._episodes is not None:
+            return list(self._episodes)
+
+        episodes = await flights_for(self.client).do(
+            ("episodes", self.url), self._fetch_episodes, ttl=EPISODES_TTL
+        )
+        return list(episodes)
+
+    async def _fetch_episodes(self) -> list[Episode]:
         pages = await self.get_all_pages()
 
-        players_list = [self._get_players_from(page) for page in pages]
+        players_list = [self._players_from(page.players) for page in pages]
 
         number_of_episodes_max = max(
             len(episodes_page) for episodes_page in players_list
         )
 
         episodes_names = [
-            self._get_episodes_names(page, len(episodes_page), number_of_episodes_max)
+            parse_episodes_list(
+                page.episodes_list, len(episodes_page), number_of_episodes_max
+            )
             for page, episodes_page in zip(pages, players_list)
         ]
 
@@ -200,6 +166,31 @@ class Season:
             for index, (name, languages) in enumerate(episodes, start=1)
         ]
 
+    def to_dict(self, episodes: list[Episode] | None = None) -> dict:
+        """`episodes` (by default the restored ones, if any) are included to be reloaded without scraping."""
+        if episodes is None:
+            episodes = self._episodes
+        data = {
+            "type": "season",
+            "version": SCHEMA_VERSION,
+            "url": self.url,
+            "name": self.name,
+            "serie_name": self.serie_name,
+        }
+        if episodes is not None:
+            data["episodes"] = [episode.to_dict() for episode in episodes]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict, client: AsyncClient | None = None) -> "Season":
+        check_version(data, "season")
+        season = cls(data["url"], data["name"], data["serie_name"], client=client)
+        if "episodes" in data:
+            season._episodes = [
+                Episode.from_dict(episode) for episode in data["episodes"]
+            ]
+        return season
+
     def __repr__(self):
         return f"Season({self.name!r}, {self.serie_name!r})"
 
@@ -0,0 +1,37 @@
+"""
+Versioned plain data form of the models (see the `to_dict`/`from_dict` methods of
+`Catalogue`, `Season` and `Episode`) and its compact binary encoding.
+"""
+
+import json
+import zlib
+
+SCHEMA_VERSION = 1
+
+_MAGIC = b"ASM"
+
+
+def check_version(data: dict, kind: str) -> None:
+    """Raise ValueError if `data` is not a dict of the `kind` model this version can read."""
+    if data.get("type") != kind:
+        raise ValueError(f"Expected a serialized {kind}, got {data.get('type')!r}")
+    if not 1 <= data.get("version", 0) <= SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported schema version {data.get('version')!r} for {kind}, "
+            f"this version reads up to {SCHEMA_VERSION}"
+        )
+
+
+def pack(data: dict) -> bytes:
+    """Compact binary form of the dict of a model."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return _MAGIC + bytes([SCHEMA_VERSION]) + zlib.compress(payload.encode())
+
+
+def unpack(blob: bytes) -> dict:
+    if blob[: len(_MAGIC)] != _MAGIC:
+        raise ValueError("Not a serialized anime-sama model")
+    version = blob[len(_MAGIC)]
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Unsupported schema version {version}")
+    return json.loads(zlib.decompress(blob[len(_MAGIC) + 1 :]))
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial
+from typing import Any, TypeVar
+from weakref import WeakKeyDictionary
+
+from httpx import AsyncClient
+
+from . import deadline
+from .scheduler import SharedPriority, raw_priority, shared_priority
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent operations sharing the same key.
+    The first caller runs the operation, the others await the same task and share its result.
+    The operation runs outside the callers' deadlines: each caller only waits for it
+    within its own budget, a caller with a short budget doesn't fail the others.
+    The operation is only cancelled once every caller waiting for it has given up.
+    Its requests are sent with the highest priority of the callers waiting for it,
+    so a click joining a background prefetch isn't queued behind crawls.
+    A successful result can also be memoized for a short time with `ttl`.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[asyncio.Task, int] = {}
+        self._priorities: dict[asyncio.Task, SharedPriority] = {}
+        self._memo: dict[Hashable, tuple[float, Any]] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[T]], ttl: float = 0
+    ) -> T:
+        memo = self._memo.get(key)
+        if memo is not None:
+            expires_at, value = memo
+            if expires_at > time.monotonic():
+                return value
+            del self._memo[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            priority = SharedPriority(raw_priority())
+            with deadline.detached(), shared_priority(priority):
+                task = asyncio.ensure_future(func())
+            self._priorities[task] = priority
+            self._in_flight[key] = task
+            task.add_done_callback(partial(self._done, key, ttl))
+
+        # Shield so a cancelled caller doesn't cancel the operation for the others
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        level = raw_priority()
+        priority = self._priorities.get(task)
+        if priority is not None:
+            priority.add(level)
+        try:
+            return await deadline.run_within(asyncio.shield(task))
+        except (asyncio.CancelledError, deadline.DeadlineExceeded):
+            if self._waiters[task] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            if priority is not None:
+                priority.remove(level)
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+
+    def _done(self, key: Hashable, ttl: float, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        self._priorities.pop(task, None)
+
+        if ttl <= 0 or task.cancelled() or task.exception() is not None:
+            return
+
+        now = time.monotonic()
+        for memo_key, (expires_at, _) in list(self._memo.items()):
+            if expires_at <= now:
+                del self._memo[memo_key]
+        self._memo[key] = (now + ttl, task.result())
+
+    def forget(self, key: Hashable) -> None:
+        self._memo.pop(key, None)
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+_flights: WeakKeyDictionary[AsyncClient, SingleFlight] = WeakKeyDictionary()
+
+
+def flights_for(client: AsyncClient) -> SingleFlight:
+    """Return the SingleFlight group shared by everything using `client`."""
+    flights = _flights.get(client)
+    if flights is None:
+        flights = _flights[client] = SingleFlight()
+    return flights
@@ -0,0 +1,68 @@
+import httpx
+import pytest
+
+from anime_sama_api.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerTransport,
+    CircuitOpenError,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def make_client(breaker: CircuitBreaker, responses: list[int]) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = responses.pop(0)
+        if status == 0:
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(status)
+
+    return httpx.AsyncClient(
+        transport=CircuitBreakerTransport(breaker, httpx.MockTransport(handler))
+    )
+
+
+@pytest.mark.asyncio
+async def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    client = make_client(breaker, [0, 503, 200])
+
+    with pytest.raises(httpx.ConnectError):
+        await client.get("https://anime-sama.fr/")
+    assert breaker.state("anime-sama.fr") == "closed"
+    await client.get("https://anime-sama.fr/")
+    assert breaker.state("anime-sama.fr") == "open"
+    assert not breaker.is_available("anime-sama.fr")
+
+    with pytest.raises(CircuitOpenError):
+        await client.get("https://anime-sama.fr/")
+    assert breaker.is_available("other.host")
+
+
+@pytest.mark.asyncio
+async def test_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    client = make_client(breaker, [500, 500, 200])
+
+    await client.get("https://anime-sama.fr/")
+    assert breaker.state("anime-sama.fr") == "half-open"
+
+    # A failed probe opens the circuit again
+    await client.get("https://anime-sama.fr/")
+    assert breaker.snapshot()["anime-sama.fr"]["failures"] == 2
+
+    await client.get("https://anime-sama.fr/")
+    assert breaker.state("anime-sama.fr") == "closed"
+    assert breaker.snapshot()["anime-sama.fr"]["failures"] == 0
+
+
+def test_single_probe_when_half_open():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=0)
+    breaker.record_failure("anime-sama.fr")
+
+    breaker.acquire("anime-sama.fr")
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire("anime-sama.fr")
+
+    breaker.release("anime-sama.fr")
+    breaker.acquire("anime-sama.fr")
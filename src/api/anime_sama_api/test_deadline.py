@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+import pytest
+
+from anime_sama_api import deadline
+from anime_sama_api.deadline import DeadlineExceeded, DeadlineTransport
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+def test_nested_deadlines_only_shrink():
+    assert deadline.remaining() is None
+    with deadline.deadline(10):
+        with deadline.deadline(60):
+            assert deadline.remaining() <= 10
+        with deadline.deadline(1):
+            assert deadline.remaining() <= 1
+        with deadline.detached():
+            assert deadline.remaining() is None
+    assert deadline.remaining() is None
+
+
+@pytest.mark.asyncio
+async def test_gather_cancels_outstanding_work():
+    cancelled = 0
+
+    async def slow():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled += 1
+            raise
+
+    with deadline.deadline(0.02):
+        with pytest.raises(DeadlineExceeded):
+            await deadline.gather(slow(), slow())
+    assert cancelled == 2
+
+
+@pytest.mark.asyncio
+async def test_gather_cancelled_when_deadline_already_spent():
+    with deadline.deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            await deadline.gather(asyncio.sleep(1), asyncio.sleep(1))
+    await asyncio.sleep(0)
+
+    current = asyncio.current_task()
+    assert all(task.done() for task in asyncio.all_tasks() if task is not current)
+
+
+@pytest.mark.asyncio
+async def test_transport_shrinks_timeouts():
+    seen_timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_timeouts.append(request.extensions["timeout"])
+        return httpx.Response(200)
+
+    client = httpx.AsyncClient(
+        transport=DeadlineTransport(httpx.MockTransport(handler)), timeout=5
+    )
+
+    await client.get("https://anime-sama.fr/")
+    assert seen_timeouts[-1]["read"] == 5
+
+    with deadline.deadline(1):
+        await client.get("https://anime-sama.fr/")
+    assert all(0 < value <= 1 for value in seen_timeouts[-1].values())
+
+    with deadline.deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            await client.get("https://anime-sama.fr/")
+    assert len(seen_timeouts) == 2
@@ -0,0 +1,81 @@
+import httpx
+import pytest
+
+from anime_sama_api.host_health import HostHealth, HostProber
+
+pytest_plugins = ("pytest_asyncio",)
+
+PLAYERS = [
+    "https://vidmoly.to/embed-1.html",
+    "https://sendvid.com/embed/1",
+    "https://oneupload.to/embed-1.html",
+]
+
+
+def test_unknown_hosts_keep_their_order():
+    assert HostHealth().rank(PLAYERS) == PLAYERS
+
+
+def test_failing_and_slow_hosts_go_last():
+    health = HostHealth()
+    health.record("vidmoly.to", False)
+    health.record("vidmoly.to", False)
+    health.record("sendvid.com", True, 4)
+    health.record("oneupload.to", True, 0.2)
+    assert health.rank(PLAYERS) == [PLAYERS[2], PLAYERS[1], PLAYERS[0]]
+
+    sources = [{"url": url} for url in PLAYERS]
+    assert health.rank(sources, url=lambda source: source["url"])[0] is sources[2]
+
+
+def test_non_finite_latency_is_ignored():
+    health = HostHealth(default_latency=2)
+    health.record("vidmoly.to", True, float("nan"))
+    health.record("vidmoly.to", True, float("inf"))
+    assert health.latency("vidmoly.to") == 2
+    assert health.success_rate("vidmoly.to") == pytest.approx(0.75)
+
+
+def test_observations_decay(monkeypatch):
+    health = HostHealth(half_life=10)
+    now = 1000.0
+    monkeypatch.setattr("anime_sama_api.host_health.time.monotonic", lambda: now)
+    for _ in range(8):
+        health.record("vidmoly.to", False)
+    assert health.success_rate("vidmoly.to") == pytest.approx(0.1)
+
+    now += 1000
+    assert health.success_rate("vidmoly.to") == pytest.approx(0.5, abs=1e-3)
+
+
+def test_reads_do_not_grow_and_idle_hosts_are_forgotten(monkeypatch):
+    health = HostHealth()
+    now = 1000.0
+    monkeypatch.setattr("anime_sama_api.host_health.time.monotonic", lambda: now)
+    health.success_rate("https://vidmoly.to/embed-1.html")
+    assert len(health) == 0
+
+    health.record("vidmoly.to", False)
+    now += 100
+    health.record("sendvid.com", True)
+    assert health.forget_idle(50) == 1
+    assert list(health.snapshot()) == ["sendvid.com"]
+
+
+@pytest.mark.asyncio
+async def test_probe_measures_sampled_hosts():
+    health = HostHealth()
+    health.rank(PLAYERS)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "vidmoly.to":
+            raise httpx.ConnectTimeout("timeout")
+        if request.url.host == "sendvid.com":
+            return httpx.Response(503)
+        return httpx.Response(404)
+
+    await HostProber(
+        health, httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    ).probe()
+    assert health.rank(PLAYERS)[0] == PLAYERS[2]
+    assert health.snapshot()["vidmoly.to"]["success_rate"] < 0.5
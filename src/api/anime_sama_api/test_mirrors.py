@@ -0,0 +1,75 @@
+import httpx
+import pytest
+
+from anime_sama_api.mirrors import MirrorSelector, MirrorTransport
+from anime_sama_api.top_level import AnimeSama
+
+pytest_plugins = ("pytest_asyncio",)
+
+MIRRORS = ["https://anime-sama.fr/", "https://anime-sama.org"]
+
+
+def test_rewrite_to_current_mirror():
+    selector = MirrorSelector(MIRRORS)
+    assert selector.current == "https://anime-sama.fr/"
+
+    selector.record_failure("https://anime-sama.fr/")
+    assert selector.current == "https://anime-sama.org/"
+    assert (
+        str(selector.rewrite("https://anime-sama.fr/catalogue/one-piece/"))
+        == "https://anime-sama.org/catalogue/one-piece/"
+    )
+    assert str(selector.rewrite("https://vidmoly.to/")) == "https://vidmoly.to/"
+
+
+@pytest.mark.asyncio
+async def test_probe_selects_fastest_healthy_mirror():
+    selector = MirrorSelector(MIRRORS + ["https://anime-sama.si/"], marker="Anime-Sama")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == "anime-sama.fr":
+            return httpx.Response(200, text="Domain for sale")
+        return httpx.Response(200, text="Anime-Sama")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    await selector.probe(client)
+    selector.record_success("https://anime-sama.org/", 0.2)
+    selector.record_success("https://anime-sama.si/", 0.01)
+
+    snapshot = selector.snapshot()
+    assert not snapshot["https://anime-sama.fr/"]["healthy"]
+    assert selector.current == "https://anime-sama.si/"
+
+
+@pytest.mark.asyncio
+async def test_transport_fails_over():
+    selector = MirrorSelector(MIRRORS)
+    hosts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hosts.append(request.headers["Host"])
+        if request.url.host == "anime-sama.fr":
+            raise httpx.ConnectError("unreachable")
+        return httpx.Response(200)
+
+    client = httpx.AsyncClient(
+        transport=MirrorTransport(selector, httpx.MockTransport(handler))
+    )
+
+    with pytest.raises(httpx.ConnectError):
+        await client.get("https://anime-sama.fr/catalogue/")
+    await client.get("https://anime-sama.fr/catalogue/")
+    assert hosts == ["anime-sama.fr", "anime-sama.org"]
+
+
+def test_catalogue_links_from_another_mirror():
+    html = """<a href="https://anime-sama.org/catalogue/one-piece/">
+<img src="https://cdn.statically.io/one-piece.jpg">
+<h1>One Piece</h1>
+<p>ワンピース</p>
+<p>Action, Aventure</p>
+<p>Anime, Scans</p>
+<p>VOSTFR, VF</p>
+</a>"""
+    (catalogue,) = AnimeSama("https://anime-sama.fr/")._yield_catalogues_from(html)
+    assert catalogue.url == "https://anime-sama.fr/catalogue/one-piece/"
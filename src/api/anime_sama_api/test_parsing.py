@@ -0,0 +1,131 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import httpx
+import pytest
+
+from anime_sama_api import parsing
+from anime_sama_api.parsing import (
+    PLAYERS_PATTERN,
+    ChunkScanner,
+    CommentStripper,
+    parse_episodes_names,
+    parse_players,
+    parse_seasons,
+    players_from_arrays,
+    players_scanner,
+    run_parser,
+)
+from anime_sama_api.season import Season
+from anime_sama_api.utils import remove_some_js_comments
+
+pytest_plugins = ("pytest_asyncio",)
+
+EPISODES_JS = """var eps2 = ['https://vidmoly.to/embed-2a', 'https://vidmoly.to/embed-2b'];
+/* var eps3 = ['https://old.example/']; */
+var eps1 = ['https://sibnet.ru/1a', 'https://sibnet.ru/1b', 'https://sibnet.ru/1c'];
+"""
+
+SEASON_HTML = """<script>
+resetListe();
+  creerListe(1, 2);
+  newSPF("Film");
+  finirListe(4);
+  afficherListe();
+}
+</script>"""
+
+
+def test_parse_seasons():
+    page = """panneauAnime("Saison 1", "saison1/vostfr");
+/*panneauAnime("Saison 2", "saison2/vostfr");*/
+panneauAnime("Film", "film/vf");"""
+    assert parse_seasons(page) == [("Saison 1", "saison1/"), ("Film", "film/")]
+
+
+def test_parse_players_sorted_by_player():
+    assert parse_players(EPISODES_JS) == [
+        ["https://sibnet.ru/1a", "https://sibnet.ru/1b", "https://sibnet.ru/1c"],
+        ["https://vidmoly.to/embed-2a", "https://vidmoly.to/embed-2b"],
+    ]
+
+
+def test_parse_episodes_names():
+    assert parse_episodes_names(SEASON_HTML, 4, 10) == [
+        "Episode 1 ",
+        "Episode 2 ",
+        "Film",
+        "Episode 4 ",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_run_parser_in_process_pool():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        parsing.set_parse_executor(executor)
+        try:
+            players = await run_parser(parse_players, EPISODES_JS)
+        finally:
+            parsing.set_parse_executor(None)
+    assert players == parse_players(EPISODES_JS)
+
+
+def chunked(text: str, size: int) -> list[str]:
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_comment_stripper_matches_whole_text(size):
+    text = "a/* b */c<!-- d -->e/ * f <!- g -- > h*/i<!--j-->"
+    stripper = CommentStripper()
+    stripped = "".join(stripper.feed(chunk) for chunk in chunked(text, size))
+    assert stripped + stripper.close() == remove_some_js_comments(text)
+
+
+@pytest.mark.parametrize("size", [1, 5, 16, 1000])
+def test_scanner_matches_whole_text(size):
+    text = remove_some_js_comments(EPISODES_JS) + "var steps = ['x'];"
+    scanner = players_scanner()
+    for chunk in chunked(text, size):
+        scanner.feed(chunk)
+    scanner.close()
+    assert players_from_arrays(scanner.matches) == parse_players(EPISODES_JS)
+
+
+def test_scanner_gives_up_on_too_long_match():
+    scanner = ChunkScanner("eps", PLAYERS_PATTERN, r"\]", max_length=10)
+    for chunk in chunked("eps1 = ['" + "x" * 100, 4):
+        scanner.feed(chunk)
+    assert len(scanner._buffer) <= 10
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("in_process_pool", [False, True])
+async def test_season_episodes_from_streamed_pages(in_process_pool):
+    season_html = (
+        '<img src="https://cdn.statically.io/flag_jp.png">\n<p>VO</p>\n'
+        '<script src="episodes.js?filever=42"></script>\n' + SEASON_HTML
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        match request.url.path:
+            case "/catalogue/one-piece/saison1/vostfr/":
+                return httpx.Response(200, text=season_html)
+            case "/catalogue/one-piece/saison1/vostfr/episodes.js":
+                return httpx.Response(200, text=EPISODES_JS)
+        return httpx.Response(404)
+
+    season = Season(
+        "https://anime-sama.fr/catalogue/one-piece/saison1/",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    if in_process_pool:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            parsing.set_parse_executor(executor)
+            try:
+                episodes = await season.episodes()
+            finally:
+                parsing.set_parse_executor(None)
+    else:
+        episodes = await season.episodes()
+    assert [episode.name for episode in episodes] == ["Episode 1", "Episode 2", "Film"]
+    assert {lang for episode in episodes for lang in episode.languages} == {"vostfr", "vj"}
@@ -0,0 +1,95 @@
+import asyncio
+
+import httpx
+import pytest
+
+from anime_sama_api.proxies import ProxyPool, ProxyPoolTransport, sticky_key
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def start_proxy(name: str, delay: float = 0) -> tuple[asyncio.Server, str]:
+    """Stand-in proxy answering every request itself with its name."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        await asyncio.sleep(delay)
+        body = name.encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\nConnection: close\r\n\r\n%s"
+            % (len(body), body)
+        )
+        await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}"
+
+
+def test_sticky_key():
+    assert (
+        sticky_key(httpx.URL("https://anime-sama.fr/catalogue/one-piece/saison1/vf/"))
+        == "anime-sama.fr/catalogue/one-piece"
+    )
+    assert sticky_key(httpx.URL("https://vidmoly.to/embed-x.html")) == "vidmoly.to"
+
+
+@pytest.mark.asyncio
+async def test_round_robin_and_stickiness():
+    servers, urls = zip(*[await start_proxy(f"proxy{i}") for i in range(3)])
+    client = httpx.AsyncClient(transport=ProxyPoolTransport(ProxyPool(list(urls))))
+
+    answers = [
+        (await client.get(f"http://anime-sama.test/catalogue/anime{i}/")).text
+        for i in range(3)
+    ]
+    assert answers == ["proxy0", "proxy1", "proxy2"]
+    response = await client.get("http://anime-sama.test/catalogue/anime1/saison1/")
+    assert response.text == "proxy1"
+
+    for server in servers:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_and_least_loaded():
+    servers, urls = zip(
+        *[await start_proxy(f"proxy{i}", delay=0.05) for i in range(2)]
+    )
+    pool = ProxyPool(list(urls), strategy="least-loaded", max_per_proxy=1)
+    client = httpx.AsyncClient(transport=ProxyPoolTransport(pool))
+
+    answers = await asyncio.gather(
+        *(client.get(f"http://anime-sama.test/catalogue/anime{i}/") for i in range(4))
+    )
+    assert sorted(answer.text for answer in answers) == [
+        "proxy0",
+        "proxy0",
+        "proxy1",
+        "proxy1",
+    ]
+    assert all(stats["active"] == 0 for stats in pool.snapshot().values())
+
+    for server in servers:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_proxy_is_set_aside():
+    server, url = await start_proxy("working")
+    server.close()
+    await server.wait_closed()
+    server, working_url = await start_proxy("working")
+
+    pool = ProxyPool([url, working_url], failure_threshold=1)
+    client = httpx.AsyncClient(transport=ProxyPoolTransport(pool))
+
+    with pytest.raises(httpx.ConnectError):
+        await client.get("http://anime-sama.test/catalogue/anime0/")
+    assert not pool.snapshot()[url]["healthy"]
+    response = await client.get("http://anime-sama.test/catalogue/anime0/")
+    assert response.text == "working"
+
+    server.close()
@@ -0,0 +1,95 @@
+import httpx
+import pytest
+
+from anime_sama_api.retry import (
+    RetryBudget,
+    RetryPolicy,
+    RetryTransport,
+    classify_message,
+    classify_status,
+    parse_retry_after,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+no_wait = RetryPolicy(max_attempts=3, base_delay=0, max_delay=0)
+
+
+def make_client(responses: list, **kwargs) -> tuple[httpx.AsyncClient, list]:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    transport = RetryTransport(httpx.MockTransport(handler), **kwargs)
+    return httpx.AsyncClient(transport=transport), requests
+
+
+def test_classification():
+    assert classify_status(200) is None
+    assert classify_status(429) == "throttled"
+    assert classify_status(503) == "transient"
+    assert classify_status(404) == "skip"
+    assert classify_status(403) == "fatal"
+
+    assert classify_message("HTTPError 404: Not Found") == "skip"
+    assert classify_message("HTTPError 500: Internal Server Error") == "transient"
+    assert classify_message("Read timed out") == "transient"
+    assert classify_message("HTTP Error 429: Too Many Requests") == "throttled"
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
+
+
+def test_backoff_is_bounded():
+    policy = RetryPolicy(base_delay=1, max_delay=4)
+    assert all(0 <= policy.delay(attempt) <= 4 for attempt in range(10))
+    assert policy.delay(0, retry_after=3) == 3
+    assert policy.delay(0, retry_after=60) == 4
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors():
+    client, requests = make_client(
+        [
+            httpx.ConnectError("refused"),
+            httpx.Response(503),
+            httpx.Response(200),
+        ],
+        policy=no_wait,
+    )
+
+    response = await client.get("https://anime-sama.fr/")
+    assert response.status_code == 200
+    assert len(requests) == 3
+
+
+@pytest.mark.asyncio
+async def test_does_not_retry_other_errors():
+    client, requests = make_client([httpx.Response(404)], policy=no_wait)
+    assert (await client.get("https://anime-sama.fr/")).status_code == 404
+
+    client, requests = make_client([httpx.Response(503)], policy=no_wait)
+    assert (await client.post("https://anime-sama.fr/")).status_code == 503
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_budget_limits_retries():
+    budget = RetryBudget(ratio=0, max_tokens=1)
+    client, requests = make_client(
+        [httpx.Response(503)] * 3, policy=no_wait, budget=budget
+    )
+
+    assert (await client.get("https://anime-sama.fr/")).status_code == 503
+    assert len(requests) == 2
+    assert not budget.withdraw("anime-sama.fr")
+    assert budget.withdraw("other.host")
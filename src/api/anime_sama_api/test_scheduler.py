@@ -0,0 +1,113 @@
+import asyncio
+
+import httpx
+import pytest
+
+from anime_sama_api.scheduler import (
+    PriorityScheduler,
+    SchedulerTransport,
+    SharedPriority,
+    priority,
+)
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+async def queue_requests(scheduler: PriorityScheduler, levels: list) -> list:
+    order = []
+
+    async def request(name, level):
+        await scheduler.acquire("anime-sama.fr", level)
+        order.append(name)
+        await asyncio.sleep(0)
+        scheduler.release("anime-sama.fr")
+
+    await scheduler.acquire("anime-sama.fr")
+    tasks = [
+        asyncio.ensure_future(request(name, level)) for name, level in levels
+    ]
+    await asyncio.sleep(0)
+    scheduler.release("anime-sama.fr")
+    await asyncio.gather(*tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_go_first():
+    scheduler = PriorityScheduler(max_per_host=1)
+    order = await queue_requests(
+        scheduler,
+        [("crawl", "crawl"), ("prefetch", "prefetch"), ("click", "interactive")],
+    )
+    assert order == ["click", "prefetch", "crawl"]
+
+
+@pytest.mark.asyncio
+async def test_aging_prevents_starvation():
+    scheduler = PriorityScheduler(max_per_host=1, aging=0.01)
+    await scheduler.acquire("anime-sama.fr")
+    crawl = asyncio.ensure_future(scheduler.acquire("anime-sama.fr", "crawl"))
+    await asyncio.sleep(0.05)
+    click = asyncio.ensure_future(scheduler.acquire("anime-sama.fr", "interactive"))
+    await asyncio.sleep(0)
+
+    scheduler.release("anime-sama.fr")
+    await asyncio.sleep(0)
+    assert crawl.done() and not click.done()
+    scheduler.release("anime-sama.fr")
+    await click
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_frees_its_place():
+    scheduler = PriorityScheduler(max_per_host=1)
+    await scheduler.acquire("anime-sama.fr")
+    waiter = asyncio.ensure_future(scheduler.acquire("anime-sama.fr"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+
+    scheduler.release("anime-sama.fr")
+    assert scheduler.snapshot()["anime-sama.fr"] == {"active": 0, "queued": 0}
+
+
+@pytest.mark.asyncio
+async def test_transport_holds_slot_until_body_is_read():
+    scheduler = PriorityScheduler(max_per_host=1)
+    transport = SchedulerTransport(
+        scheduler, httpx.MockTransport(lambda request: httpx.Response(200, text="ok"))
+    )
+    client = httpx.AsyncClient(transport=transport)
+
+    with priority("crawl"):
+        async with client.stream("GET", "https://anime-sama.fr/") as response:
+            assert scheduler.snapshot()["anime-sama.fr"]["active"] == 1
+            await response.aread()
+    assert scheduler.snapshot()["anime-sama.fr"]["active"] == 0
+
+    assert (await client.get("https://anime-sama.fr/")).text == "ok"
+    assert scheduler.snapshot()["anime-sama.fr"]["active"] == 0
+
+
+@pytest.mark.asyncio
+async def test_queued_shared_request_follows_raised_priority():
+    scheduler = PriorityScheduler(max_per_host=1, aging=1000)
+    shared = SharedPriority("crawl")
+    order = []
+
+    async def request(name, level):
+        await scheduler.acquire("anime-sama.fr", level)
+        order.append(name)
+        scheduler.release("anime-sama.fr")
+
+    await scheduler.acquire("anime-sama.fr")
+    tasks = [
+        asyncio.ensure_future(request("prefetch", "prefetch")),
+        asyncio.ensure_future(request("shared", shared)),
+    ]
+    await asyncio.sleep(0)
+    shared.add("interactive")
+    scheduler.release("anime-sama.fr")
+    await asyncio.gather(*tasks)
+
+    assert order == ["shared", "prefetch"]
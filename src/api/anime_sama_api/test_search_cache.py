@@ -0,0 +1,79 @@
+import time
+
+from anime_sama_api.catalogue import Catalogue
+from anime_sama_api.search_cache import SearchCache, normalize_query
+
+SITE_URL = "https://anime-sama.fr/"
+one_piece = Catalogue(
+    url="https://anime-sama.fr/catalogue/one-piece/",
+    name="One Piece",
+    alternative_names=["ワンピース"],
+    genres=["Action", "Aventure"],
+    categories=["Anime", "Scans"],
+    languages=["VOSTFR", "VF"],
+    image_url="https://cdn.statically.io/gh/Anime-Sama/IMG/img/contenu/one-piece.jpg",
+)
+
+
+def test_normalize_query():
+    assert normalize_query("  One   PIECE ") == "one piece"
+    assert normalize_query("Shingeki no Kyojin: L'Attaque des Titans") == (
+        "shingeki no kyojin: l'attaque des titans"
+    )
+    assert normalize_query("Pokémon") == "pokemon"
+    assert normalize_query(" NARUTO ", {"naruto": "Naruto"}) == "naruto"
+    assert normalize_query("naruto shippuden", {"naruto": "Naruto"}) == "naruto shippuden"
+
+
+def test_alias_only_on_exact_match():
+    cache = SearchCache(aliases={"naruto": "Naruto", "dragon ball": "Dragon Ball"})
+    assert cache.key(SITE_URL, "Naruto Shippuden") != cache.key(SITE_URL, "Naruto")
+    assert cache.key(SITE_URL, "Dragon Ball Super") != cache.key(
+        SITE_URL, "Dragon Ball Daima"
+    )
+
+    cache.put(SITE_URL, "Naruto", [one_piece])
+    assert cache.get(SITE_URL, "Naruto Shippuden") is None
+    assert cache.get(SITE_URL, "naruto") == [one_piece]
+
+
+def test_hit_rebuilds_catalogues():
+    cache = SearchCache()
+    cache.put(SITE_URL, "One Piece", [one_piece])
+
+    cached = cache.get(SITE_URL, "  one piece")
+    assert cached == [one_piece]
+    assert cached[0] is not one_piece
+    assert cache.get(SITE_URL, "naruto") is None
+
+
+def test_lru_eviction():
+    cache = SearchCache(maxsize=2)
+    cache.put(SITE_URL, "a", [one_piece])
+    cache.put(SITE_URL, "b", [one_piece])
+    cache.get(SITE_URL, "a")
+    cache.put(SITE_URL, "c", [one_piece])
+
+    assert cache.get(SITE_URL, "a") is not None
+    assert cache.get(SITE_URL, "b") is None
+    assert len(cache) == 2
+
+
+def test_expiry_and_negative_caching():
+    cache = SearchCache(ttl=0.05, negative_ttl=0.01)
+    cache.put(SITE_URL, "one piece", [one_piece])
+    cache.put(SITE_URL, "nothing", [])
+
+    assert cache.get(SITE_URL, "nothing") == []
+    time.sleep(0.02)
+    assert cache.get(SITE_URL, "nothing") is None
+    assert cache.get(SITE_URL, "one piece") is not None
+    time.sleep(0.04)
+    assert cache.get(SITE_URL, "one piece") is None
+
+
+def test_persistence(tmp_path):
+    path = tmp_path / "search_cache.json"
+    SearchCache(path=path).put(SITE_URL, "One Piece", [one_piece])
+
+    assert SearchCache(path=path).get(SITE_URL, "one piece") == [one_piece]
@@ -0,0 +1,61 @@
+import httpx
+import pytest
+
+from anime_sama_api.catalogue import Catalogue
+from anime_sama_api.episode import Episode, Languages, Players
+from anime_sama_api.season import Season
+from anime_sama_api.serialization import SCHEMA_VERSION, pack, unpack
+
+pytest_plugins = ("pytest_asyncio",)
+
+EPISODE = Episode(
+    Languages(
+        {
+            "vostfr": Players(["https://sibnet.ru/1", "https://vidmoly.to/1"]),
+            "vf": Players(["https://sendvid.com/1"]),
+        }
+    ),
+    "one-piece",
+    "saison1",
+    "Episode 1 ",
+    1,
+)
+
+
+def test_episode_round_trip_keeps_player_order():
+    restored = Episode.from_dict(unpack(pack(EPISODE.to_dict())))
+    assert restored == EPISODE
+    assert restored.languages["vostfr"] == ["https://vidmoly.to/1", "https://sibnet.ru/1"]
+    assert restored.best(["VOSTFR"]) == EPISODE.best(["VOSTFR"])
+
+
+def test_unsupported_version_is_rejected():
+    data = EPISODE.to_dict() | {"version": SCHEMA_VERSION + 1}
+    with pytest.raises(ValueError):
+        Episode.from_dict(data)
+    with pytest.raises(ValueError):
+        Season.from_dict(EPISODE.to_dict())
+
+
+@pytest.mark.asyncio
+async def test_restored_catalogue_is_not_scraped():
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError(f"Unexpected request to {request.url}")
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    catalogue = Catalogue(
+        "https://anime-sama.fr/catalogue/one-piece/",
+        "One Piece",
+        genres=["Action"],
+        languages=["VOSTFR", "VF"],
+    )
+    season = Season(
+        "https://anime-sama.fr/catalogue/one-piece/saison1/", "Saison 1", "one-piece"
+    )
+    data = catalogue.to_dict([Season.from_dict(season.to_dict([EPISODE]))])
+
+    restored = Catalogue.from_dict(unpack(pack(data)), client=client)
+    assert restored.to_dict() == data
+    (restored_season,) = await restored.seasons()
+    assert restored_season.client is client
+    assert await restored_season.episodes() == [EPISODE]
@@ -0,0 +1,160 @@
+import asyncio
+
+import pytest
+
+from anime_sama_api import deadline
+from anime_sama_api.scheduler import current_priority, priority
+from anime_sama_api.single_flight import SingleFlight
+
+pytest_plugins = ("pytest_asyncio",)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_run():
+    flights = SingleFlight()
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(
+        *(flights.do("key", operation) for _ in range(10))
+    )
+
+    assert results == ["result"] * 10
+    assert calls == 1
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_memoization_and_expiry():
+    flights = SingleFlight()
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flights.do("key", operation, ttl=0.05) == 1
+    assert await flights.do("key", operation, ttl=0.05) == 1
+    await asyncio.sleep(0.06)
+    assert await flights.do("key", operation, ttl=0.05) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_but_not_memoized():
+    flights = SingleFlight()
+    calls = 0
+
+    async def operation():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError
+
+    results = await asyncio.gather(
+        flights.do("key", operation, ttl=10),
+        flights.do("key", operation, ttl=10),
+        return_exceptions=True,
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+    assert calls == 1
+
+    with pytest.raises(ValueError):
+        await flights.do("key", operation, ttl=10)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_others():
+    flights = SingleFlight()
+
+    async def operation():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    first = asyncio.ensure_future(flights.do("key", operation))
+    second = asyncio.ensure_future(flights.do("key", operation))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+
+
+@pytest.mark.asyncio
+async def test_operation_cancelled_when_every_caller_is():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    cancelled = False
+
+    async def operation():
+        nonlocal cancelled
+        started.set()
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    callers = [asyncio.ensure_future(flights.do("key", operation)) for _ in range(2)]
+    await started.wait()
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert cancelled
+    assert len(flights) == 0
+
+
+@pytest.mark.asyncio
+async def test_each_caller_keeps_its_own_deadline():
+    flights = SingleFlight()
+    budgets = []
+
+    async def operation():
+        budgets.append(deadline.remaining())
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def call(budget):
+        with deadline.deadline(budget):
+            return await flights.do("key", operation)
+
+    short = asyncio.ensure_future(call(0.01))
+    await asyncio.sleep(0)
+    long = asyncio.ensure_future(call(30))
+
+    with pytest.raises(deadline.DeadlineExceeded):
+        await short
+    assert await long == "result"
+    assert budgets == [None]
+
+
+@pytest.mark.asyncio
+async def test_flight_runs_at_highest_waiter_priority():
+    flights = SingleFlight()
+    joined = asyncio.Event()
+    levels = []
+
+    async def operation():
+        levels.append(current_priority())
+        await joined.wait()
+        levels.append(current_priority())
+
+    async def call(level):
+        with priority(level):
+            await flights.do("key", operation)
+
+    crawl = asyncio.ensure_future(call("crawl"))
+    await asyncio.sleep(0)
+    interactive = asyncio.ensure_future(call("interactive"))
+    await asyncio.sleep(0)
+    joined.set()
+    await asyncio.gather(crawl, interactive)
+
+    assert levels == ["crawl", "interactive"]
@@ -1,26 +1,43 @@
-import asyncio
 from collections.abc import AsyncIterator, Generator
 import re
 
 from httpx import AsyncClient
 
 from .catalogue import Catalogue
+from .client import make_client
+from . import deadline
+from .parsing import CatalogueEntry, parse_catalogue_entries, run_parser
+from .search_cache import SearchCache
+from .single_flight import flights_for
 
 
 class AnimeSama:
-    def __init__(self, site_url: str, client: AsyncClient | None = None) -> None:
+    def __init__(
+        self,
+        site_url: str,
+        client: AsyncClient | None = None,
+        search_cache: SearchCache | None = None,
+    ) -> None:
         self.site_url = site_url
-        self.client = client or AsyncClient()
+        self.client = client or make_client()
+        self.search_cache = search_cache
 
     def _yield_catalogues_from(self, html: str) -> Generator[Catalogue]:
-        text_without_script = re.sub(r"<script[\W\w]+?</script>", "", html)
-        for match in re.finditer(
-            rf"href=\"({self.site_url}catalogue/.+)\"[\W\w]+?src=\"(.+)\"[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<[\W\w]+?>(.*)\n?<",
-            text_without_script,
-        ):
-            url, image_url, name, alternative_names, genres, categories, languages = (
-                match.groups()
+        yield from self._catalogues_from_entries(parse_catalogue_entries(html))
+
+    async def _catalogues_from(self, html: str) -> list[Catalogue]:
+        entries = await run_parser(parse_catalogue_entries, html)
+        return list(self._catalogues_from_entries(entries))
+
+    def _catalogues_from_entries(
+        self, entries: list[CatalogueEntry]
+    ) -> Generator[Catalogue]:
+        for entry in entries:
+            path, image_url, name, alternative_names, genres, categories, languages = (
+                entry
             )
+            # Links can point to another mirror of the site
+            url = self.site_url + path
             alternative_names = (
                 alternative_names.split(", ") if alternative_names else []
             )
@@ -40,13 +57,27 @@ class AnimeSama:
             )
 
     async def search(self, query: str) -> list[Catalogue]:
+        if self.search_cache is not None:
+            cached = self.search_cache.get(self.site_url, query, self.client)
+            if cached is not None:
+                return cached
+
+        catalogues = await flights_for(self.client).do(
+            ("search", self.site_url, query), lambda: self._search(query)
+        )
+
+        if self.search_cache is not None:
+            self.search_cache.put(self.site_url, query, catalogues)
+        return list(catalogues)
+
+    async def _search(self, query: str) -> list[Catalogue]:
         response = (
             await self.client.get(f"{self.site_url}catalogue/?search={query}")
         ).raise_for_status()
 
         last_page = int(re.findall(r"page=(\d+)", response.text)[-1])
 
-        responses = [response] + await asyncio.gather(
+        responses = [response] + await deadline.gather(
             *(
                 self.client.get(f"{self.site_url}catalogue/?search={query}&page={num}")
                 for num in range(2, last_page + 1)
@@ -58,7 +89,7 @@ class AnimeSama:
             if not response.is_success:
                 continue
 
-            catalogues += list(self._yield_catalogues_from(response.text))
+            catalogues += await self._catalogues_from(response.text)
 
         return catalogues
 
@@ -69,7 +100,7 @@ class AnimeSama:
 
         last_page = int(re.findall(r"page=(\d+)", response.text)[-1])
 
-        for catalogue in self._yield_catalogues_from(response.text):
+        for catalogue in await self._catalogues_from(response.text):
             yield catalogue
 
         for number in range(2, last_page + 1):
@@ -80,7 +111,7 @@ class AnimeSama:
             if not response.is_success:
                 continue
 
-            for catalogue in self._yield_catalogues_from(response.text):
+            for catalogue in await self._catalogues_from(response.text):
                 yield catalogue
 
     async def catalogues_iter(self) -> AsyncIterator[Catalogue]:
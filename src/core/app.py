@@ -1,16 +1,25 @@
 import os
 import re
 import json
+import math
 import sys
 import logging
 import datetime
+import time
 import shutil
 import asyncio
+import atexit
+import threading
+import itertools
+import socket
+import unicodedata
+import concurrent.futures
 from pathlib import Path
-from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify, g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
+from itsdangerous import URLSafeTimedSerializer, BadSignature
 import urllib.parse
 
 # Configure logging
@@ -27,6 +36,16 @@ else:
 
 try:
     from anime_sama_api.top_level import AnimeSama
+    from anime_sama_api.single_flight import SingleFlight
+    from anime_sama_api.search_cache import SearchCache, normalize_query
+    from anime_sama_api.circuit_breaker import CircuitBreaker
+    from anime_sama_api.client import make_client
+    from anime_sama_api.scheduler import PriorityScheduler, priority as scraper_priority
+    from anime_sama_api.mirrors import MirrorSelector
+    from anime_sama_api.proxies import ProxyPool
+    from anime_sama_api import deadline as scraper_deadline
+    from anime_sama_api.parsing import set_parse_executor
+    from anime_sama_api.host_health import HostHealth, HostProber
     API_IMPORT_SUCCESS = True
     logger.info("Import de l'API Anime-Sama réussi!")
 except ImportError as e:
@@ -36,6 +55,562 @@ except ImportError as e:
 # URL de base pour l'API Anime-Sama
 ANIME_SAMA_BASE_URL = "https://anime-sama.fr/"
 
+# Miroirs d'Anime-Sama (séparés par des virgules dans ANIME_SAMA_MIRRORS): les requêtes
+# vont au miroir sain le plus rapide, mesuré toutes les MIRROR_PROBE_INTERVAL secondes
+ANIME_SAMA_MIRRORS = [ANIME_SAMA_BASE_URL] + [
+    url.strip() for url in os.environ.get('ANIME_SAMA_MIRRORS', '').split(',') if url.strip()
+]
+MIRROR_PROBE_INTERVAL = 300
+
+# Intervalle (en secondes) de mesure des hébergeurs vidéo (vidmoly, sendvid...) et demi-vie
+# des mesures: les sources du lecteur sont reclassées selon leur disponibilité et leur latence
+EMBED_HOST_PROBE_INTERVAL = 120
+EMBED_HOST_HALF_LIFE = 600
+
+# Télémétrie du lecteur (chargement, échec, rechargement de chaque source): délai (en secondes)
+# au-delà duquel une source qui ne charge pas est signalée en échec, intervalle de prise en compte
+# des signalements dans le classement des sources et nombre maximum de sources en attente
+PLAYER_LOAD_TIMEOUT = 20
+PLAYER_TELEMETRY_FLUSH_INTERVAL = 30
+PLAYER_TELEMETRY_MAX_SOURCES = 5000
+PLAYER_TELEMETRY_EVENTS = ('load', 'failure', 'rebuffer')
+
+# Les signalements portent un jeton signé rendu par le lecteur (source enregistrée et utilisateur),
+# valable PLAYER_TELEMETRY_TOKEN_MAX_AGE secondes; un utilisateur ne peut signaler le même événement
+# pour la même source qu'une fois toutes les PLAYER_TELEMETRY_MIN_INTERVAL secondes. Une source sans
+# signalement depuis PLAYER_TELEMETRY_SOURCE_IDLE secondes est oubliée.
+PLAYER_TELEMETRY_TOKEN_MAX_AGE = 6 * 3600
+PLAYER_TELEMETRY_MIN_INTERVAL = 60
+PLAYER_TELEMETRY_SOURCE_IDLE = 86400
+
+# Proxies de sortie pour le scraping (séparés par des virgules dans SCRAPER_PROXIES, "direct" pour
+# une connexion sans proxy), sélection "round-robin" ou "least-loaded" et requêtes simultanées par proxy
+SCRAPER_PROXIES = [url.strip() for url in os.environ.get('SCRAPER_PROXIES', '').split(',') if url.strip()]
+SCRAPER_PROXY_STRATEGY = os.environ.get('SCRAPER_PROXY_STRATEGY', 'round-robin')
+SCRAPER_REQUESTS_PER_PROXY = 8
+
+# File de téléchargements côté serveur: nombre de téléchargements simultanés (variable
+# DOWNLOAD_WORKERS), nombre maximum de téléchargements en attente par utilisateur et intervalle
+# (en secondes) de mise à jour de la progression en base
+DOWNLOAD_WORKERS = int(os.environ.get('DOWNLOAD_WORKERS', '2'))
+DOWNLOAD_MAX_PENDING_PER_USER = 5
+DOWNLOAD_PROGRESS_INTERVAL = 1
+# Délai maximum (en secondes) entre deux tentatives quand la file est inaccessible (base verrouillée...)
+DOWNLOAD_CLAIM_MAX_BACKOFF = 60
+# Chaque processus signale ses téléchargements en cours toutes les DOWNLOAD_HEARTBEAT_INTERVAL
+# secondes; un téléchargement sans signal depuis DOWNLOAD_HEARTBEAT_TIMEOUT secondes (processus
+# arrêté) est remis en attente
+DOWNLOAD_HEARTBEAT_INTERVAL = 30
+DOWNLOAD_HEARTBEAT_TIMEOUT = 120
+
+# Dossier des épisodes téléchargés et durée (en secondes) de mise en cache par le navigateur:
+# un fichier n'est jamais modifié une fois dans le dossier
+DOWNLOADS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads')
+DOWNLOAD_CACHE_MAX_AGE = 86400
+
+# Envoi des épisodes téléchargés par le proxy frontal plutôt que par Flask (variable DOWNLOAD_SENDFILE):
+# "x-sendfile" (Apache, lighttpd), "x-accel-redirect" (nginx, location interne DOWNLOAD_ACCEL_PREFIX
+# pointant vers DOWNLOADS_DIR) ou vide pour envoyer les fichiers depuis Flask
+DOWNLOAD_SENDFILE = os.environ.get('DOWNLOAD_SENDFILE', '').lower()
+DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/internal-downloads/')
+
+# Délai maximum (en secondes) accordé à un appel de scraping lancé depuis une route
+SCRAPER_CALL_TIMEOUT = 30
+
+# Budget total (en secondes) de scraping d'une requête, tous appels confondus
+ANIME_DETAIL_REQUEST_BUDGET = 30
+PLAYER_REQUEST_BUDGET = 40
+
+# Coupe-circuit vers Anime-Sama: nombre d'échecs consécutifs avant ouverture
+# et délai (en secondes) avant de retenter une requête
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 5
+CIRCUIT_BREAKER_COOLDOWN = 30
+
+# Nombre maximum de requêtes simultanées vers un même hôte; au-delà, les requêtes attendent
+# leur tour par priorité (interactive avant prefetch avant crawl)
+SCRAPER_MAX_REQUESTS_PER_HOST = 8
+
+# Nombre de processus analysant les pages d'Anime-Sama (variable PARSE_PROCESSES); 0 = analyse
+# dans la boucle de scraping. Utile sur les grosses pages de catalogue qui bloquent la boucle;
+# les pages sont alors lues entièrement avant d'être analysées au lieu d'être analysées à la volée.
+PARSE_PROCESSES = int(os.environ.get('PARSE_PROCESSES', '0'))
+
+# Classement des lecteurs vidéo, du préféré au moins préféré: motif de l'URL et nom affiché.
+# Les hébergeurs absents de la liste passent après, dans l'ordre d'Anime-Sama.
+SOURCE_HOSTS = [
+    ("vidmoly.to", "Vidmoly"),
+    ("sendvid.com", "SendVid"),
+    ("oneupload.to", "OneUpload"),
+    ("mixdrop.co", "MixDrop"),
+    ("dood", "DoodStream"),
+    ("drive.google.com", "Google Drive"),
+]
+
+# Langues proposées par le lecteur, la première disponible est choisie par défaut
+PLAYER_LANGUAGES = ["VF", "VOSTFR"]
+
+# Durée (en secondes) au-delà de laquelle les sources d'un épisode sont récupérées à nouveau
+SOURCES_REFRESH_INTERVAL = 86400
+
+# Préchargement de l'épisode suivant pendant le visionnage: budget (en secondes) du scraping
+# en arrière-plan et marge avant expiration à partir de laquelle les sources sont rafraîchies
+NEXT_EPISODE_PREFETCH_BUDGET = 60
+NEXT_EPISODE_PREFETCH_MARGIN = 3600
+
+# Animes "chauds" dont les saisons et les sources sont récupérées en arrière-plan au démarrage puis
+# toutes les HOT_SET_REFRESH_INTERVAL secondes (0 = désactivé): titres imposés (variable HOT_SET_TITLES,
+# séparés par des virgules; par défaut POPULAR_ANIMES) complétés par les plus suivis et les plus
+# mis en favoris, jusqu'à HOT_SET_SIZE animes. Chaque passe récupère au plus HOT_SET_CONCURRENCY
+# animes à la fois, au plus HOT_SET_MAX_FETCHES animes et dispose de HOT_SET_BUDGET secondes.
+HOT_SET_TITLES = [t.strip() for t in os.environ.get('HOT_SET_TITLES', '').split(',') if t.strip()]
+HOT_SET_SIZE = int(os.environ.get('HOT_SET_SIZE', '20'))
+HOT_SET_REFRESH_INTERVAL = int(os.environ.get('HOT_SET_REFRESH_INTERVAL', '21600'))
+HOT_SET_CONCURRENCY = 2
+HOT_SET_MAX_FETCHES = 10
+HOT_SET_BUDGET = 300
+
+# Nombre maximum de saisons d'un même anime récupérées en parallèle
+SEASON_FETCH_CONCURRENCY = 4
+
+# Recherche distante lancée par la route /search: nombre de résultats, timeout (en secondes),
+# durée de réutilisation d'une recherche terminée et nombre maximum de recherches conservées
+REMOTE_SEARCH_LIMIT = 20
+REMOTE_SEARCH_TIMEOUT = 20
+REMOTE_SEARCH_TTL = 600
+REMOTE_SEARCH_MAX_JOBS = 200
+
+# Nombre d'animes conservés dans l'historique des recherches ("Dernières recherches")
+SEARCH_HISTORY_SIZE = 20
+
+# Cache des résultats de recherche d'Anime-Sama: nombre de requêtes conservées,
+# durée de vie (en secondes) et durée de vie d'une recherche sans résultat
+SEARCH_CACHE_SIZE = 512
+SEARCH_CACHE_TTL = 3600
+SEARCH_CACHE_NEGATIVE_TTL = 300
+
+# Requêtes ramenées au nom exact d'un anime populaire (certaines saisons sont sinon introuvables)
+POPULAR_ANIME_QUERIES = {
+    "naruto": "Naruto",
+    "bleach": "Bleach",
+    "one piece": "One Piece",
+    "hunter x hunter": "Hunter x Hunter",
+    "dragon ball": "Dragon Ball"
+}
+
+# Nombre d'animes enrichis (saisons récupérées) en parallèle lors d'une recherche
+SEARCH_ENRICHMENT_CONCURRENCY = 4
+# Budget de temps (en secondes) pour enrichir les résultats d'une recherche
+# (doit rester inférieur à REMOTE_SEARCH_TIMEOUT)
+SEARCH_ENRICHMENT_BUDGET = 5
+
+# Boucle asyncio persistante partagée par toutes les routes
+class ScraperLoop:
+    """
+    Boucle asyncio dédiée qui tourne dans un thread d'arrière-plan.
+    Les routes Flask (synchrones) y soumettent leurs coroutines, ce qui permet
+    de partager un seul client HTTP (et son pool de connexions) entre toutes
+    les requêtes au lieu de recréer une boucle à chaque appel.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is not None and self._thread.is_alive():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=self._run_forever,
+                args=(loop,),
+                name="scraper-loop",
+                daemon=True
+            )
+            thread.start()
+            self._loop = loop
+            self._thread = thread
+            logger.info("Boucle asyncio de scraping démarrée")
+            return loop
+
+    @staticmethod
+    def _run_forever(loop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    @property
+    def loop(self):
+        return self._ensure_started()
+
+    def submit(self, coro):
+        """
+        Planifie une coroutine sur la boucle sans attendre son résultat.
+
+        :param coro: Coroutine à exécuter
+        :return: concurrent.futures.Future du résultat
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """
+        Exécute une coroutine sur la boucle et attend son résultat.
+        Si le délai est dépassé, la tâche est annulée côté boucle.
+
+        :param coro: Coroutine à exécuter
+        :param timeout: Délai maximum en secondes (None = pas de limite)
+        :return: Le résultat de la coroutine
+        :raises TimeoutError: Si le délai est dépassé
+        """
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"Délai de {timeout}s dépassé pour l'appel de scraping")
+
+    def stop(self):
+        with self._lock:
+            if self._loop is None:
+                return
+            if _anime_sama_api is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(
+                        _anime_sama_api.client.aclose(), self._loop
+                    ).result(5)
+                except Exception as e:
+                    logger.warning(f"Fermeture du client HTTP impossible: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(5)
+            self._loop = None
+            self._thread = None
+
+scraper_loop = ScraperLoop()
+atexit.register(scraper_loop.stop)
+
+# Analyse des pages dans des processus séparés (le GIL empêche de le faire dans des threads)
+if API_IMPORT_SUCCESS and PARSE_PROCESSES > 0:
+    parse_executor = concurrent.futures.ProcessPoolExecutor(max_workers=PARSE_PROCESSES)
+    set_parse_executor(parse_executor)
+    atexit.register(parse_executor.shutdown, cancel_futures=True)
+
+# Instance partagée de l'API (un seul client HTTP pour toute l'application)
+_anime_sama_api = None
+_anime_sama_api_lock = threading.Lock()
+
+def get_anime_sama():
+    """
+    Retourne l'instance partagée d'AnimeSama.
+    Elle ne doit être utilisée que depuis la boucle de scraper_loop.
+    """
+    global _anime_sama_api
+    with _anime_sama_api_lock:
+        if _anime_sama_api is None:
+            client = make_client(
+                breaker=scraper_circuit_breaker,
+                scheduler=scraper_request_scheduler,
+                mirrors=scraper_mirrors,
+                proxies=scraper_proxies
+            )
+            _anime_sama_api = AnimeSama(ANIME_SAMA_BASE_URL, client=client, search_cache=search_cache)
+            if len(scraper_mirrors.mirrors) > 1:
+                with scraper_deadline.detached():
+                    spawn_background(probe_mirrors_periodically())
+        return _anime_sama_api
+
+# Sélection du miroir: les URLs d'Anime-Sama déjà enregistrées sont réécrites vers le miroir courant
+scraper_mirrors = MirrorSelector(ANIME_SAMA_MIRRORS, marker="catalogue") if API_IMPORT_SUCCESS else None
+
+# Pool de proxies: le débit augmente avec le nombre de chemins de sortie
+scraper_proxies = ProxyPool(
+    SCRAPER_PROXIES,
+    strategy=SCRAPER_PROXY_STRATEGY,
+    max_per_proxy=SCRAPER_REQUESTS_PER_PROXY
+) if API_IMPORT_SUCCESS and SCRAPER_PROXIES else None
+
+async def probe_mirrors_periodically():
+    """Mesure régulièrement la disponibilité et la latence de chaque miroir."""
+    while True:
+        try:
+            current = await scraper_mirrors.probe()
+            logger.info(f"Miroir Anime-Sama utilisé: {current}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la mesure des miroirs: {e}")
+        await asyncio.sleep(MIRROR_PROBE_INTERVAL)
+
+# État des hébergeurs vidéo, alimenté par les mesures périodiques, les téléchargements
+# et la télémétrie du lecteur
+embed_host_health = HostHealth(half_life=EMBED_HOST_HALF_LIFE) if API_IMPORT_SUCCESS else None
+# Fiabilité de chaque source (clé: URL), alimentée par la télémétrie du lecteur
+source_health = HostHealth(half_life=EMBED_HOST_HALF_LIFE) if API_IMPORT_SUCCESS else None
+# Temps de chargement des lecteurs par hébergeur, mesurés par le navigateur: la page d'intégration
+# complète, sans commune mesure avec les en-têtes mesurés par HostProber, d'où une série à part
+player_host_health = HostHealth(half_life=EMBED_HOST_HALF_LIFE) if API_IMPORT_SUCCESS else None
+_embed_host_prober = None
+_embed_host_prober_lock = threading.Lock()
+
+async def probe_embed_hosts_periodically():
+    """Mesure régulièrement les hébergeurs des sources affichées par le lecteur."""
+    prober = HostProber(embed_host_health)
+    while True:
+        try:
+            await prober.probe()
+        except Exception as e:
+            logger.error(f"Erreur lors de la mesure des hébergeurs vidéo: {e}")
+        await asyncio.sleep(EMBED_HOST_PROBE_INTERVAL)
+
+def rank_by_host_health(sources):
+    """
+    Reclasse des sources selon l'état mesuré de leurs hébergeurs.
+    À état égal (hébergeurs pas encore mesurés), l'ordre de SOURCE_HOSTS est conservé.
+
+    :param sources: Liste de sources {'url', 'host'} déjà classées
+    :return: Nouvelle liste de sources, la meilleure en premier
+    """
+    global _embed_host_prober
+    if embed_host_health is None:
+        return sources
+    with _embed_host_prober_lock:
+        if _embed_host_prober is None:
+            _embed_host_prober = scraper_loop.submit(probe_embed_hosts_periodically())
+    ranked = embed_host_health.rank(sources, url=lambda source: source['url'])
+    # Une source que les lecteurs signalent en échec passe derrière les autres sources fiables
+    return sorted(ranked, key=lambda source: (
+        embed_host_health.score(embed_host_health.host_of(source['url']))
+        / source_health.success_rate(source['url'])
+    ))
+
+def record_download_outcome(video_url, success):
+    """
+    Prend en compte le résultat d'un téléchargement dans l'état de l'hébergeur de la source.
+
+    :param video_url: URL du lecteur téléchargé
+    :param success: True si le fichier a été téléchargé
+    """
+    if embed_host_health is not None:
+        embed_host_health.record(embed_host_health.host_of(video_url), success)
+
+# Signalements du lecteur agrégés en mémoire (clé: URL de la source) jusqu'au prochain flush
+pending_player_telemetry = {}
+player_telemetry_lock = threading.Lock()
+_player_telemetry_flusher = None
+# Dernier signalement accepté, clé: (utilisateur, URL de la source, événement)
+_player_telemetry_last = {}
+
+def make_player_telemetry_token(source_url, user_id):
+    """
+    Signe la source affichée par le lecteur pour un utilisateur: seules les sources
+    rendues par le lecteur peuvent ensuite être signalées.
+
+    :param source_url: URL embed de la source
+    :param user_id: ID de l'utilisateur connecté
+    :return: Jeton à renvoyer avec les signalements
+    """
+    serializer = URLSafeTimedSerializer(app.secret_key, salt='player-telemetry')
+    return serializer.dumps({'source': source_url, 'user': user_id})
+
+def read_player_telemetry_token(token, user_id):
+    """
+    Vérifie un jeton de make_player_telemetry_token.
+
+    :return: URL de la source, ou None si le jeton est invalide, expiré ou d'un autre utilisateur
+    """
+    serializer = URLSafeTimedSerializer(app.secret_key, salt='player-telemetry')
+    try:
+        data = serializer.loads(token, max_age=PLAYER_TELEMETRY_TOKEN_MAX_AGE)
+    except BadSignature:
+        return None
+    if not isinstance(data, dict) or data.get('user') != user_id:
+        return None
+    return data.get('source')
+
+def is_stored_source(episode, source_url):
+    """
+    Indique si une URL embed fait partie des sources enregistrées d'un épisode.
+
+    :param episode: Épisode au format du site
+    :param source_url: URL embed affichée par le lecteur
+    """
+    if any(source['url'] == source_url for sources in get_episode_sources(episode).values() for source in sources):
+        return True
+    return bool(episode.get('video_url')) and get_embed_url(episode['video_url']) == source_url
+
+def allow_player_telemetry(user_id, source_url, event):
+    """
+    Limite les signalements: un même événement pour une même source et un même utilisateur
+    au plus une fois toutes les PLAYER_TELEMETRY_MIN_INTERVAL secondes.
+
+    :return: True si le signalement peut être pris en compte
+    """
+    key = (user_id, source_url, event)
+    now = time.monotonic()
+    with player_telemetry_lock:
+        last = _player_telemetry_last.get(key)
+        if last is not None and now - last < PLAYER_TELEMETRY_MIN_INTERVAL:
+            return False
+        if last is None and len(_player_telemetry_last) >= PLAYER_TELEMETRY_MAX_SOURCES:
+            return False
+        _player_telemetry_last[key] = now
+    return True
+
+def record_player_telemetry(source_url, event, load_ms=None):
+    """
+    Agrège un signalement du lecteur, pris en compte au prochain flush_player_telemetry.
+
+    :param source_url: URL de la source affichée par le lecteur
+    :param event: 'load', 'failure' ou 'rebuffer'
+    :param load_ms: Temps de chargement en millisecondes (événement 'load')
+    :return: False si le signalement a été ignoré (trop de sources en attente)
+    """
+    global _player_telemetry_flusher
+    with player_telemetry_lock:
+        if _player_telemetry_flusher is None:
+            _player_telemetry_flusher = scraper_loop.submit(flush_player_telemetry_periodically())
+        stats = pending_player_telemetry.get(source_url)
+        if stats is None:
+            if len(pending_player_telemetry) >= PLAYER_TELEMETRY_MAX_SOURCES:
+                return False
+            stats = pending_player_telemetry[source_url] = {
+                'loads': 0, 'load_ms': 0, 'failures': 0, 'rebuffers': 0
+            }
+        if event == 'load':
+            stats['loads'] += 1
+            stats['load_ms'] += load_ms or 0
+        else:
+            stats[event + 's'] += 1
+    return True
+
+def flush_player_telemetry():
+    """
+    Prend en compte les signalements agrégés dans l'état des hébergeurs et des sources.
+    Un rechargement compte comme un échec de la source mais pas de l'hébergeur.
+    Le temps de chargement va dans player_host_health, pas dans la latence mesurée de l'hébergeur.
+
+    :return: Nombre de sources mises à jour
+    """
+    global pending_player_telemetry
+    with player_telemetry_lock:
+        pending, pending_player_telemetry = pending_player_telemetry, {}
+        limit = time.monotonic() - PLAYER_TELEMETRY_MIN_INTERVAL
+        for key, last in list(_player_telemetry_last.items()):
+            if last < limit:
+                del _player_telemetry_last[key]
+
+    for source_url, stats in pending.items():
+        host = embed_host_health.host_of(source_url)
+        latency = stats['load_ms'] / stats['loads'] / 1000 if stats['loads'] else None
+        for _ in range(stats['loads']):
+            embed_host_health.record(host, True)
+            player_host_health.record(host, True, latency)
+            source_health.record(source_url, True)
+        for _ in range(stats['failures']):
+            embed_host_health.record(host, False)
+            player_host_health.record(host, False)
+            source_health.record(source_url, False)
+        for _ in range(stats['rebuffers']):
+            source_health.record(source_url, False)
+
+    source_health.forget_idle(PLAYER_TELEMETRY_SOURCE_IDLE)
+    if pending:
+        logger.info(f"Télémétrie du lecteur prise en compte pour {len(pending)} source(s)")
+    return len(pending)
+
+async def flush_player_telemetry_periodically():
+    while True:
+        await asyncio.sleep(PLAYER_TELEMETRY_FLUSH_INTERVAL)
+        try:
+            flush_player_telemetry()
+        except Exception as e:
+            logger.error(f"Erreur lors de la prise en compte de la télémétrie du lecteur: {e}")
+
+# Coupe-circuit par hôte: tant qu'Anime-Sama est en panne, les requêtes échouent immédiatement
+scraper_circuit_breaker = CircuitBreaker(
+    failure_threshold=CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    cooldown=CIRCUIT_BREAKER_COOLDOWN,
+) if API_IMPORT_SUCCESS else None
+
+def scraper_available():
+    """
+    Indique si les routes peuvent interroger Anime-Sama.
+    Si le circuit est ouvert, elles servent directement les données locales.
+    """
+    if not API_IMPORT_SUCCESS:
+        return False
+    return any(
+        scraper_circuit_breaker.is_available(urllib.parse.urlparse(mirror).hostname)
+        for mirror in scraper_mirrors.mirrors
+    )
+
+# File d'attente par priorité: un clic d'utilisateur ne doit jamais attendre derrière un crawl
+scraper_request_scheduler = PriorityScheduler(
+    max_per_host=SCRAPER_MAX_REQUESTS_PER_HOST
+) if API_IMPORT_SUCCESS else None
+
+# Cache des recherches partagé par toutes les requêtes (clé: requête normalisée)
+search_cache = SearchCache(
+    maxsize=SEARCH_CACHE_SIZE,
+    ttl=SEARCH_CACHE_TTL,
+    negative_ttl=SEARCH_CACHE_NEGATIVE_TTL,
+    aliases=POPULAR_ANIME_QUERIES,
+) if API_IMPORT_SUCCESS else None
+
+# Déduplication des opérations de scraping identiques lancées en même temps par plusieurs utilisateurs
+app_flights = SingleFlight() if API_IMPORT_SUCCESS else None
+
+# Références vers les tâches d'arrière-plan pour éviter qu'elles ne soient collectées avant la fin
+_background_tasks = set()
+
+def spawn_background(coro):
+    """
+    Lance une coroutine en arrière-plan sur la boucle courante en conservant une référence.
+    Doit être appelée depuis la boucle de scraping.
+
+    :param coro: Coroutine à exécuter
+    :return: La tâche asyncio créée
+    """
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def set_request_deadline(budget):
+    """
+    Fixe le budget de scraping de la requête Flask en cours.
+    Tous les appels run_async de la requête se partagent ce budget.
+
+    :param budget: Durée maximum en secondes
+    """
+    g.scraper_deadline = time.monotonic() + budget
+
+async def _run_with_deadline(coro, timeout):
+    # Le délai est propagé aux appels HTTP (timeouts réduits) et aux gather de l'API
+    with scraper_deadline.deadline(timeout):
+        return await scraper_deadline.run_within(coro)
+
+def run_async(coro, timeout=None):
+    """
+    Pont synchrone pour exécuter une coroutine de scraping depuis une route Flask.
+    Le délai est réduit au budget restant de la requête (voir set_request_deadline).
+
+    :param coro: Coroutine à exécuter sur la boucle partagée
+    :param timeout: Délai maximum en secondes
+    :return: Le résultat de la coroutine
+    :raises TimeoutError: Si le délai ou le budget de la requête est dépassé
+    """
+    request_deadline = g.get('scraper_deadline') if has_request_context() else None
+    if request_deadline is not None:
+        left = request_deadline - time.monotonic()
+        timeout = left if timeout is None else min(timeout, left)
+
+    if timeout is not None and timeout <= 0:
+        coro.close()
+        raise TimeoutError("Budget de scraping de la requête épuisé")
+
+    if API_IMPORT_SUCCESS:
+        coro = _run_with_deadline(coro, timeout)
+    return scraper_loop.run(coro, timeout=timeout)
+
 # Initialize Flask app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_development")
@@ -51,20 +626,6 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# Liste des animes populaires à précharger au démarrage du serveur
-POPULAR_ANIMES = [
-    {"title": "One Piece", "id": 183},
-    {"title": "Bleach", "id": 168},
-    {"title": "Attack on Titan", "id": 169},
-    {"title": "Death Note", "id": 170},
-    {"title": "Demon Slayer", "id": 171},
-    {"title": "My Hero Academia", "id": 172}, 
-    {"title": "Jujutsu Kaisen", "id": 173},
-    {"title": "Hunter x Hunter", "id": 174},
-    {"title": "Dragon Ball", "id": 166},
-    {"title": "Naruto", "id": 175}
-]
-
 # Dictionnaire global pour stocker les IDs des animes populaires
 POPULAR_ANIME_IDS = {}
 
@@ -137,6 +698,45 @@ class UserFavorite(db.Model):
         db.UniqueConstraint('user_id', 'anime_id'),
     )
 
+# Modèle pour les téléchargements côté serveur, traités en arrière-plan par ordre de priorité
+class DownloadJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    anime_id = db.Column(db.Integer, nullable=False)
+    season_number = db.Column(db.Integer, nullable=False)
+    episode_number = db.Column(db.Integer, nullable=False)
+    video_url = db.Column(db.String(1024), nullable=False)
+    language = db.Column(db.String(16))
+    source = db.Column(db.String(64))  # Hébergeur de la source (Vidmoly, SendVid...)
+    # Entrée du stockage des épisodes téléchargés: les demandes identiques partagent un téléchargement
+    store_key = db.Column(db.String(256), index=True)
+    priority = db.Column(db.Integer, default=0)  # Plus petit = traité en premier
+    status = db.Column(db.String(16), default='queued', index=True)  # queued, running, done, failed
+    progress = db.Column(db.Float, default=0)  # Pourcentage téléchargé
+    error = db.Column(db.String(512))
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    # Processus qui exécute le téléchargement ("hôte:pid") et son dernier signal
+    owner = db.Column(db.String(128))
+    heartbeat_at = db.Column(db.DateTime)
+
+    # Relation avec l'utilisateur
+    user = db.relationship('User', backref=db.backref('download_jobs', lazy='dynamic'))
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': round(self.progress or 0, 1),
+            'error': self.error,
+            'anime_id': self.anime_id,
+            'season_num': self.season_number,
+            'episode_num': self.episode_number,
+            'lang': self.language,
+            'source': self.source,
+        }
+
 @login_manager.user_loader
 def load_user(user_id):
     return User.query.get(int(user_id))
@@ -670,19 +1270,11 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
             logger.error("L'API Anime-Sama n'est pas disponible")
             return []
 
-        # Cas particulier pour les animes populaires qui peuvent avoir des problèmes avec certaines saisons
-        popular_anime_queries = {
-            "naruto": "Naruto",
-            "bleach": "Bleach",
-            "one piece": "One Piece",
-            "hunter x hunter": "Hunter x Hunter",
-            "dragon ball": "Dragon Ball"
-        }
-        
         # Vérifier si la requête correspond à un anime populaire connu
+        # (cas particulier pour les animes qui peuvent avoir des problèmes avec certaines saisons)
         found_popular_anime = None
-        for key, value in popular_anime_queries.items():
-            if key in query.lower():
+        for key, value in POPULAR_ANIME_QUERIES.items():
+            if key in normalize_query(query):
                 found_popular_anime = value
                 logger.info(f"Requête pour un anime populaire détectée: {found_popular_anime}")
                 # Pour les animes populaires, toujours rechercher avec le nom exact
@@ -693,7 +1285,7 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
                 break
 
         logger.info(f"Recherche d'anime via l'API pour: {query} (limite: {limit})")
-        api = AnimeSama(ANIME_SAMA_BASE_URL)
+        api = get_anime_sama()
         results = await api.search(query)
 
         if not results:
@@ -730,9 +1322,13 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
         if current_data:
             next_id = max(int(a.get('id', 0)) for a in current_data) + 1
 
+        # Préparer les entrées, et noter celles dont il faut récupérer les saisons
+        # (position dans anime_list, objet API, entrée, anime populaire)
+        enrichment_jobs = []
         for i, anime in enumerate(filtered_results):
             # Pour les animes populaires, toujours récupérer les saisons pour vérifier la qualité
-            if found_popular_anime and anime.name.lower() == found_popular_anime.lower():
+            is_popular = bool(found_popular_anime) and anime.name.lower() == found_popular_anime.lower()
+            if is_popular:
                 fetch_seasons_for_this_anime = True
                 logger.info(f"Force la récupération des saisons pour {anime.name} (anime populaire)")
             else:
@@ -746,10 +1342,7 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
                 # Mais on vérifie si on doit récupérer les saisons
                 if (fetch_seasons_for_this_anime and not existing_anime.get('seasons_fetched', False)):
                     logger.info(f"Récupération des saisons pour l'anime existant: {existing_anime['title']}")
-                    try:
-                        existing_anime = await fetch_anime_seasons(anime, existing_anime)
-                    except Exception as e:
-                        logger.error(f"Erreur lors de la récupération des saisons pour {existing_anime['title']}: {e}")
+                    enrichment_jobs.append((len(anime_list), anime, existing_anime, False))
                 anime_list.append(existing_anime)
                 continue
 
@@ -796,20 +1389,14 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
 
             # Si demandé ou si c'est un anime populaire, récupérer les saisons et les épisodes
             if fetch_seasons_for_this_anime:
-                try:
-                    anime_entry = await fetch_anime_seasons(anime, anime_entry)
-                    
-                    # Pour les animes populaires, vérifier qu'on a suffisamment de saisons
-                    if found_popular_anime and anime.name.lower() == found_popular_anime.lower():
-                        if len(anime_entry.get('seasons', [])) < 2:
-                            logger.warning(f"Nombre insuffisant de saisons pour {anime.name}: {len(anime_entry.get('seasons', []))}")
-                            # Ne pas ajouter cet anime si c'est un anime populaire avec trop peu de saisons
-                            continue
-                except Exception as e:
-                    logger.error(f"Erreur lors de la récupération des saisons pour {anime.name}: {e}")
+                enrichment_jobs.append((len(anime_list), anime, anime_entry, is_popular))
 
             anime_list.append(anime_entry)
 
+        # Récupérer les saisons en parallèle, dans la limite du budget de temps de la requête
+        if enrichment_jobs:
+            anime_list = await enrich_search_results(anime_list, enrichment_jobs)
+
         logger.info(f"Résultats retournés: {len(anime_list)} animes")
         return anime_list
 
@@ -817,6 +1404,158 @@ async def search_anime_api(query, limit=20, fetch_seasons=False):
         logger.error(f"Erreur lors de la recherche d'anime: {e}")
         return []
 
+def rank_search_result(result, title):
+    """
+    Classe un résultat de recherche de l'API par rapport au titre recherché.
+    Plus la valeur est petite, meilleure est la correspondance:
+    0 = nom exact, 1 = nom alternatif exact, 2 = nom commençant par le titre, 3 = autre.
+
+    :param result: Catalogue renvoyé par l'API
+    :param title: Titre recherché
+    :return: Rang de la correspondance
+    """
+    title = title.strip().lower()
+    name = result.name.strip().lower()
+    if name == title:
+        return 0
+    if any(alt.strip().lower() == title for alt in (result.alternative_names or [])):
+        return 1
+    if name.startswith(title) or title.startswith(name):
+        return 2
+    return 3
+
+async def resolve_api_anime(title_variations):
+    """
+    Recherche toutes les variantes d'un titre en parallèle et renvoie le meilleur résultat.
+    Dès qu'une variante donne une correspondance exacte, les autres recherches sont annulées.
+    Sinon, le résultat le mieux classé (voir rank_search_result) est renvoyé.
+
+    :param title_variations: Variantes du titre, par ordre de préférence
+    :return: Le Catalogue correspondant, ou None si aucune recherche n'a de résultat
+    """
+    api = get_anime_sama()
+
+    async def search_variation(index, title):
+        return index, title, await api.search(title)
+
+    tasks = [
+        asyncio.ensure_future(search_variation(index, title))
+        for index, title in enumerate(dict.fromkeys(title_variations))
+    ]
+
+    # Meilleur candidat: (rang, ordre de la variante, ordre du résultat, résultat)
+    best = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                index, title, search_results = await next_done
+            except Exception as e:
+                logger.error(f"Erreur lors de la recherche d'une variante de titre: {e}")
+                continue
+
+            logger.info(f"Recherche de '{title}' via API: {len(search_results)} résultats trouvés")
+            for position, result in enumerate(search_results):
+                candidate = (rank_search_result(result, title), index, position, result)
+                if best is None or candidate[:3] < best[:3]:
+                    best = candidate
+
+            if best is not None and best[0] == 0:
+                logger.info(f"Correspondance exacte trouvée pour '{title}': {best[3].name}")
+                break
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if best is None:
+        return None
+
+    if best[0] != 0:
+        logger.info(f"Meilleure correspondance utilisée (rang {best[0]}): {best[3].name}")
+    return best[3]
+
+async def enrich_search_results(anime_list, enrichment_jobs):
+    """
+    Récupère les saisons de plusieurs résultats de recherche en parallèle, avec un
+    nombre limité de workers et un budget de temps par requête.
+    Les résultats terminés dans le budget sont renvoyés enrichis. Les autres sont
+    renvoyés tels quels avec le drapeau 'enrichment_pending' et leur récupération
+    continue en arrière-plan pour être enregistrée dans anime.json une fois terminée.
+
+    :param anime_list: Liste des entrées anime de la recherche
+    :param enrichment_jobs: Liste de tuples (position, objet API, entrée, anime populaire)
+    :return: La liste des entrées anime, enrichies quand c'est possible
+    """
+    semaphore = asyncio.Semaphore(SEARCH_ENRICHMENT_CONCURRENCY)
+
+    async def enrich(anime_obj, anime_entry):
+        async with semaphore:
+            return await fetch_anime_seasons(anime_obj, anime_entry)
+
+    tasks = {}
+    # Les enrichissements non terminés continuent en arrière-plan: ils ne doivent pas hériter du délai de l'appelant
+    with scraper_deadline.detached():
+        for position, anime_obj, anime_entry, is_popular in enrichment_jobs:
+            # Travailler sur une copie pour ne pas modifier l'entrée renvoyée pendant son enrichissement
+            task = asyncio.ensure_future(enrich(anime_obj, dict(anime_entry)))
+            tasks[task] = (position, is_popular)
+
+    budget = SEARCH_ENRICHMENT_BUDGET
+    remaining = scraper_deadline.remaining()
+    if remaining is not None:
+        budget = max(0, min(budget, remaining))
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    excluded_positions = set()
+    for task in done:
+        position, is_popular = tasks[task]
+        if task.cancelled() or task.exception() is not None:
+            continue
+
+        enriched_entry = task.result()
+        # Pour les animes populaires, vérifier qu'on a suffisamment de saisons
+        if is_popular and len(enriched_entry.get('seasons', [])) < 2:
+            logger.warning(f"Nombre insuffisant de saisons pour {enriched_entry['title']}: {len(enriched_entry.get('seasons', []))}")
+            # Ne pas ajouter cet anime si c'est un anime populaire avec trop peu de saisons
+            excluded_positions.add(position)
+            continue
+        anime_list[position] = enriched_entry
+
+    for task in pending:
+        position, _ = tasks[task]
+        anime_list[position] = dict(anime_list[position], enrichment_pending=True)
+        task.add_done_callback(_store_background_enrichment)
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+    if pending:
+        logger.info(f"Budget de recherche dépassé: {len(pending)} anime(s) seront complétés en arrière-plan")
+
+    return [anime for position, anime in enumerate(anime_list) if position not in excluded_positions]
+
+def _store_background_enrichment(task):
+    """Callback: enregistre dans anime.json une entrée dont les saisons ont été récupérées en arrière-plan."""
+    if task.cancelled() or task.exception() is not None:
+        return
+    spawn_background(asyncio.to_thread(store_enriched_anime, task.result()))
+
+def store_enriched_anime(anime_entry):
+    """
+    Met à jour dans anime.json l'anime de même titre avec les saisons récupérées.
+    Les IDs locaux de l'anime sont conservés.
+
+    :param anime_entry: Entrée anime enrichie
+    :return: True si l'anime a été trouvé et sauvegardé
+    """
+    anime_entry.pop('enrichment_pending', None)
+    with anime_data_lock:
+        anime_data = load_anime_data()
+        for i, a in enumerate(anime_data):
+            if a.get('title', '').lower() == anime_entry.get('title', '').lower():
+                anime_data[i] = dict(anime_entry, id=a.get('id'), anime_id=a.get('anime_id', a.get('id')))
+                logger.info(f"Saisons récupérées en arrière-plan pour {anime_entry['title']}")
+                return save_anime_data(anime_data)
+    return False
+
 async def fetch_anime_seasons(anime_obj, anime_entry):
     """
     Récupère les saisons, films et épisodes pour un anime.
@@ -853,8 +1592,21 @@ async def fetch_anime_seasons(anime_obj, anime_entry):
         regular_seasons = []
         films = []
 
-        # Pour chaque saison, récupérer les épisodes
-        for i, season in enumerate(seasons):
+        # Récupérer les épisodes de toutes les saisons en parallèle (nombre limité à la fois)
+        semaphore = asyncio.Semaphore(SEASON_FETCH_CONCURRENCY)
+
+        async def fetch_season_episodes(season):
+            async with semaphore:
+                return await season.episodes()
+
+        seasons_episodes = await asyncio.gather(
+            *(fetch_season_episodes(season) for season in seasons),
+            return_exceptions=True
+        )
+
+        # Traiter les saisons dans leur ordre d'origine, une saison en échec n'interrompt pas les autres
+        failed_seasons = []
+        for i, (season, episodes) in enumerate(zip(seasons, seasons_episodes)):
             try:
                 season_name = season.name
                 logger.info(f"Traitement de la saison: {season_name}")
@@ -865,8 +1617,9 @@ async def fetch_anime_seasons(anime_obj, anime_entry):
                     is_film = True
                     logger.info(f"Film détecté: {season_name}")
 
-                # Récupérer les épisodes de cette saison
-                episodes = await season.episodes()
+                # Propager l'erreur éventuelle de la récupération des épisodes de cette saison
+                if isinstance(episodes, BaseException):
+                    raise episodes
 
                 if not episodes:
                     logger.info(f"Aucun épisode trouvé pour la saison: {season_name}")
@@ -906,14 +1659,14 @@ async def fetch_anime_seasons(anime_obj, anime_entry):
                     if has_vf and "VOSTFR" in available_langs:
                         available_langs = ["VF"]
 
-                    # Créer l'entrée d'épisode
+                    # Créer l'entrée d'épisode, avec ses sources déjà classées pour le lecteur
                     episode_data = {
                         'episode_number': j + 1,
                         'title': episode.name,
                         'description': '',
                         'duration': 0,  # Durée inconnue pour l'instant
                         'languages': available_langs,
-                        'urls': {}  # Sera rempli plus tard lors de la lecture
+                        **build_episode_sources(episode)
                     }
 
                     season_data['episodes'].append(episode_data)
@@ -927,6 +1680,12 @@ async def fetch_anime_seasons(anime_obj, anime_entry):
 
             except Exception as e:
                 logger.error(f"Erreur lors du traitement de la saison {season.name}: {e}")
+                failed_seasons.append(season.name)
+
+        # Signaler les saisons en échec sans abandonner le reste de l'anime
+        if failed_seasons:
+            logger.warning(f"{len(failed_seasons)} saison(s) en échec pour {anime_entry['title']}: {failed_seasons}")
+        anime_entry['failed_seasons'] = failed_seasons
 
         # Créer une entrée pour les films si nécessaire
         if films:
@@ -989,11 +1748,7 @@ def search_anime(query, limit=20, fetch_seasons=False):
     :return: Liste des animes trouvés (limitée à 'limit')
     """
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        results = loop.run_until_complete(search_anime_api(query, limit=limit, fetch_seasons=fetch_seasons))
-        loop.close()
-        return results
+        return run_async(search_anime_api(query, limit=limit, fetch_seasons=fetch_seasons))
     except Exception as e:
         logger.error(f"Erreur dans le wrapper de recherche: {e}")
         return []
@@ -1058,6 +1813,229 @@ def save_anime_data(data):
         logger.error(f"Error saving anime data: {e}")
         return False
 
+# Verrou pour éviter que deux threads réécrivent anime.json en même temps
+anime_data_lock = threading.Lock()
+
+def store_anime_entry(anime_id, anime_entry):
+    """
+    Remplace l'entrée d'un anime (par ID) dans anime.json et sauvegarde le fichier.
+
+    :param anime_id: ID de l'anime à remplacer
+    :param anime_entry: Nouvelle entrée anime
+    :return: True si l'anime a été trouvé et sauvegardé
+    """
+    with anime_data_lock:
+        anime_data = load_anime_data()
+        for i, a in enumerate(anime_data):
+            if int(a.get('id', 0)) == anime_id:
+                anime_data[i] = anime_entry
+                return save_anime_data(anime_data)
+    return False
+
+async def fetch_and_store_anime_seasons(anime_id, anime):
+    """
+    Récupère les saisons d'un anime via l'API puis les enregistre dans anime.json.
+    Les appels simultanés pour le même anime partagent une seule exécution
+    (une seule recherche, un seul scraping et une seule écriture du fichier).
+
+    :param anime_id: ID de l'anime
+    :param anime: Entrée anime au format du site
+    :return: L'entrée anime mise à jour, ou None si l'anime est introuvable dans l'API
+    """
+    async def fetch():
+        api = get_anime_sama()
+        search_results = await api.search(anime['title'])
+
+        # Trouver l'anime correspondant dans les résultats
+        api_anime = next((r for r in search_results if r.name.lower() == anime['title'].lower()), None)
+        if not api_anime:
+            return None
+
+        # Récupérer les saisons et épisodes, puis sauvegarder hors de la boucle asyncio
+        updated_anime = await fetch_anime_seasons(api_anime, anime)
+        await asyncio.to_thread(store_anime_entry, anime_id, updated_anime)
+        return updated_anime
+
+    return await app_flights.do(("anime_detail", anime_id), fetch)
+
+# Recherches distantes (API Anime-Sama) lancées en arrière-plan, indexées par requête normalisée
+_remote_searches = {}
+_remote_searches_lock = threading.Lock()
+
+def normalize_search_query(query):
+    """Normalise une requête de recherche (casse et espaces) pour indexer les recherches distantes."""
+    return ' '.join(query.lower().split())
+
+def get_remote_search(query):
+    """
+    Renvoie la recherche distante correspondant à la requête, si elle existe encore.
+
+    :param query: Texte de recherche
+    :return: Dictionnaire {'status', 'results', 'created_at'} ou None
+    """
+    with _remote_searches_lock:
+        return _remote_searches.get(normalize_search_query(query))
+
+def start_remote_search(query):
+    """
+    Lance (ou réutilise) une recherche via l'API en arrière-plan sur la boucle de scraping.
+    Une recherche récente ou en cours pour la même requête normalisée est réutilisée.
+
+    :param query: Texte de recherche
+    :return: Dictionnaire {'status', 'results', 'created_at'} de la recherche
+    """
+    key = normalize_search_query(query)
+    now = time.time()
+
+    with _remote_searches_lock:
+        job = _remote_searches.get(key)
+        if job and (job['status'] == 'pending' or now - job['created_at'] < REMOTE_SEARCH_TTL):
+            return job
+
+        # Oublier les recherches expirées, puis les plus anciennes si la limite est atteinte
+        for old_key, old_job in list(_remote_searches.items()):
+            if old_job['status'] != 'pending' and now - old_job['created_at'] >= REMOTE_SEARCH_TTL:
+                del _remote_searches[old_key]
+        while len(_remote_searches) >= REMOTE_SEARCH_MAX_JOBS:
+            oldest_key = min(_remote_searches, key=lambda k: _remote_searches[k]['created_at'])
+            del _remote_searches[oldest_key]
+
+        job = {'status': 'pending', 'results': [], 'created_at': now}
+        _remote_searches[key] = job
+
+    scraper_loop.submit(_run_remote_search(query, job))
+    return job
+
+async def _run_remote_search(query, job):
+    try:
+        with scraper_deadline.deadline(REMOTE_SEARCH_TIMEOUT):
+            api_results = await scraper_deadline.run_within(
+                search_anime_api(query, limit=REMOTE_SEARCH_LIMIT)
+            )
+        job['results'] = await asyncio.to_thread(store_search_results, api_results)
+        job['status'] = 'done'
+        logger.info(f"Recherche distante terminée pour '{query}': {len(job['results'])} résultats")
+    except Exception as e:
+        logger.error(f"Erreur lors de la recherche API pour '{query}': {e}")
+        job['status'] = 'error'
+
+def store_search_results(api_results):
+    """
+    Prépare les résultats d'une recherche API pour l'affichage et enregistre
+    les nouveaux animes dans le fichier local.
+
+    :param api_results: Résultats renvoyés par search_anime_api
+    :return: Les résultats qui ont des épisodes, prêts à être affichés
+    """
+    results = []
+    for anime in api_results:
+        # Vérifier que l'image existe et est accessible
+        if not anime.get('image_url') or not anime['image_url'].startswith(('http://', 'https://')):
+            # Utiliser une image par défaut
+            anime['image'] = '/static/images/default_anime.jpg'
+        else:
+            # Utiliser l'URL de l'image de l'API
+            anime['image'] = anime['image_url']
+
+        # Vérifier si l'anime a des épisodes avant de l'ajouter
+        # On ne peut pas savoir sans les récupérer, donc on considère qu'un anime sans propriété 'seasons' n'a pas d'épisodes
+        has_episodes = anime.get('seasons') is not None and len(anime.get('seasons', [])) > 0
+        anime['has_episodes'] = has_episodes
+
+        # Vérifier que l'anime a un anime_id
+        if 'anime_id' not in anime or not anime['anime_id']:
+            anime['anime_id'] = anime.get('id', 0)
+
+        # Ne montrer que les animes avec des épisodes dans les résultats
+        if has_episodes:
+            results.append(anime)
+
+    with anime_data_lock:
+        local_data = load_anime_data()
+        existing_titles = [a.get('title', '').lower() for a in local_data]
+        new_animes = [anime for anime in results if anime.get('title', '').lower() not in existing_titles]
+
+        if new_animes:
+            # Sauvegarder les résultats de recherche dans le fichier local (le catalogue n'est jamais tronqué)
+            local_data.extend(new_animes)
+            save_anime_data(local_data)
+
+    record_search_history(results)
+    return results
+
+# Verrou pour éviter que deux threads réécrivent l'historique des recherches en même temps
+search_history_lock = threading.Lock()
+
+def get_search_history_path():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_dir, 'static', 'data', 'search_history.json')
+
+def load_search_history():
+    """
+    Charge l'historique des recherches (du plus récent au plus ancien).
+
+    :return: Liste de dictionnaires {'title', 'searched_at'}
+    """
+    try:
+        with open(get_search_history_path(), 'r', encoding='utf-8') as f:
+            history = json.load(f)
+        return history if isinstance(history, list) else []
+    except FileNotFoundError:
+        return []
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Erreur lors du chargement de l'historique des recherches: {e}")
+        return []
+
+def save_search_history(history):
+    try:
+        json_path = get_search_history_path()
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, indent=4, ensure_ascii=False)
+        return True
+    except OSError as e:
+        logger.error(f"Erreur lors de la sauvegarde de l'historique des recherches: {e}")
+        return False
+
+def record_search_history(animes):
+    """
+    Ajoute des animes en tête de l'historique des recherches.
+    Un anime déjà présent remonte en tête, les plus anciens au-delà de SEARCH_HISTORY_SIZE sont oubliés.
+    Seuls les titres sont conservés: les données restent dans le catalogue.
+
+    :param animes: Animes trouvés par une recherche
+    """
+    titles = []
+    for anime in animes:
+        title = anime.get('title', '')
+        if title and title.lower() not in [t.lower() for t in titles]:
+            titles.append(title)
+    if not titles:
+        return
+
+    with search_history_lock:
+        searched_at = datetime.datetime.now().isoformat()
+        history = [{'title': title, 'searched_at': searched_at} for title in titles]
+        recorded = {title.lower() for title in titles}
+        history.extend(entry for entry in load_search_history()
+                       if entry.get('title', '').lower() not in recorded)
+        save_search_history(history[:SEARCH_HISTORY_SIZE])
+
+def get_recent_searched_animes():
+    """
+    Renvoie les animes de l'historique des recherches qui ont des épisodes,
+    avec leurs données à jour depuis le catalogue.
+
+    :return: Liste d'animes, du plus récent au plus ancien
+    """
+    catalog = {anime.get('title', '').lower(): anime for anime in load_anime_data()}
+    recent_animes = []
+    for entry in load_search_history():
+        anime = catalog.get(entry.get('title', '').lower())
+        if anime and anime.get('has_episodes', False):
+            recent_animes.append(anime)
+    return recent_animes
+
 # Extract unique genres from anime data
 def get_all_genres():
     anime_data = load_anime_data()
@@ -1096,6 +2074,421 @@ def extract_drive_id(url):
     logger.warning(f"Could not extract Google Drive ID from URL: {url}")
     return None
 
+def get_source_host(url):
+    """
+    Retourne le rang et le nom de l'hébergeur d'une source selon SOURCE_HOSTS.
+
+    :param url: URL du lecteur
+    :return: Tuple (rang, nom), les hébergeurs inconnus sont classés en dernier
+    """
+    for rank, (pattern, name) in enumerate(SOURCE_HOSTS):
+        if pattern in url:
+            return rank, name
+    return len(SOURCE_HOSTS), urllib.parse.urlparse(url).hostname or "Autre"
+
+def get_embed_url(url):
+    """
+    Convertit l'URL d'un lecteur au format embed utilisable dans l'iframe du lecteur.
+
+    :param url: URL du lecteur
+    :return: L'URL embed, ou None si elle ne peut pas être déterminée
+    """
+    if "sendvid.com" in url and "/embed/" not in url:
+        video_id = url.split("/")[-1].split(".")[0]
+        return f"https://sendvid.com/embed/{video_id}"
+    if "oneupload.to" in url and "/embed-" not in url:
+        video_id = url.split("/")[-1].split(".")[0]
+        return f"https://oneupload.to/embed-{video_id}.html"
+    if "mixdrop.co" in url and "/e/" not in url:
+        return f"https://mixdrop.co/e/{url.split('/')[-1]}"
+    if "dood" in url and "/e/" not in url:  # doodstream, dood.to, etc.
+        parts = url.split("/")
+        return f"https://{parts[2]}/e/{parts[-1]}"
+    if "drive.google.com" in url:
+        file_id = extract_drive_id(url)
+        return f"https://drive.google.com/file/d/{file_id}/preview" if file_id else None
+    return url or None
+
+def rank_sources(urls):
+    """
+    Classe des URLs de lecteurs selon SOURCE_HOSTS (ordre d'origine conservé à rang égal).
+
+    :param urls: URLs des lecteurs
+    :return: Liste de dictionnaires {'url': URL embed, 'host': nom de l'hébergeur} sans doublon
+    """
+    sources = {}
+    for url in urls:
+        embed_url = get_embed_url(url)
+        if embed_url and embed_url not in sources:
+            sources[embed_url] = get_source_host(embed_url)
+    return [
+        {'url': url, 'host': name}
+        for url, (rank, name) in sorted(sources.items(), key=lambda item: item[1][0])
+    ]
+
+def build_episode_sources(api_episode):
+    """
+    Calcule les champs de sources d'un épisode à partir de l'épisode de l'API Anime-Sama.
+
+    :param api_episode: Episode de l'API Anime-Sama
+    :return: Dictionnaire avec 'sources' (sources classées par langue), 'urls' (meilleure source
+             par langue) et 'last_refreshed'
+    """
+    availables = api_episode.languages.availables
+    sources = {}
+    for lang in PLAYER_LANGUAGES:
+        lang_sources = rank_sources(
+            url for players in availables.get(lang, []) for url in players
+        )
+        if lang_sources:
+            sources[lang] = lang_sources
+    return {
+        'sources': sources,
+        'urls': {lang: lang_sources[0]['url'] for lang, lang_sources in sources.items()},
+        'last_refreshed': int(time.time())
+    }
+
+def get_episode_sources(episode):
+    """
+    Retourne les sources classées d'un épisode, en les calculant pour les épisodes
+    enregistrés avant le classement à l'import (champs 'all_sources' et 'urls').
+
+    :param episode: Épisode au format du site
+    :return: Dictionnaire langue -> sources classées
+    """
+    if 'sources' not in episode:
+        legacy_urls = {}
+        for lang, urls in episode.get('all_sources', {}).items():
+            legacy_urls.setdefault(lang, []).extend(urls)
+        for lang, url in episode.get('urls', {}).items():
+            legacy_urls.setdefault(lang, []).append(url)
+        episode['sources'] = {
+            lang: rank_sources(urls) for lang, urls in legacy_urls.items() if urls
+        }
+    return episode['sources']
+
+def is_episode_sources_stale(episode, margin=0):
+    """
+    Indique si les sources d'un épisode doivent être récupérées (absentes ou trop anciennes).
+
+    :param episode: Épisode au format du site
+    :param margin: Durée (en secondes) avant l'expiration à partir de laquelle elles sont considérées périmées
+    :return: True si les sources doivent être récupérées
+    """
+    if not episode.get('urls'):
+        return True
+    age = int(time.time()) - episode.get('last_refreshed', 0)
+    return age > SOURCES_REFRESH_INTERVAL - margin
+
+def find_api_season(seasons, season_num):
+    """
+    Trouve la saison de l'API correspondant à un numéro de saison du site
+    (99 pour les films).
+
+    :param seasons: Saisons de l'API Anime-Sama
+    :param season_num: Numéro de la saison
+    :return: La saison, ou None
+    """
+    for season in seasons:
+        if season_num == 99:
+            if "Film" in season.name or "Movie" in season.name:
+                return season
+            continue
+        season_match = re.search(r'Saison\s+(\d+)', season.name, re.IGNORECASE)
+        if season_match and int(season_match.group(1)) == season_num:
+            return season
+    return None
+
+async def fetch_api_season_episodes(anime, season_num):
+    """
+    Récupère les épisodes d'une saison d'un anime via l'API Anime-Sama.
+
+    :param anime: Entrée anime au format du site
+    :param season_num: Numéro de la saison (99 pour les films)
+    :return: Liste des Episode de l'API, ou None si l'anime ou la saison est introuvable
+    """
+    # Essayer plusieurs variantes du titre pour les animes sensibles
+    title_variations = [
+        anime['title'],
+        anime.get('original_title', anime['title']),
+        # Cas spécifiques connus
+        "solo leveling" if anime['title'].lower() == "solo leveling" else None
+    ]
+    title_variations = [t for t in title_variations if t]
+    logger.info(f"Tentatives de recherche pour l'anime: {title_variations}")
+
+    # Rechercher l'anime pour avoir l'objet API (toutes les variantes en parallèle)
+    api_anime = await resolve_api_anime(title_variations)
+    if not api_anime:
+        logger.warning(f"Anime {anime['title']} non trouvé dans l'API")
+        return None
+
+    target_season = find_api_season(await api_anime.seasons(), season_num)
+    if not target_season:
+        logger.warning(f"Saison {season_num} non trouvée pour l'anime {anime['title']}")
+        return None
+
+    return await target_season.episodes()
+
+def store_episode_sources(anime_id, season_num, episode_num, sources):
+    """
+    Enregistre les champs de sources d'un épisode (voir build_episode_sources) dans anime.json.
+
+    :param anime_id: ID de l'anime
+    :param season_num: Numéro de la saison
+    :param episode_num: Numéro de l'épisode
+    :param sources: Dictionnaire contenant 'sources', 'urls' et 'last_refreshed'
+    :return: True si l'épisode a été trouvé et sauvegardé
+    """
+    with anime_data_lock:
+        anime_data = load_anime_data()
+        anime = next((a for a in anime_data if int(a.get('anime_id', 0)) == anime_id), None)
+        if not anime:
+            anime = next((a for a in anime_data if int(a.get('id', 0)) == anime_id), None)
+        season = next((s for s in (anime or {}).get('seasons', []) if s.get('season_number') == season_num), None)
+        episode = next((e for e in (season or {}).get('episodes', []) if e.get('episode_number') == episode_num), None)
+        if not episode:
+            return False
+        for key in ('sources', 'urls', 'last_refreshed'):
+            episode[key] = sources[key]
+        return save_anime_data(anime_data)
+
+def find_next_episode(anime, season_num, episode_num):
+    """
+    Trouve l'épisode qui suit: le suivant de la même saison, sinon le premier de la saison suivante.
+
+    :param anime: Entrée anime au format du site
+    :param season_num: Numéro de la saison en cours
+    :param episode_num: Numéro de l'épisode en cours
+    :return: Tuple (numéro de saison, épisode), ou None pour le dernier épisode
+    """
+    seasons = anime.get('seasons', [])
+    for index, season in enumerate(seasons):
+        if season.get('season_number') != season_num:
+            continue
+        episode = next((e for e in season.get('episodes', []) if e.get('episode_number') == episode_num + 1), None)
+        if episode:
+            return season_num, episode
+        for next_season in seasons[index + 1:]:
+            if next_season.get('episodes'):
+                return next_season.get('season_number'), next_season['episodes'][0]
+        return None
+    return None
+
+# Préchargements en cours, clé: (anime_id, saison, épisode)
+_next_episode_prefetches = set()
+_next_episode_prefetches_lock = threading.Lock()
+
+def schedule_next_episode_prefetch(anime_id, anime, season_num, episode_num):
+    """
+    Lance en arrière-plan (priorité basse) la récupération des sources de l'épisode suivant
+    si elles sont absentes ou proches de l'expiration, pour que le clic sur "suivant" soit immédiat.
+
+    :param anime_id: ID de l'anime
+    :param anime: Entrée anime au format du site
+    :param season_num: Numéro de la saison en cours
+    :param episode_num: Numéro de l'épisode en cours
+    :return: True si un préchargement a été lancé
+    """
+    next_episode = find_next_episode(anime, season_num, episode_num)
+    if not API_IMPORT_SUCCESS or next_episode is None:
+        return False
+    next_season_num, episode = next_episode
+    if not is_episode_sources_stale(episode, margin=NEXT_EPISODE_PREFETCH_MARGIN):
+        return False
+
+    key = (anime_id, next_season_num, episode.get('episode_number'))
+    with _next_episode_prefetches_lock:
+        if key in _next_episode_prefetches:
+            return False
+        _next_episode_prefetches.add(key)
+    scraper_loop.submit(prefetch_episode_sources(key, anime))
+    return True
+
+async def prefetch_episode_sources(key, anime):
+    anime_id, season_num, episode_num = key
+    try:
+        if not scraper_available():
+            return
+        # Les requêtes du préchargement passent après celles des utilisateurs
+        with scraper_priority("prefetch"), scraper_deadline.deadline(NEXT_EPISODE_PREFETCH_BUDGET):
+            eps = await scraper_deadline.run_within(fetch_api_season_episodes(anime, season_num))
+        if eps is not None and 0 <= episode_num - 1 < len(eps):
+            sources = build_episode_sources(eps[episode_num - 1])
+            if sources['urls']:
+                await asyncio.to_thread(store_episode_sources, anime_id, season_num, episode_num, sources)
+                logger.info(f"Sources préchargées pour {anime['title']} S{season_num}E{episode_num}")
+    except Exception as e:
+        logger.warning(f"Préchargement de {anime['title']} S{season_num}E{episode_num} impossible: {e}")
+    finally:
+        with _next_episode_prefetches_lock:
+            _next_episode_prefetches.discard(key)
+
+# Dernière passe de préchargement des animes chauds, exposée par /health
+hot_set_status = {'last_run': None, 'animes': 0, 'fetched': 0, 'failed': 0}
+# Dernière tentative de récupération de chaque anime chaud (clé: ID), pour faire tourner les passes
+_hot_set_last_attempt = {}
+_hot_set_warmer = None
+_hot_set_warmer_lock = threading.Lock()
+
+def get_hot_set(anime_data):
+    """
+    Détermine les animes chauds: les titres configurés, puis les animes suivis ou mis en favoris
+    par le plus d'utilisateurs. Doit être appelée dans un contexte d'application Flask.
+
+    :param anime_data: Données de tous les animes (anime.json)
+    :return: Liste d'entrées anime au format du site, au plus HOT_SET_SIZE
+    """
+    titles = HOT_SET_TITLES or [popular['title'] for popular in POPULAR_ANIMES]
+    by_title = {a.get('title', '').lower(): a for a in anime_data}
+    by_id = {}
+    for a in anime_data:
+        by_id.setdefault(int(a.get('anime_id', a.get('id', 0))), a)
+        by_id.setdefault(int(a.get('id', 0)), a)
+
+    # Nombre d'utilisateurs ayant regardé ou mis en favori chaque anime
+    counts = {}
+    for model in (UserProgress, UserFavorite):
+        rows = db.session.query(
+            model.anime_id, db.func.count(db.distinct(model.user_id))
+        ).group_by(model.anime_id).all()
+        for anime_id, users in rows:
+            counts[anime_id] = counts.get(anime_id, 0) + users
+    most_watched = sorted(counts, key=lambda anime_id: counts[anime_id], reverse=True)
+
+    hot_set = []
+    seen = set()
+    candidates = [by_title.get(title.lower()) for title in titles]
+    candidates += [by_id.get(anime_id) for anime_id in most_watched]
+    for anime in candidates:
+        if anime is None or id(anime) in seen:
+            continue
+        seen.add(id(anime))
+        hot_set.append(anime)
+        if len(hot_set) >= HOT_SET_SIZE:
+            break
+    return hot_set
+
+def needs_warmup(anime):
+    """
+    Indique si un anime chaud doit être récupéré: saisons absentes ou sources d'un épisode
+    périmées avant la prochaine passe de préchargement. Un épisode sans sources n'en aura pas
+    davantage à la prochaine récupération: il ne compte pas.
+
+    :param anime: Entrée anime au format du site
+    :return: True si l'anime doit être récupéré
+    """
+    episodes = [e for s in anime.get('seasons', []) for e in s.get('episodes', [])]
+    if not episodes:
+        return True
+    return any(
+        e.get('urls') and is_episode_sources_stale(e, margin=HOT_SET_REFRESH_INTERVAL)
+        for e in episodes
+    )
+
+def load_hot_set():
+    with app.app_context():
+        return get_hot_set(load_anime_data())
+
+async def warm_hot_set():
+    """
+    Récupère les saisons et les sources des animes chauds qui en ont besoin, en priorité basse,
+    dans la limite de HOT_SET_CONCURRENCY, HOT_SET_MAX_FETCHES et HOT_SET_BUDGET.
+    Les animes tentés le moins récemment passent en premier: un anime introuvable ou en échec
+    ne prend pas la place des autres à chaque passe.
+
+    :return: Nombre d'animes récupérés
+    """
+    def anime_id_of(anime):
+        return int(anime.get('anime_id', anime.get('id', 0)))
+
+    hot_set = await asyncio.to_thread(load_hot_set)
+    hot_ids = {anime_id_of(anime) for anime in hot_set}
+    for anime_id in list(_hot_set_last_attempt):
+        if anime_id not in hot_ids:
+            del _hot_set_last_attempt[anime_id]
+    todo = sorted(
+        (anime for anime in hot_set if needs_warmup(anime)),
+        key=lambda anime: _hot_set_last_attempt.get(anime_id_of(anime), 0)
+    )[:HOT_SET_MAX_FETCHES]
+    now = time.time()
+    for anime in todo:
+        _hot_set_last_attempt[anime_id_of(anime)] = now
+    semaphore = asyncio.Semaphore(HOT_SET_CONCURRENCY)
+
+    async def warm(anime):
+        async with semaphore:
+            anime_id = anime_id_of(anime)
+            updated = await scraper_deadline.run_within(fetch_and_store_anime_seasons(anime_id, anime))
+            if updated is None:
+                logger.warning(f"Anime chaud {anime['title']} introuvable dans l'API")
+            return updated is not None
+
+    # Les requêtes du préchargement passent après celles des utilisateurs et de l'épisode suivant
+    with scraper_priority("crawl"), scraper_deadline.deadline(HOT_SET_BUDGET):
+        results = await asyncio.gather(*(warm(anime) for anime in todo), return_exceptions=True)
+    for anime, result in zip(todo, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Préchargement de l'anime chaud {anime['title']} impossible: {result}")
+
+    fetched = sum(1 for result in results if result is True)
+    hot_set_status.update({
+        'last_run': int(time.time()),
+        'animes': len(hot_set),
+        'fetched': fetched,
+        'failed': len(todo) - fetched,
+    })
+    logger.info(f"Animes chauds: {len(hot_set)} suivis, {len(todo)} à récupérer, {fetched} récupérés")
+    return fetched
+
+async def warm_hot_set_periodically():
+    while True:
+        if scraper_available():
+            try:
+                await warm_hot_set()
+            except Exception as e:
+                logger.error(f"Erreur lors du préchargement des animes chauds: {e}")
+        await asyncio.sleep(HOT_SET_REFRESH_INTERVAL)
+
+def start_hot_set_warmup():
+    """
+    Lance le préchargement périodique des animes chauds sur la boucle de scraping,
+    sans attendre son résultat pour ne pas retarder le démarrage du serveur.
+
+    :return: True si le préchargement a été lancé
+    """
+    global _hot_set_warmer
+    if not API_IMPORT_SUCCESS or HOT_SET_REFRESH_INTERVAL <= 0 or HOT_SET_SIZE <= 0:
+        return False
+    with _hot_set_warmer_lock:
+        if _hot_set_warmer is None:
+            _hot_set_warmer = scraper_loop.submit(warm_hot_set_periodically())
+    return True
+
+@app.route('/health')
+def health():
+    """
+    État de l'application et du coupe-circuit vers Anime-Sama (non authentifié, pour la supervision).
+    """
+    circuits = scraper_circuit_breaker.snapshot() if scraper_circuit_breaker else {}
+    queues = scraper_request_scheduler.snapshot() if scraper_request_scheduler else {}
+    mirrors = scraper_mirrors.snapshot() if scraper_mirrors else {}
+    proxies = scraper_proxies.snapshot() if scraper_proxies else {}
+    embed_hosts = embed_host_health.snapshot() if embed_host_health else {}
+    player_hosts = player_host_health.snapshot() if player_host_health else {}
+    degraded = not scraper_available()
+    return jsonify({
+        'status': 'degraded' if degraded else 'ok',
+        'api_available': API_IMPORT_SUCCESS,
+        'circuit_breakers': circuits,
+        'request_queues': queues,
+        'mirrors': mirrors,
+        'proxies': proxies,
+        'embed_hosts': embed_hosts,
+        'player_hosts': player_hosts,
+        'hot_set': hot_set_status
+    })
+
 @app.route('/')
 def index():
     try:
@@ -1328,14 +2721,10 @@ def search():
         query = request.args.get('query', '').lower()
         genre = request.args.get('genre', '').lower()
 
-        # Si la requête est vide ou trop courte, renvoyer directement les résultats locaux (20 derniers)
+        # Si la requête est vide ou trop courte, renvoyer directement les dernières recherches
         if not query or len(query) < 3:
             logger.info("Requête vide ou trop courte, utilisation des données locales uniquement")
-            # Charger les données et prendre les 20 derniers animes ajoutés qui ont des épisodes
-            local_data = load_anime_data()
-            # Filtrer pour ne garder que les animes avec des épisodes
-            filtered_data = [anime for anime in local_data if anime.get('has_episodes', False)]
-            recent_animes = filtered_data[-20:] if len(filtered_data) > 0 else []
+            recent_animes = get_recent_searched_animes()
 
             return render_template('search.html', 
                                 anime_list=[], 
@@ -1345,9 +2734,6 @@ def search():
                                 api_error="Veuillez entrer au moins 3 caractères pour rechercher",
                                 other_anime_list=recent_animes)
 
-        # Définir une limite de temps pour la recherche API
-        api_timeout = 8  # Réduit pour éviter les timeouts
-
         # Nombre maximum de résultats (sans limite)
         MAX_RESULTS = 100  # Augmenté comme demandé
 
@@ -1401,99 +2787,31 @@ def search():
 
         # Préparer la liste des résultats
         merged_results = []
-        local_titles = [anime.get('title', '').lower() for anime in filtered_local]
 
         # D'abord ajouter les résultats locaux
         merged_results.extend(filtered_local)
 
-        # Si une requête est spécifiée et que l'API est disponible, chercher via l'API
-        # pour compléter jusqu'à MAX_RESULTS
-        api_results = []
+        # Si une requête est spécifiée et que l'API est disponible, lancer la recherche via l'API
+        # en arrière-plan: les résultats locaux sont affichés immédiatement et la page récupère
+        # les résultats complémentaires via /api/search-results
         api_error = None
-        remaining_slots = min(20, MAX_RESULTS - len(merged_results))  # Limité à 20 résultats API maximum
+        poll_remote_results = False
+        remaining_slots = min(REMOTE_SEARCH_LIMIT, MAX_RESULTS - len(merged_results))
 
-        if query and API_IMPORT_SUCCESS and remaining_slots > 0:
+        if query and scraper_available() and remaining_slots > 0:
             try:
-                logger.info(f"Recherche via API pour: {query} (limite: {remaining_slots} résultats)")
-
-                # Utiliser asyncio avec timeout pour éviter que l'API ne bloque trop longtemps
-                async def search_with_timeout():
-                    try:
-                        return await asyncio.wait_for(search_anime_api(query, limit=remaining_slots), timeout=api_timeout)
-                    except asyncio.TimeoutError:
-                        logger.error(f"Timeout lors de la recherche API pour: {query}")
-                        return []
-
-                # Exécuter la recherche avec timeout
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                api_results = loop.run_until_complete(search_with_timeout())
-                loop.close()
-
-                # Si des résultats sont trouvés, filtrer par genre si nécessaire
-                if api_results and genre:
-                    api_results = [anime for anime in api_results 
-                                if any(g.lower() == genre for g in anime.get('genres', []))]
-
-                # Limiter les résultats API
-                api_results = api_results[:remaining_slots]
-
-                # Puis ajouter les résultats de l'API qui ne sont pas déjà dans les résultats locaux
-                for anime in api_results:
-                    # Vérifier que l'image existe et est accessible
-                    if not anime.get('image_url') or not anime['image_url'].startswith(('http://', 'https://')):
-                        # Utiliser une image par défaut
-                        anime['image'] = '/static/images/default_anime.jpg'
-                    else:
-                        # Utiliser l'URL de l'image de l'API
-                        anime['image'] = anime['image_url']
-
-                    # Vérifier si l'anime a des épisodes avant de l'ajouter
-                    # On ne peut pas savoir sans les récupérer, donc on considère qu'un anime sans propriété 'seasons' n'a pas d'épisodes
-                    has_episodes = anime.get('seasons') is not None and len(anime.get('seasons', [])) > 0
-                    anime['has_episodes'] = has_episodes
-                    
-                    # Vérifier que l'anime a un anime_id
-                    if 'anime_id' not in anime or not anime['anime_id']:
-                        anime['anime_id'] = anime.get('id', 0)
-                    
-                    # Ne montrer que les animes avec des épisodes dans les résultats
-                    if anime.get('title', '').lower() not in local_titles and has_episodes:
-                        merged_results.append(anime)
-                        local_titles.append(anime.get('title', '').lower())
-
-                        # Sauvegarder les résultats de recherche dans le fichier local 
-                        # Ajouter les nouveaux résultats et conserver jusqu'à 20 animes au total
-                        existing_titles = [a.get('title', '').lower() for a in local_data]
-                        if anime.get('title', '').lower() not in existing_titles:
-                            # Ajouter le nouvel anime à la liste
-                            local_data.append(anime)
-                            # Si on dépasse 20 animes, supprimer les plus anciens
-                            if len(local_data) > 20:  # Limiter à 20 animes maximum au lieu de 15
-                                # Supprimer les plus anciens pour revenir à 20
-                                local_data = local_data[-20:]
-                            # Sauvegarder les changements dans le fichier local
-                            save_anime_data(local_data)
-
-                        # Arrêter si on atteint MAX_RESULTS
-                        if len(merged_results) >= MAX_RESULTS:
-                            break
-
+                logger.info(f"Recherche via API lancée en arrière-plan pour: {query}")
+                job = start_remote_search(query)
+                poll_remote_results = job['status'] == 'pending' or bool(job['results'])
             except Exception as e:
-                logger.error(f"Erreur lors de la recherche API: {e}")
+                logger.error(f"Erreur lors du lancement de la recherche API: {e}")
                 api_error = "Erreur lors de la recherche. Veuillez réessayer avec des termes différents."
 
         logger.info(f"Résultats de recherche: {len(merged_results)} animes trouvés")
 
-        # Si aucun résultat n'est trouvé, fournir les 20 derniers animes recherchés (qui ont des épisodes)
-        other_anime_list = load_anime_data()
-        # Filtrer pour ne garder que les animes avec des épisodes
-        other_anime_list = [anime for anime in other_anime_list if anime.get('has_episodes', False)]
-        # Limiter à 20 derniers animes
-        other_anime_list = other_anime_list[-20:] if len(other_anime_list) > 0 else []
+        # Si aucun résultat n'est trouvé, fournir les derniers animes recherchés (qui ont des épisodes)
         # Si nous avons des résultats, nous n'affichons pas les dernières recherches
-        if merged_results:
-            other_anime_list = []
+        other_anime_list = [] if merged_results else get_recent_searched_animes()
 
         return render_template('search.html', 
                             anime_list=merged_results, 
@@ -1501,16 +2819,17 @@ def search():
                             selected_genre=genre, 
                             genres=get_all_genres(),
                             api_error=api_error,
-                            other_anime_list=other_anime_list)
+                            other_anime_list=other_anime_list,
+                            poll_remote_results=poll_remote_results)
 
     except Exception as e:
         # En cas d'erreur, retourner une page d'erreur claire
         logger.error(f"Erreur critique lors de la recherche: {e}")
-        # Charger les 20 derniers animes recherchés même en cas d'erreur (qui ont des épisodes)
-        other_anime_list = load_anime_data()
-        # Filtrer pour ne garder que les animes avec des épisodes
-        other_anime_list = [anime for anime in other_anime_list if anime.get('has_episodes', False)]
-        other_anime_list = other_anime_list[-20:] if len(other_anime_list) > 0 else []
+        # Charger les derniers animes recherchés même en cas d'erreur (qui ont des épisodes)
+        try:
+            other_anime_list = get_recent_searched_animes()
+        except Exception:
+            other_anime_list = []
 
         return render_template('search.html', 
                               anime_list=[], 
@@ -1520,10 +2839,44 @@ def search():
                               api_error=f"Une erreur s'est produite. Veuillez réessayer plus tard.",
                               other_anime_list=other_anime_list)
 
+@app.route('/api/search-results')
+@login_required
+def search_results_api():
+    """
+    Renvoie l'état et les résultats de la recherche distante lancée par la route /search.
+    La page de recherche interroge cette route jusqu'à ce que le statut ne soit plus 'pending'.
+    """
+    query = request.args.get('query', '').lower()
+    genre = request.args.get('genre', '').lower()
+
+    job = get_remote_search(query)
+    if job is None:
+        return jsonify({'status': 'unknown', 'results': []}), 404
+
+    results = job['results']
+    if genre:
+        results = [anime for anime in results
+                   if any(g.lower() == genre for g in anime.get('genres', []))]
+
+    return jsonify({
+        'status': job['status'],
+        'results': [
+            {
+                'id': anime.get('anime_id') or anime.get('id'),
+                'title': anime.get('title', ''),
+                'image': anime.get('image', ''),
+                'languages': anime.get('languages', [])
+            }
+            for anime in results
+        ]
+    })
+
 @app.route('/anime/<int:anime_id>')
 @login_required
 def anime_detail(anime_id):
     try:
+        set_request_deadline(ANIME_DETAIL_REQUEST_BUDGET)
+
         # S'assurer que les animes populaires sont préchargés
         if not POPULAR_ANIME_IDS:
             preload_popular_animes()
@@ -1592,40 +2945,16 @@ def anime_detail(anime_id):
 
         # Vérifier si les saisons et épisodes ont déjà été récupérés pour cet anime
         # Si non, essayer de les récupérer maintenant
-        if not anime.get('seasons_fetched', False) and API_IMPORT_SUCCESS:
+        if not anime.get('seasons_fetched', False) and scraper_available():
             try:
                 logger.info(f"Récupération des saisons pour l'anime {anime['title']} lors de la consultation")
-                # Rechercher l'anime pour avoir l'objet API
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                api = AnimeSama(ANIME_SAMA_BASE_URL)
-                search_results = loop.run_until_complete(api.search(anime['title']))
-
-                # Trouver l'anime correspondant dans les résultats
-                api_anime = None
-                for result in search_results:
-                    if result.name.lower() == anime['title'].lower():
-                        api_anime = result
-                        break
-
-                if api_anime:
-                    # Récupérer les saisons et épisodes
-                    updated_anime = loop.run_until_complete(fetch_anime_seasons(api_anime, anime))
+                updated_anime = run_async(fetch_and_store_anime_seasons(anime_id, anime), timeout=SCRAPER_CALL_TIMEOUT)
 
-                    # Mettre à jour l'anime dans la liste
-                    for i, a in enumerate(anime_data):
-                        if int(a.get('id', 0)) == anime_id:
-                            anime_data[i] = updated_anime
-                            anime = updated_anime
-                            break
-
-                    # Sauvegarder les modifications
-                    save_anime_data(anime_data)
+                if updated_anime:
+                    anime = updated_anime
                     logger.info(f"Saisons et épisodes récupérés avec succès pour {anime['title']}")
                 else:
                     logger.warning(f"Impossible de trouver l'anime {anime['title']} dans l'API")
-
-                loop.close()
             except Exception as e:
                 logger.error(f"Erreur lors de la récupération des saisons pour {anime['title']}: {e}")
 
@@ -1694,6 +3023,8 @@ def anime_detail(anime_id):
 @login_required
 def player(anime_id, season_num, episode_num):
     try:
+        set_request_deadline(PLAYER_REQUEST_BUDGET)
+
         # Récupérer éventuellement une source spécifique depuis l'URL
         source_url = request.args.get('source', None)
 
@@ -1749,252 +3080,51 @@ def player(anime_id, season_num, episode_num):
             logger.error(f"Episode {episode_num} not found for anime {anime_id}, season {season_num}")
             return render_template('404.html', message=f"Épisode {episode_num} non trouvé"), 404
 
-        # Generate download URL for Google Drive (avec vérification)
-        # Forcer la récupération des URLs de vidéo à chaque fois pour avoir les sources les plus récentes
-        video_urls = episode.get('urls', {})
-        # Forcer un rafraîchissement périodique des sources
-        force_refresh = False
-        if video_urls:
-            # Forcer rafraîchissement toutes les 24h pour garder les sources à jour
-            import time  # Ajout de l'import ici pour s'assurer qu'il est disponible
-            last_refresh = episode.get('last_refreshed', 0)
-            current_time = int(time.time())
-            if current_time - last_refresh > 86400:  # 24 heures
-                force_refresh = True
+        # Récupérer les sources si l'épisode n'en a pas encore ou si elles ont plus de SOURCES_REFRESH_INTERVAL
+        if is_episode_sources_stale(episode):
+            if episode.get('urls'):
                 logger.info(f"Rafraîchissement des sources pour {anime['title']} S{season_num}E{episode_num} (dernière mise à jour il y a plus de 24h)")
+            if scraper_available():
+                try:
+                    logger.info(f"Récupération des URLs vidéo pour l'anime {anime['title']}, saison {season_num}, épisode {episode_num}")
+                    eps = run_async(fetch_api_season_episodes(anime, season_num), timeout=SCRAPER_CALL_TIMEOUT)
+
+                    # Trouver l'épisode correspondant
+                    if eps is not None and 0 <= episode_num - 1 < len(eps):
+                        # Sources classées une fois pour toutes, la sélection ci-dessous n'a plus qu'à lire
+                        episode.update(build_episode_sources(eps[episode_num - 1]))
+                        if episode['urls']:
+                            store_episode_sources(anime_id, season_num, episode_num, episode)
+                            logger.info(f"URLs vidéo récupérées avec succès pour {anime['title']}")
+                    elif eps is not None:
+                        logger.warning(f"Épisode {episode_num} non trouvé dans la saison {season_num} de {anime['title']}")
+                except Exception as e:
+                    logger.error(f"Erreur lors de la récupération des URLs vidéo: {e}")
 
-        # Si on n'a pas d'URLs ou on a besoin de rafraîchir les sources
-        if (not video_urls or force_refresh) and API_IMPORT_SUCCESS:
-            try:
-                logger.info(f"Récupération des URLs vidéo pour l'anime {anime['title']}, saison {season_num}, épisode {episode_num}")
-
-                # Rechercher l'anime pour avoir l'objet API
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                api = AnimeSama(ANIME_SAMA_BASE_URL)
-                
-                # Amélioré: Essayer plusieurs variantes du titre pour les animes sensibles
-                title_variations = [
-                    anime['title'],
-                    anime.get('original_title', anime['title']),
-                    # Cas spécifiques connus
-                    "solo leveling" if anime['title'].lower() == "solo leveling" else None
-                ]
-                
-                # Filtrer les variantes None
-                title_variations = [t for t in title_variations if t]
-                
-                # Journaliser les tentatives
-                logger.info(f"Tentatives de recherche pour l'anime: {title_variations}")
-                
-                api_anime = None
-                for title in title_variations:
-                    search_results = loop.run_until_complete(api.search(title))
-                    logger.info(f"Recherche de '{title}' via API: {len(search_results)} résultats trouvés")
-                    
-                    # Recherche exacte
-                    for result in search_results:
-                        if result.name.lower() == title.lower():
-                            api_anime = result
-                            logger.info(f"Correspondance exacte trouvée pour '{title}': {result.name}")
-                            break
-                    
-                    # Si toujours pas trouvé, essayer une correspondance partielle
-                    if not api_anime and search_results:
-                        # Prendre le premier résultat comme approximation
-                        api_anime = search_results[0]
-                        logger.info(f"Correspondance partielle utilisée pour '{title}': {api_anime.name}")
-                    
-                    if api_anime:
-                        break
-
-                if api_anime:
-                    # Récupérer les saisons
-                    seasons = loop.run_until_complete(api_anime.seasons())
-
-                    # Trouver la saison correspondante (en gérant le cas spécial des films avec numéro 99)
-                    target_season = None
-                    if season_num == 99:  # Cas spécial pour les films
-                        for s in seasons:
-                            if "Film" in s.name or "Movie" in s.name:
-                                target_season = s
-                                break
-                    else:
-                        # Trouver la saison normale par numéro
-                        for s in seasons:
-                            try:
-                                season_match = re.search(r'Saison\s+(\d+)', s.name, re.IGNORECASE)
-                                if season_match and int(season_match.group(1)) == season_num:
-                                    target_season = s
-                                    break
-                            except Exception:
-                                continue
-
-                    if target_season:
-                        # Récupérer les épisodes de cette saison
-                        eps = loop.run_until_complete(target_season.episodes())
-
-                        # Trouver l'épisode correspondant
-                        if 0 <= episode_num - 1 < len(eps):
-                            ep = eps[episode_num - 1]
-
-                            # Récupérer TOUTES les URLs des players disponibles
-                            video_urls = {}
-                            # List des langues dans l'ordre de priorité
-                            langs = ["VF", "VOSTFR"]
-
-                            # Pour chaque langue, récupérer tous les lecteurs disponibles
-                            for lang in langs:
-                                try:
-                                    lang_urls = []
-
-                                    # Récupérer tous les lecteurs pour cette langue
-                                    if lang in ep.languages.availables():
-                                        players = ep.languages[lang]
-                                        if players:
-                                            # Trier les players par ordre de préférence
-                                            # 1. SendVid
-                                            # 2. OneUpload
-                                            # 3. MixDrop 
-                                            # 4. DoodStream
-                                            # 5. Autres non-Vidmoly
-                                            # 6. Vidmoly en dernier recours
-
-                                            # Classifier les players
-                                            vidmoly_urls = [url for url in players if "vidmoly.to" in url]
-                                            sendvid_urls = [url for url in players if "sendvid.com" in url]
-                                            oneupload_urls = [url for url in players if "oneupload.to" in url]
-                                            mixdrop_urls = [url for url in players if "mixdrop.co" in url]
-                                            dood_urls = [url for url in players if "dood" in url]
-                                            other_urls = [url for url in players if "vidmoly.to" not in url and 
-                                                         "sendvid.com" not in url and 
-                                                         "oneupload.to" not in url and 
-                                                         "mixdrop.co" not in url and 
-                                                         "dood" not in url]
-
-                                            # Ajouter les URLs dans l'ordre de préférence (Vidmoly en premier)
-                                            if vidmoly_urls:
-                                                lang_urls.extend(vidmoly_urls)
-                                            if sendvid_urls:
-                                                lang_urls.extend(sendvid_urls)
-                                            if oneupload_urls:
-                                                lang_urls.extend(oneupload_urls)
-                                            if mixdrop_urls:
-                                                lang_urls.extend(mixdrop_urls)
-                                            if dood_urls:
-                                                lang_urls.extend(dood_urls)
-                                            if other_urls:
-                                                lang_urls.extend(other_urls)
-
-                                    # S'il y a des URLs pour cette langue, stocker la meilleure
-                                    if lang_urls:
-                                        video_urls[lang] = lang_urls[0]  # Prendre la meilleure URL (première de la liste triée)
-                                        # Enregistrer toutes les URLs alternatives aussi
-                                        if not 'all_sources' in episode:
-                                            episode['all_sources'] = {}
-                                        episode['all_sources'][lang] = lang_urls
-                                except Exception as e:
-                                    logger.error(f"Erreur lors de la récupération des sources pour {lang}: {e}")
-
-                            # Si aucune URL trouvée, utiliser la méthode simple (fallback)
-                            if not video_urls:
-                                for lang in langs:
-                                    player_url = ep.best([lang])
-                                    if player_url:
-                                        video_urls[lang] = player_url
-
-                            # Mettre à jour l'épisode avec les URLs
-                            if video_urls:
-                                episode['urls'] = video_urls
-
-                                # Mettre à jour l'anime dans la liste et sauvegarder
-                                for i, a in enumerate(anime_data):
-                                    if int(a.get('id', 0)) == anime_id:
-                                        anime_data[i] = anime
-                                        break
-
-                                save_anime_data(anime_data)
-                                logger.info(f"URLs vidéo récupérées avec succès pour {anime['title']}")
-                        else:
-                            logger.warning(f"Épisode {episode_num} non trouvé dans la saison {target_season.name}")
-                    else:
-                        logger.warning(f"Saison {season_num} non trouvée pour l'anime {anime['title']}")
-                else:
-                    logger.warning(f"Anime {anime['title']} non trouvé dans l'API")
+        # Préparer l'épisode suivant pendant le visionnage de celui-ci
+        schedule_next_episode_prefetch(anime_id, anime, season_num, episode_num)
 
-                loop.close()
-            except Exception as e:
-                logger.error(f"Erreur lors de la récupération des URLs vidéo: {e}")
-
-        # Préparer les URLs pour le template
-        # Priorité aux lecteurs autres que Vidmoly
-        # Puis choisir entre VF et VOSTFR
-        video_url = ""
-        vidmoly_url = ""  # Pour stocker l'URL Vidmoly comme fallback
-        episode_lang = "?"  # Variable pour stocker la langue sélectionnée
-
-        if video_urls and isinstance(video_urls, dict):
-            # Récupérer toutes les URLs disponibles et les trier par langue et qualité
-            vf_urls = []
-            vostfr_urls = []
-
-            # Récupérer toutes les sources alternatives si disponibles
-            if episode.get('all_sources'):
-                if 'VF' in episode['all_sources']:
-                    vf_urls.extend(episode['all_sources']['VF'])
-                if 'VOSTFR' in episode['all_sources']:
-                    vostfr_urls.extend(episode['all_sources']['VOSTFR'])
-
-            # Ajouter aussi les URLs principales
-            if 'VF' in video_urls:
-                if video_urls['VF'] not in vf_urls:
-                    vf_urls.append(video_urls['VF'])
-            if 'VOSTFR' in video_urls:
-                if video_urls['VOSTFR'] not in vostfr_urls:
-                    vostfr_urls.append(video_urls['VOSTFR'])
-
-            # Filtrer les URLs par source (Vidmoly en premier maintenant)
-            vf_vidmoly = [url for url in vf_urls if "vidmoly.to" in url]
-            vf_non_vidmoly = [url for url in vf_urls if "vidmoly.to" not in url]
-            vostfr_vidmoly = [url for url in vostfr_urls if "vidmoly.to" in url]
-            vostfr_non_vidmoly = [url for url in vostfr_urls if "vidmoly.to" not in url]
-
-            # Sélectionner la meilleure URL disponible (priorité Vidmoly et VF)
-            video_url = ""
-            if vf_vidmoly:
-                video_url = vf_vidmoly[0]
-                episode_lang = "VF"
-            elif vf_non_vidmoly:
-                video_url = vf_non_vidmoly[0]
-                episode_lang = "VF"
-            elif vostfr_vidmoly:
-                video_url = vostfr_vidmoly[0]
-                episode_lang = "VOSTFR"
-            elif vostfr_non_vidmoly:
-                video_url = vostfr_non_vidmoly[0]
-                episode_lang = "VOSTFR"
-
-
-        # Si une langue spécifique a été demandée via le paramètre d'URL
+        # Sélection de la source: première source classée de la langue demandée,
+        # sinon de la première langue disponible dans l'ordre de PLAYER_LANGUAGES
+        sources = {
+            lang: rank_by_host_health(lang_sources)
+            for lang, lang_sources in get_episode_sources(episode).items()
+        }
         preferred_lang = request.args.get('lang')
-        if preferred_lang in ['VF', 'VOSTFR']:
-            # Vérifier si cette langue est disponible
-            if episode.get('all_sources') and preferred_lang in episode.get('all_sources'):
-                # Utiliser la première source disponible pour cette langue
-                if episode['all_sources'][preferred_lang]:
-                    video_url = episode['all_sources'][preferred_lang][0]
-                    episode_lang = preferred_lang
-                    logger.info(f"Utilisation de la langue demandée: {preferred_lang}")
-        
+        languages = PLAYER_LANGUAGES
+        if preferred_lang in PLAYER_LANGUAGES:
+            languages = [preferred_lang] + PLAYER_LANGUAGES
+        episode_lang = next((lang for lang in languages if sources.get(lang)), "?")
+        video_url = sources[episode_lang][0]['url'] if episode_lang != "?" else ""
+
         # Si une source spécifique a été demandée via le paramètre d'URL
         if source_url:
             video_url = source_url
             # Détecter la langue utilisée
-            if episode.get('all_sources'):
-                for lang, urls in episode.get('all_sources', {}).items():
-                    if source_url in urls:
-                        episode_lang = lang
-                        break
+            for lang, lang_sources in sources.items():
+                if any(source['url'] == source_url for source in lang_sources):
+                    episode_lang = lang
+                    break
             logger.info(f"Utilisation d'une source spécifique: {video_url} (langue: {episode_lang})")
 
         # Si pas d'URL trouvée via API, essayer l'ancienne méthode
@@ -2020,66 +3150,8 @@ def player(anime_id, season_num, episode_num):
                     break
             save_anime_data(anime_data)
 
-        # Préparer l'URL de téléchargement/lecture selon la source
-        download_url = "#"
-
-        # Liste des lecteurs par ordre de préférence (Vidmoly prioritaire)
-        # 1. Vidmoly
-        # 2. SendVid
-        # 3. OneUpload
-        # 4. MixDrop
-        # 5. DoodStream
-        # 6. Google Drive
-        # 7. Autres
-
-        if "sendvid.com" in video_url:
-            # Pour SendVid, on utilise le format embed
-            if "/embed/" not in video_url:
-                video_id = video_url.split("/")[-1].split(".")[0]
-                download_url = f"https://sendvid.com/embed/{video_id}"
-            else:
-                download_url = video_url
-
-        elif "oneupload.to" in video_url:
-            # Pour OneUpload, on s'assure d'avoir le format embed
-            if "/embed-" not in video_url:
-                video_id = video_url.split("/")[-1].split(".")[0]
-                download_url = f"https://oneupload.to/embed-{video_id}.html"
-            else:
-                download_url = video_url
-
-        elif "mixdrop.co" in video_url:
-            # Pour MixDrop, on s'assure d'avoir le format embed
-            if "/e/" not in video_url:
-                video_id = video_url.split("/")[-1]
-                download_url = f"https://mixdrop.co/e/{video_id}"
-            else:
-                download_url = video_url
-
-        elif "dood" in video_url:  # doodstream, dood.to, etc.
-            # Pour DoodStream, on s'assure d'avoir le format embed
-            if "/e/" not in video_url:
-                parts = video_url.split("/")
-                video_id = parts[-1]
-                domain = ".".join(parts[2].split(".")[-2:])
-                download_url = f"https://dood.{domain}/e/{video_id}"
-            else:
-                download_url = video_url
-
-        elif "drive.google.com" in video_url:
-            # Pour Google Drive, on extrait l'ID et on construit l'URL embed
-            file_id = extract_drive_id(video_url)
-            if file_id:
-                download_url = f"https://drive.google.com/file/d/{file_id}/preview"
-
-        elif "vidmoly.to" in video_url:
-            # Pour Vidmoly, on utilise l'URL directe sans modification
-            logger.warning(f"Vidmoly détecté, utilisation directe: {video_url}")
-            download_url = video_url
-
-        else:
-            # Pour les autres sources, on utilise l'URL directement
-            download_url = video_url
+        # Les sources classées sont déjà au format embed, seule l'URL de secours doit être convertie
+        download_url = get_embed_url(video_url) or "#"
 
         # Si l'URL est toujours invalide, on renvoie une erreur
         if not download_url or download_url == "#":
@@ -2118,11 +3190,19 @@ def player(anime_id, season_num, episode_num):
                 time_position = 0
                 is_favorite = False
 
+        # Seules les sources enregistrées peuvent être signalées (pas une URL passée dans ?source=)
+        telemetry_token = None
+        if current_user.is_authenticated and is_stored_source(episode, download_url):
+            telemetry_token = make_player_telemetry_token(download_url, current_user.id)
+
         return render_template('player.html', 
                             anime=anime, 
                             season=season, 
                             episode=episode, 
+                            sources=sources,
                             download_url=download_url,
+                            telemetry_token=telemetry_token,
+                            player_load_timeout=PLAYER_LOAD_TIMEOUT,
                             time_position=time_position,
                             is_favorite=is_favorite,
                             episode_lang=episode_lang)
@@ -2407,6 +3487,44 @@ def remove_from_watching():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 400
 
+@app.route('/api/player-telemetry', methods=['POST'])
+@login_required
+def player_telemetry():
+    """
+    Reçoit les signalements du lecteur (navigator.sendBeacon): chargement d'une source
+    avec sa durée, échec de chargement ou rechargement demandé par l'utilisateur.
+    La source est celle du jeton signé rendu par le lecteur.
+    """
+    data = request.get_json(force=True, silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Signalement invalide'}), 400
+    token = data.get('token')
+    event = data.get('event')
+    if not isinstance(token, str) or len(token) > 2000 or event not in PLAYER_TELEMETRY_EVENTS:
+        return jsonify({'error': 'Signalement invalide'}), 400
+    source_url = read_player_telemetry_token(token, current_user.id)
+    if not source_url:
+        return jsonify({'error': 'Signalement invalide'}), 400
+    if embed_host_health is None:
+        return '', 204
+
+    load_ms = None
+    if event == 'load':
+        try:
+            load_ms = float(data.get('load_ms', 0))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Signalement invalide'}), 400
+        # NaN et l'infini passeraient le bornage et fausseraient la latence de l'hébergeur
+        if not math.isfinite(load_ms):
+            return jsonify({'error': 'Signalement invalide'}), 400
+        load_ms = min(max(load_ms, 0), PLAYER_LOAD_TIMEOUT * 1000)
+
+    if not allow_player_telemetry(current_user.id, source_url, event):
+        return jsonify({'error': 'Signalement déjà pris en compte'}), 429
+    if not record_player_telemetry(source_url, event, load_ms):
+        return jsonify({'error': 'Trop de signalements en attente'}), 429
+    return '', 204
+
 @app.route('/save-progress', methods=['POST'])
 @login_required
 def save_progress():
@@ -2509,6 +3627,427 @@ def toggle_favorite():
 def documentation():
     return render_template('documentation.html')
 
+def get_download_store_entry(anime, season_num, episode_num, video_url, lang=None):
+    """
+    Entrée du stockage des épisodes téléchargés sur le serveur. Un fichier est identifié par
+    (anime, saison, épisode, langue, hébergeur de la source) pour n'être téléchargé qu'une fois.
+
+    :param anime: Entrée anime au format du site
+    :param season_num: Numéro de la saison
+    :param episode_num: Numéro de l'épisode
+    :param video_url: URL du lecteur
+    :param lang: Langue de la source; déduite des sources de l'épisode si absente
+    :return: Dictionnaire {'key', 'language', 'source', 'path', 'download_name'}
+    """
+    if lang not in PLAYER_LANGUAGES:
+        season = next((s for s in anime.get('seasons', []) if s.get('season_number') == season_num), None)
+        episode = next((e for e in (season or {}).get('episodes', []) if e.get('episode_number') == episode_num), None)
+        embed_url = get_embed_url(video_url)
+        lang = next((
+            source_lang for source_lang, sources in get_episode_sources(episode or {}).items()
+            if any(source['url'] in (video_url, embed_url) for source in sources)
+        ), 'Autre')
+    _, source = get_source_host(get_embed_url(video_url) or video_url)
+    return get_download_store_path(anime, season_num, episode_num, lang, source)
+
+def get_download_store_path(anime, season_num, episode_num, lang, source):
+    """
+    Entrée du stockage des épisodes téléchargés pour une langue et un hébergeur donnés.
+    Les caractères qui ne peuvent pas figurer dans un nom de fichier sont remplacés.
+
+    :return: Dictionnaire {'key', 'language', 'source', 'path', 'download_name'}
+    """
+    lang = ''.join(c if c.isalnum() else '_' for c in lang)
+    source = ''.join(c if c.isalnum() or c in ' -_.' else '_' for c in source)
+    anime_title_safe = ''.join(c if c.isalnum() or c in ' -_' else '_' for c in anime['title'])
+    download_dir = os.path.join(DOWNLOADS_DIR, anime_title_safe, f"Saison {season_num}")
+    return {
+        'key': f"{anime.get('id')}/{season_num}/{episode_num}/{lang}/{source}",
+        'language': lang,
+        'source': source,
+        'path': os.path.join(download_dir, f'Episode {episode_num} - {lang} - {source}.mp4'),
+        'download_name': f"{anime_title_safe} - S{season_num}E{episode_num} {lang}.mp4"
+    }
+
+def find_downloaded_episode(anime, season_num, episode_num):
+    """
+    Cherche un fichier déjà téléchargé d'un épisode, quelles que soient sa langue et sa source.
+    Les fichiers .part des téléchargements en cours ne sont jamais renvoyés.
+
+    :return: Tuple (chemin du fichier, nom de téléchargement), ou None
+    """
+    anime_title_safe = ''.join(c if c.isalnum() or c in ' -_' else '_' for c in anime['title'])
+    download_dir = os.path.join(DOWNLOADS_DIR, anime_title_safe, f"Saison {season_num}")
+    download_name = f"{anime_title_safe} - S{season_num}E{episode_num}.mp4"
+    # Fichier enregistré avant le stockage par langue et par source
+    legacy_file = os.path.join(download_dir, f'Episode {episode_num}.mp4')
+    if os.path.exists(legacy_file):
+        return legacy_file, download_name
+    prefix = f'Episode {episode_num} - '
+    try:
+        names = sorted(n for n in os.listdir(download_dir) if n.startswith(prefix) and n.endswith('.mp4'))
+    except FileNotFoundError:
+        return None
+    return (os.path.join(download_dir, names[0]), download_name) if names else None
+
+def send_downloaded_file(path, download_name, as_attachment=True):
+    """
+    Envoie un épisode téléchargé. Les requêtes Range (reprise, déplacement dans la vidéo) et
+    conditionnelles (ETag, If-Modified-Since) sont prises en charge, par Flask ou par le proxy
+    frontal selon DOWNLOAD_SENDFILE. X-Sendfile prend un chemin brut, qu'un en-tête HTTP ne peut
+    pas porter hors ASCII: ces fichiers-là sont envoyés par Flask.
+
+    :param path: Chemin du fichier dans DOWNLOADS_DIR
+    :param download_name: Nom proposé au navigateur
+    :param as_attachment: False pour lire la vidéo dans le navigateur
+    :return: Réponse Flask
+    """
+    if DOWNLOAD_SENDFILE == 'x-accel-redirect' or (DOWNLOAD_SENDFILE == 'x-sendfile' and path.isascii()):
+        # Seule cette réponse est déléguée: les fichiers statiques restent envoyés par Flask
+        response = app.response_class(mimetype='video/mp4')
+        if DOWNLOAD_SENDFILE == 'x-sendfile':
+            response.headers['X-Sendfile'] = path
+        else:
+            relative = os.path.relpath(path, DOWNLOADS_DIR).replace(os.sep, '/')
+            response.headers['X-Accel-Redirect'] = DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + urllib.parse.quote(relative)
+        # Même en-tête que send_file: le nom est aussi encodé en RFC 5987 pour les titres non ASCII
+        names = {'filename': download_name}
+        if not download_name.isascii():
+            simple = unicodedata.normalize('NFKD', download_name).encode('ascii', 'ignore').decode('ascii')
+            quoted = urllib.parse.quote(download_name, safe="!#$&+-.^_`|~")
+            names = {'filename': simple, 'filename*': f"UTF-8''{quoted}"}
+        response.headers.set('Content-Disposition', 'attachment' if as_attachment else 'inline', **names)
+    else:
+        response = send_file(
+            path,
+            mimetype='video/mp4',
+            as_attachment=as_attachment,
+            download_name=download_name,
+            conditional=True,
+            etag=True,
+            max_age=DOWNLOAD_CACHE_MAX_AGE
+        )
+    # Fichiers réservés aux utilisateurs connectés: jamais dans un cache partagé
+    response.cache_control.public = False
+    response.cache_control.private = True
+    response.cache_control.max_age = DOWNLOAD_CACHE_MAX_AGE
+    return response
+
+# Threads de téléchargement, démarrés au premier téléchargement ou au démarrage s'il en reste en attente
+_download_workers = []
+_download_worker_numbers = itertools.count()
+download_jobs_condition = threading.Condition()
+_download_heartbeat = None
+# Téléchargements exécutés par ce processus, signalés par download_heartbeat
+_running_download_jobs = set()
+
+def download_worker_id():
+    """Identifiant du processus courant ("hôte:pid"), calculé à chaque appel (processus forkés)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue_download_job(user_id, anime, season_num, episode_num, video_url, entry):
+    """
+    Ajoute un téléchargement à la file. Les téléchargements d'un utilisateur qui en a déjà
+    en attente passent après ceux des autres utilisateurs. Un téléchargement en attente ou en
+    cours du même utilisateur pour la même entrée du stockage est réutilisé.
+    Doit être appelée dans un contexte d'application Flask.
+
+    :param entry: Entrée du stockage (voir get_download_store_entry)
+    :return: Le DownloadJob, ou None si l'utilisateur a trop de téléchargements en attente
+    """
+    active = DownloadJob.query.filter(
+        DownloadJob.user_id == user_id,
+        DownloadJob.status.in_(('queued', 'running'))
+    )
+    existing = active.filter(DownloadJob.store_key == entry['key']).first()
+    if existing is not None:
+        return existing
+    pending = active.count()
+    if pending >= DOWNLOAD_MAX_PENDING_PER_USER:
+        return None
+
+    job = DownloadJob(
+        user_id=user_id,
+        anime_id=int(anime.get('id', 0)),
+        season_number=season_num,
+        episode_number=episode_num,
+        video_url=video_url,
+        language=entry['language'],
+        source=entry['source'],
+        store_key=entry['key'],
+        priority=pending
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    start_download_workers()
+    with download_jobs_condition:
+        download_jobs_condition.notify()
+    return job
+
+def claim_next_download_job():
+    """
+    Passe le prochain téléchargement en attente (priorité puis ancienneté) à l'état 'running'.
+    Les téléchargements dont l'entrée du stockage est déjà en cours restent en attente: ils
+    sont terminés avec elle (voir finish_download_job).
+    La mise à jour conditionnelle, qui revérifie l'entrée du stockage, évite qu'un autre
+    processus prenne le même téléchargement ou la même entrée.
+    Doit être appelée en détenant download_jobs_condition.
+
+    :return: ID du téléchargement, ou None si la file est vide
+    """
+    with app.app_context():
+        in_flight = db.session.query(DownloadJob.store_key).filter(DownloadJob.status == 'running')
+        job = DownloadJob.query.filter(
+            DownloadJob.status == 'queued',
+            DownloadJob.store_key.notin_(in_flight)
+        ).order_by(DownloadJob.priority, DownloadJob.created_at).first()
+        if job is None:
+            return None
+        now = datetime.datetime.utcnow()
+        claimed = DownloadJob.query.filter(
+            DownloadJob.id == job.id,
+            DownloadJob.status == 'queued',
+            DownloadJob.store_key.notin_(in_flight)
+        ).update({
+            'status': 'running',
+            'started_at': now,
+            'owner': download_worker_id(),
+            'heartbeat_at': now
+        }, synchronize_session=False)
+        db.session.commit()
+        if not claimed:
+            return claim_next_download_job()
+        _running_download_jobs.add(job.id)
+        return job.id
+
+def finish_download_job(job, status, error=None):
+    """
+    Termine un téléchargement ainsi que les téléchargements en attente de la même entrée
+    du stockage, demandés par d'autres utilisateurs pendant qu'il était en cours.
+
+    :param job: DownloadJob à l'état 'running'
+    :param status: 'done' ou 'failed'
+    :param error: Message d'erreur en cas d'échec
+    """
+    values = {
+        'status': status,
+        'error': error,
+        'finished_at': datetime.datetime.utcnow()
+    }
+    if status == 'done':
+        values['progress'] = 100.0
+    coalesced = DownloadJob.query.filter(
+        DownloadJob.store_key == job.store_key,
+        DownloadJob.status == 'queued'
+    ).update(values, synchronize_session=False)
+    for name, value in values.items():
+        setattr(job, name, value)
+    db.session.commit()
+    if coalesced:
+        logger.info(f"Téléchargement {job.id}: {coalesced} demande(s) identique(s) terminée(s) avec lui")
+
+def download_with_ytdlp(video_url, output_file, progress_hook):
+    """
+    Télécharge une vidéo avec yt-dlp.
+
+    :param video_url: URL du lecteur
+    :param output_file: Chemin du fichier à créer
+    :param progress_hook: Fonction appelée avec l'état de progression de yt-dlp
+    :return: True si le fichier a été créé
+    """
+    # Import yt-dlp ici pour éviter les problèmes d'importation
+    from yt_dlp import YoutubeDL
+
+    # Configuration de yt-dlp optimisée pour le téléchargement direct
+    ydl_opts = {
+        'format': 'best[ext=mp4]/best',  # Préférer MP4 pour la compatibilité
+        'outtmpl': output_file,
+        'quiet': True,
+        'no_warnings': True,
+        'noplaylist': True,
+        'restrictfilenames': True,
+        'no_check_certificate': True,
+        'ignoreerrors': True,
+        'progress_hooks': [progress_hook]
+    }
+    with YoutubeDL(ydl_opts) as ydl:
+        ydl.extract_info(video_url, download=True)
+    return os.path.exists(output_file)
+
+def run_download_job(job_id):
+    """
+    Exécute un téléchargement de la file et enregistre son résultat.
+    Le fichier est écrit en .part puis renommé: un fichier présent dans le stockage est complet.
+
+    :param job_id: ID du DownloadJob à l'état 'running'
+    """
+    with app.app_context():
+        job = db.session.get(DownloadJob, job_id)
+        video_url = job.video_url
+        anime_data = load_anime_data()
+        anime = next((a for a in anime_data if int(a.get('id', 0)) == job.anime_id), None)
+        if not anime:
+            finish_download_job(job, 'failed', 'Anime non trouvé')
+            return
+
+        entry = get_download_store_entry(anime, job.season_number, job.episode_number, video_url, job.language)
+        output_file = entry['path']
+        if os.path.exists(output_file):
+            # Déjà téléchargé (par exemple par une demande précédente)
+            finish_download_job(job, 'done')
+            return
+
+        part_file = f"{output_file}.{job_id}.part"
+        try:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            logger.info(f"Téléchargement {job_id} depuis {video_url} vers {output_file}")
+
+            last_update = 0
+            def progress_hook(state):
+                nonlocal last_update
+                total = state.get('total_bytes') or state.get('total_bytes_estimate')
+                now = time.monotonic()
+                if not total or now - last_update < DOWNLOAD_PROGRESS_INTERVAL:
+                    return
+                last_update = now
+                job.progress = min(100.0, 100.0 * state.get('downloaded_bytes', 0) / total)
+                db.session.commit()
+
+            success = download_with_ytdlp(video_url, part_file, progress_hook)
+            record_download_outcome(video_url, success)
+            if success:
+                os.replace(part_file, output_file)
+                finish_download_job(job, 'done')
+            else:
+                logger.error(f"Le fichier {output_file} n'a pas été créé après téléchargement")
+                finish_download_job(job, 'failed', 'Échec du téléchargement - fichier non créé')
+        except Exception as e:
+            record_download_outcome(video_url, False)
+            logger.error(f"Erreur lors du téléchargement {job_id}: {str(e)}")
+            finish_download_job(job, 'failed', f'Erreur de téléchargement: {str(e)}'[:512])
+        finally:
+            # Fichiers temporaires de yt-dlp laissés par un téléchargement interrompu
+            for leftover in (part_file, f"{part_file}.part"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+def download_worker():
+    backoff = 1
+    while True:
+        with download_jobs_condition:
+            try:
+                job_id = claim_next_download_job()
+                while job_id is None:
+                    # Le délai rattrape les téléchargements ajoutés par un autre processus
+                    download_jobs_condition.wait(30)
+                    job_id = claim_next_download_job()
+                backoff = 1
+            except Exception as e:
+                # Une erreur de la base ne doit pas arrêter le thread: la file resterait bloquée
+                logger.error(f"Erreur lors de la lecture de la file de téléchargements: {e}")
+                download_jobs_condition.wait(backoff)
+                backoff = min(backoff * 2, DOWNLOAD_CLAIM_MAX_BACKOFF)
+                continue
+        try:
+            run_download_job(job_id)
+        except Exception as e:
+            logger.error(f"Erreur du thread de téléchargement: {e}")
+        # Des téléchargements attendaient peut-être la fin de celui-ci
+        with download_jobs_condition:
+            _running_download_jobs.discard(job_id)
+            download_jobs_condition.notify_all()
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def requeue_stale_download_jobs():
+    """
+    Remet en attente les téléchargements dont le processus est arrêté: sans signal depuis
+    DOWNLOAD_HEARTBEAT_TIMEOUT secondes, ou lancés par un processus disparu de cette machine.
+    Les téléchargements des autres processus en vie ne sont pas touchés.
+
+    :return: Nombre de téléchargements remis en attente
+    """
+    with app.app_context():
+        limit = datetime.datetime.utcnow() - datetime.timedelta(seconds=DOWNLOAD_HEARTBEAT_TIMEOUT)
+        own_id = download_worker_id()
+        hostname = socket.gethostname()
+        stale = []
+        for job in DownloadJob.query.filter_by(status='running').all():
+            host, _, pid = (job.owner or '').rpartition(':')
+            if job.heartbeat_at is None or job.heartbeat_at < limit:
+                stale.append(job.id)
+            elif host == hostname and job.owner != own_id and pid.isdigit() and not is_process_alive(int(pid)):
+                stale.append(job.id)
+        if not stale:
+            return 0
+        requeued = DownloadJob.query.filter(
+            DownloadJob.id.in_(stale),
+            DownloadJob.status == 'running'
+        ).update({'status': 'queued', 'progress': 0, 'owner': None}, synchronize_session=False)
+        db.session.commit()
+        if requeued:
+            logger.info(f"{requeued} téléchargement(s) interrompu(s) remis en attente")
+        return requeued
+
+def download_heartbeat():
+    """Signale les téléchargements en cours de ce processus et reprend ceux des processus arrêtés."""
+    while True:
+        time.sleep(DOWNLOAD_HEARTBEAT_INTERVAL)
+        try:
+            with download_jobs_condition:
+                job_ids = list(_running_download_jobs)
+            if job_ids:
+                with app.app_context():
+                    DownloadJob.query.filter(
+                        DownloadJob.id.in_(job_ids),
+                        DownloadJob.status == 'running'
+                    ).update({'heartbeat_at': datetime.datetime.utcnow()}, synchronize_session=False)
+                    db.session.commit()
+            if requeue_stale_download_jobs():
+                with download_jobs_condition:
+                    download_jobs_condition.notify_all()
+        except Exception as e:
+            logger.error(f"Erreur lors du signalement des téléchargements en cours: {e}")
+
+def start_download_workers():
+    """
+    Démarre les DOWNLOAD_WORKERS threads de téléchargement s'ils ne tournent pas encore.
+    Un thread arrêté par une erreur inattendue est remplacé.
+    """
+    global _download_heartbeat
+    with download_jobs_condition:
+        if _download_heartbeat is None or not _download_heartbeat.is_alive():
+            _download_heartbeat = threading.Thread(target=download_heartbeat, name="download-heartbeat", daemon=True)
+            _download_heartbeat.start()
+        _download_workers[:] = [thread for thread in _download_workers if thread.is_alive()]
+        while len(_download_workers) < DOWNLOAD_WORKERS:
+            thread = threading.Thread(
+                target=download_worker,
+                name=f"download-worker-{next(_download_worker_numbers)}",
+                daemon=True
+            )
+            thread.start()
+            _download_workers.append(thread)
+
+def resume_download_jobs():
+    """
+    Remet en attente les téléchargements interrompus par l'arrêt d'un processus (voir
+    requeue_stale_download_jobs) et relance les threads s'il reste des téléchargements:
+    ceux encore en cours dans un autre processus seront repris si leur signal s'arrête.
+    Doit être appelée dans un contexte d'application Flask.
+    """
+    requeue_stale_download_jobs()
+    if DownloadJob.query.filter(DownloadJob.status.in_(('queued', 'running'))).first() is not None:
+        start_download_workers()
+
 # Error handlers
 @app.errorhandler(404)
 def page_not_found(e):
@@ -2536,6 +4075,13 @@ with app.app_context():
         # Précharger les animes populaires au démarrage
         preload_popular_animes()
         logger.info("Animes populaires préchargés avec succès")
+
+        # Récupérer les animes chauds en arrière-plan
+        if start_hot_set_warmup():
+            logger.info("Préchargement des animes chauds lancé en arrière-plan")
+
+        # Reprendre les téléchargements en attente
+        resume_download_jobs()
     except Exception as e:
         logger.error(f"Error creating database tables or preloading animes: {e}")
 
@@ -2556,10 +4102,11 @@ def download_episode(anime_id, season_num, episode_num):
 @login_required
 def download_direct():
     """
-    Télécharge directement depuis l'URL fournie
-    
-    Cette API reçoit l'URL du lecteur actuel et utilise yt-dlp pour
-    télécharger directement la vidéo.
+    Ajoute un téléchargement depuis l'URL fournie à la file du serveur
+
+    Cette API reçoit l'URL du lecteur actuel et renvoie immédiatement l'identifiant
+    du téléchargement; yt-dlp télécharge la vidéo en arrière-plan. La progression
+    est suivie avec /api/download-jobs/<job_id>.
     """
     try:
         # Récupérer les données JSON
@@ -2571,80 +4118,105 @@ def download_direct():
         anime_id = data.get('anime_id')
         season_num = data.get('season_num')
         episode_num = data.get('episode_num')
+        lang = data.get('lang')
         
         if not video_url or not anime_id or not season_num or not episode_num:
             return jsonify({'error': 'Paramètres manquants'}), 400
             
         logger.info(f"Téléchargement direct depuis {video_url} pour anime {anime_id}, saison {season_num}, épisode {episode_num}")
         
-        # Récupérer les informations de l'anime
+        # Vérifier que l'anime existe
         anime_data = load_anime_data()
         anime = next((a for a in anime_data if int(a.get('id', 0)) == anime_id), None)
         
         if not anime:
             return jsonify({'error': 'Anime non trouvé'}), 404
-            
-        # Créer un nom de fichier sécurisé
-        anime_title_safe = ''.join(c if c.isalnum() or c in ' -_' else '_' for c in anime['title'])
-        download_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads', anime_title_safe, f"Saison {season_num}")
-        os.makedirs(download_dir, exist_ok=True)
-        
-        output_file = os.path.join(download_dir, f'Episode {episode_num}.mp4')
-        
-        # Import yt-dlp ici pour éviter les problèmes d'importation
-        from yt_dlp import YoutubeDL
-        
-        # Configuration de yt-dlp optimisée pour le téléchargement direct
-        ydl_opts = {
-            'format': 'best[ext=mp4]/best',  # Préférer MP4 pour la compatibilité
-            'outtmpl': output_file,
-            'quiet': True,
-            'no_warnings': True,
-            'noplaylist': True,
-            'restrictfilenames': True,
-            'no_check_certificate': True,
-            'ignoreerrors': True
-        }
-        
-        try:
-            # Utiliser yt-dlp pour télécharger la vidéo
-            with YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(video_url, download=True)
-                
-                # Si le téléchargement a réussi, générer une URL pour le fichier
-                if os.path.exists(output_file):
-                    # Générer un nom de fichier pour le téléchargement
-                    download_name = f"{anime_title_safe} - S{season_num}E{episode_num}.mp4"
-                    
-                    # Créer une URL de téléchargement temporaire
-                    download_url = url_for('download_file', 
-                                        anime_id=anime_id, 
-                                        season_num=season_num, 
+
+        # Épisode déjà téléchargé dans cette langue depuis cet hébergeur: disponible immédiatement
+        entry = get_download_store_entry(anime, season_num, episode_num, video_url, lang)
+        if os.path.exists(entry['path']):
+            return jsonify({
+                'success': True,
+                'status': 'done',
+                'download_url': url_for('download_file',
+                                        anime_id=anime_id,
+                                        season_num=season_num,
                                         episode_num=episode_num,
-                                        _external=True)
-                    
-                    return jsonify({
-                        'success': True,
-                        'download_url': download_url,
-                        'filename': download_name
-                    })
-                else:
-                    logger.error(f"Le fichier {output_file} n'a pas été créé après téléchargement")
-                    return jsonify({'error': 'Échec du téléchargement - fichier non créé'}), 500
-                    
-        except Exception as e:
-            logger.error(f"Erreur lors du téléchargement direct: {str(e)}")
-            return jsonify({'error': f'Erreur de téléchargement: {str(e)}'}), 500
+                                        lang=entry['language'],
+                                        source=entry['source'],
+                                        _external=True),
+                'filename': entry['download_name']
+            })
+
+        job = enqueue_download_job(current_user.id, anime, season_num, episode_num, video_url, entry)
+        if job is None:
+            return jsonify({'error': 'Trop de téléchargements en attente, réessayez plus tard'}), 429
+
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status': job.status,
+            'status_url': url_for('download_job_status', job_id=job.id)
+        }), 202
             
     except Exception as e:
         logger.error(f"Erreur générale lors du téléchargement direct: {str(e)}")
         return jsonify({'error': f'Erreur serveur: {str(e)}'}), 500
 
+@app.route('/api/download-jobs')
+@login_required
+def download_jobs():
+    """
+    Liste les téléchargements récents de l'utilisateur connecté
+    """
+    jobs = current_user.download_jobs.order_by(DownloadJob.created_at.desc()).limit(50).all()
+    return jsonify({'jobs': [job.to_dict() for job in jobs]})
+
+@app.route('/api/download-jobs/<int:job_id>')
+@login_required
+def download_job_status(job_id):
+    """
+    État d'un téléchargement de l'utilisateur connecté; une fois terminé,
+    download_url pointe vers le fichier servi par /download-file
+    """
+    job = DownloadJob.query.filter_by(id=job_id, user_id=current_user.id).first()
+    if not job:
+        return jsonify({'error': 'Téléchargement non trouvé'}), 404
+
+    result = job.to_dict()
+    leader = None
+    if job.status == 'queued':
+        # La même entrée du stockage est peut-être déjà en cours de téléchargement
+        leader = DownloadJob.query.filter_by(store_key=job.store_key, status='running').first()
+    if job.status == 'done':
+        result['download_url'] = url_for('download_file',
+                                         anime_id=job.anime_id,
+                                         season_num=job.season_number,
+                                         episode_num=job.episode_number,
+                                         lang=job.language,
+                                         source=job.source,
+                                         _external=True)
+    elif leader is not None:
+        result['status'] = 'running'
+        result['progress'] = round(leader.progress or 0, 1)
+    elif job.status == 'queued':
+        # Nombre de téléchargements traités avant celui-ci
+        result['position'] = DownloadJob.query.filter(
+            DownloadJob.status == 'queued',
+            db.or_(
+                DownloadJob.priority < job.priority,
+                db.and_(DownloadJob.priority == job.priority, DownloadJob.created_at < job.created_at)
+            )
+        ).count()
+    return jsonify(result)
+
 @app.route('/download-file/<int:anime_id>/<int:season_num>/<int:episode_num>')
 @login_required
 def download_file(anime_id, season_num, episode_num):
     """
-    Télécharge un fichier déjà téléchargé sur le serveur
+    Télécharge un fichier déjà téléchargé sur le serveur; les paramètres lang et source
+    choisissent le fichier, sinon n'importe quel fichier de l'épisode est servi.
+    Avec inline=1, la vidéo est lue dans le navigateur au lieu d'être enregistrée.
     """
     try:
         # Récupérer l'anime
@@ -2654,18 +4226,20 @@ def download_file(anime_id, season_num, episode_num):
         if not anime:
             return jsonify({'error': 'Anime non trouvé'}), 404
             
-        # Construire le chemin du fichier
-        anime_title_safe = ''.join(c if c.isalnum() or c in ' -_' else '_' for c in anime['title'])
-        download_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'downloads', anime_title_safe, f"Saison {season_num}")
-        
         # Vérifier si le fichier existe
-        output_file = os.path.join(download_dir, f'Episode {episode_num}.mp4')
+        lang = request.args.get('lang')
+        source = request.args.get('source')
+        if lang and source:
+            entry = get_download_store_path(anime, season_num, episode_num, lang, source)
+            output_file, download_name = entry['path'], entry['download_name']
+        else:
+            output_file, download_name = find_downloaded_episode(anime, season_num, episode_num) or (None, None)
         
-        if os.path.exists(output_file):
-            return send_file(
+        if output_file and os.path.exists(output_file):
+            return send_downloaded_file(
                 output_file,
-                as_attachment=True,
-                download_name=f"{anime_title_safe} - S{season_num}E{episode_num}.mp4"
+                download_name,
+                as_attachment=request.args.get('inline') != '1'
             )
         else:
             logger.error(f"Fichier non trouvé: {output_file}")